@@ -78,10 +78,12 @@ async def detailed_health_check():
         # AI Planning Service
         try:
             from app.services.ai_planning_service import aiPlanningService
+            from app.services.planning_jobs import planningJobQueue
             detailed_services["ai_planning"] = {
                 "status": "healthy",
                 "last_check": datetime.utcnow().isoformat(),
-                "details": "Service disponible"
+                "details": "Service disponible",
+                "jobs": planningJobQueue.stats()
             }
         except Exception as e:
             detailed_services["ai_planning"] = {
@@ -123,10 +125,14 @@ async def detailed_health_check():
         # OpenAI Service
         try:
             from app.services.openai_client_service import openai_service
+            from app.services.ai_response_cache import aiResponseCache
+            from app.services.ai_planning_service import aiPlanningService
             detailed_services["openai"] = {
                 "status": "healthy",
                 "last_check": datetime.utcnow().isoformat(),
-                "details": "Service disponible"
+                "details": "Service disponible",
+                "response_cache": aiResponseCache.stats(),
+                "token_usage": aiPlanningService.tokenUsageStats()
             }
         except Exception as e:
             detailed_services["openai"] = {
@@ -137,14 +143,17 @@ async def detailed_health_check():
         
         # Vérification Supabase
         try:
-            from app.core.database import getSupabase
+            from app.core.database import getSupabase, getConnectionStats
+            from app.core.cache import getCacheStats
             supabase = getSupabase()
             # Test de connexion simple
             result = supabase.table("tournament").select("id").limit(1).execute()
             detailed_services["supabase"] = {
                 "status": "healthy",
                 "last_check": datetime.utcnow().isoformat(),
-                "details": "Connexion base de données OK"
+                "details": "Connexion base de données OK",
+                "pool": getConnectionStats(),
+                "cache": getCacheStats()
             }
         except Exception as e:
             detailed_services["supabase"] = {
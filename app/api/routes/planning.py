@@ -1,8 +1,20 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Header, Response, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.core.etag import etagMatches, notModified
 from app.services.ai_planning_service import aiPlanningService
-from app.schemas.requete import GeneratePlanningRequest
-from app.schemas.response import PlanningResponse, StatusResponse
-from app.services.database_service import databaseService
+from app.schemas.requete import (
+    GeneratePlanningRequest, MatchResultRequest, PouleRankingRequest, BulkStatusTransitionRequest
+)
+from app.schemas.response import (
+    PlanningResponse, StatusResponse, PlanningDetailsResponse, MatchesResponse, CourtsNowNextResponse,
+    ResolutionResponse, StandardResponse
+)
+from app.services.async_database_service import asyncDatabaseService
+from app.services.planning_export import EXPORT_FORMATS, streamMatches
+from app.services.planning_jobs import QueueFullError
 
 # Router avec préfixe et tags
 router = APIRouter(
@@ -12,11 +24,37 @@ router = APIRouter(
 
 
 @router.post("/generate", response_model=PlanningResponse, status_code=status.HTTP_201_CREATED)
-async def generate_planning(request: GeneratePlanningRequest):
+async def generate_planning(request: GeneratePlanningRequest,
+                            response: Response,
+                            background: bool = Query(False, description="Génération en tâche de fond (202 + suivi via /status)"),
+                            fresh: bool = Query(False, description="Ignorer le cache des réponses IA (nouvel appel à l'assistant)"),
+                            engine: Optional[str] = Query(None, pattern="^(ai|local)$", description="Moteur : ai (assistant) ou local (déterministe), défaut PLANNING_ENGINE")):
     """Génère un planning IA pour un tournoi"""
     try:
-        # Appel du service AI Planning
-        planning = aiPlanningService.generatePlanning(request.tournament_id)
+        if background:
+            try:
+                pending = await run_in_threadpool(aiPlanningService.startPlanningJob, request.tournament_id, not fresh, engine)
+            except QueueFullError:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Trop de générations en cours, réessayez plus tard",
+                    headers={"Retry-After": "30"}
+                )
+            if not pending:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Impossible de lancer la génération. Vérifiez le tournoi."
+                )
+            response.status_code = status.HTTP_202_ACCEPTED
+            response.headers["Location"] = f"{router.prefix}/{pending.id}/status"
+            return PlanningResponse(
+                success=True,
+                message="Génération lancée, suivre l'avancement via /status",
+                data=pending
+            )
+
+        # Appel du service AI Planning (bloquant : exécuté hors de la boucle)
+        planning = await run_in_threadpool(aiPlanningService.generatePlanning, request.tournament_id, not fresh, engine)
         
         if not planning:
             raise HTTPException(
@@ -39,12 +77,38 @@ async def generate_planning(request: GeneratePlanningRequest):
             detail="Erreur interne lors de la génération du planning"
         )
 
+@router.patch("/status", response_model=StandardResponse)
+async def transition_plannings_status(request: BulkStatusTransitionRequest):
+    """Passe en lot des plannings de expected_status à status (les autres sont ignorés)"""
+    try:
+        report = await asyncDatabaseService.transitionPlanningStatuses(request.ids, request.expected_status, request.status)
+        if report is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de la mise à jour des statuts"
+            )
+
+        return StandardResponse(
+            success=True,
+            message=f"{len(report['transitioned'])}/{len(request.ids)} planning(s) passé(s) à '{request.status}'",
+            data=report
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur transition statuts plannings: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la mise à jour des statuts"
+        )
+
 @router.get("/{planning_id}/status", response_model=StatusResponse)
 async def get_planning_status(planning_id: str):
     """Récupère le statut d'un planning"""
     try:
         # Appel du service
-        status_value = aiPlanningService.getPlanningStatus(planning_id)
+        status_value = await run_in_threadpool(aiPlanningService.getPlanningStatus, planning_id)
         
         if status_value is None:
             raise HTTPException(
@@ -52,10 +116,15 @@ async def get_planning_status(planning_id: str):
                 detail="Planning non trouvé"
             )
         
+        data = {"status": status_value, "planning_id": planning_id}
+        job = aiPlanningService.getPlanningJob(planning_id)
+        if job:
+            data.update(stage=job["stage"], error=job["error"], stage_updated_at=job["updated_at"].isoformat())
+
         return StatusResponse(
             success=True,
             message="Statut récupéré avec succès",
-            data={"status": status_value, "planning_id": planning_id}
+            data=data
         )
         
     except HTTPException:
@@ -68,11 +137,28 @@ async def get_planning_status(planning_id: str):
         )
 
 @router.post("/{planning_id}/regenerate", response_model=PlanningResponse)
-async def regenerate_planning(planning_id: str):
-    """Régénère un planning existant"""
+async def regenerate_planning(planning_id: str,
+                              incremental: bool = Query(False, description="Ne réécrire que les matchs et poules modifiés"),
+                              fresh: bool = Query(False, description="Ignorer le cache des réponses IA (nouvel appel à l'assistant)"),
+                              engine: Optional[str] = Query(None, pattern="^(ai|local)$", description="Moteur : ai (assistant) ou local (déterministe), défaut PLANNING_ENGINE")):
+    """Régénère un planning existant (complet, ou incrémental sur le même ID)"""
     try:
+        if incremental:
+            synced = await run_in_threadpool(aiPlanningService.regeneratePlanningIncremental, planning_id, not fresh, engine)
+            if not synced:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Planning original non trouvé ou erreur lors de la régénération"
+                )
+            return PlanningResponse(
+                success=True,
+                message=f"Planning régénéré : {synced['rows_written']} ligne(s) écrite(s)",
+                data=synced["planning"],
+                changes={key: synced[key] for key in ("matches", "poules", "rows_written")}
+            )
+
         # Appel du service
-        new_planning = aiPlanningService.regeneratePlanning(planning_id)
+        new_planning = await run_in_threadpool(aiPlanningService.regeneratePlanning, planning_id, not fresh, engine)
         
         if not new_planning:
             raise HTTPException(
@@ -96,16 +182,22 @@ async def regenerate_planning(planning_id: str):
         )
 
 @router.get("/{planning_id}", response_model=PlanningResponse)
-async def get_planning_by_id(planning_id: str):
-    """Récupère un planning complet par son ID"""
+async def get_planning_by_id(planning_id: str,
+                             response: Response,
+                             if_none_match: Optional[str] = Header(None)):
+    """Récupère un planning complet par son ID (304 si l'ETag du client est à jour)"""
     try:        
-        planning_details = databaseService.getPlanningWithDetailsByPlanningId(planning_id)
+        result = await asyncDatabaseService.getPlanningByIdWithEtag(planning_id)
         
-        if not planning_details:
+        if not result:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Planning non trouvé"
             )
+        planning_details, etag = result
+        if etagMatches(if_none_match, etag):
+            return notModified(etag)
+        response.headers["ETag"] = etag
         
         return PlanningResponse(
             success= True,
@@ -122,12 +214,224 @@ async def get_planning_by_id(planning_id: str):
             detail="Erreur interne lors de la récupération du planning"
         )
     
+@router.get("/{planning_id}/details", response_model=PlanningDetailsResponse)
+async def get_planning_details(
+    planning_id: str,
+    fields: Optional[str] = Query(None, description="Colonnes du planning, séparées par des virgules (ex: id,status,total_matches)"),
+    include: Optional[str] = Query(None, description="Relations à inclure : matches,poules (défaut : les deux)")
+):
+    """Récupère un planning avec ses matchs (triés par horaire) et ses poules, en une requête"""
+    try:
+        fieldList = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        includeList = [i.strip() for i in include.split(",") if i.strip()] if include is not None else None
+        try:
+            planning_details = await asyncDatabaseService.getPlanningDetails(planning_id, fieldList, includeList)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        if not planning_details:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Planning non trouvé"
+            )
+
+        return PlanningDetailsResponse(
+            success=True,
+            message=f"Planning récupéré avec {len(planning_details['matches'])} match(s) et {len(planning_details['poules'])} poule(s)",
+            data=planning_details
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération planning détaillé: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération du planning"
+        )
+
+@router.get("/{planning_id}/matches", response_model=MatchesResponse)
+async def get_planning_matches(
+    planning_id: str,
+    terrain: Optional[int] = Query(None, ge=1, description="Numéro de terrain"),
+    start_from: Optional[datetime] = Query(None, description="Début de créneau (inclus)"),
+    start_to: Optional[datetime] = Query(None, description="Fin de créneau (exclue)"),
+    phase: Optional[str] = Query(None, description="poules, elimination, finale..."),
+    poule_id: Optional[str] = Query(None),
+    journee: Optional[int] = Query(None, ge=1)
+):
+    """Matchs d'un planning filtrés par terrain, créneau, phase, poule ou journée (triés par horaire)"""
+    try:
+        matches = await asyncDatabaseService.getPlanningMatches(
+            planning_id,
+            terrain=terrain,
+            startFrom=start_from,
+            startTo=start_to,
+            phase=phase,
+            pouleId=poule_id,
+            journee=journee
+        )
+        if matches is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de la récupération des matchs"
+            )
+
+        return MatchesResponse(
+            success=True,
+            message=f"{len(matches)} match(s) trouvé(s)",
+            data=matches
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération matchs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération des matchs"
+        )
+
+@router.get("/{planning_id}/matches/now-next", response_model=CourtsNowNextResponse)
+async def get_courts_now_next(
+    planning_id: str,
+    at: Optional[datetime] = Query(None, description="Instant de référence (défaut : maintenant)"),
+    terrain: Optional[int] = Query(None, ge=1, description="Limiter à un terrain")
+):
+    """Match en cours et match suivant pour chaque terrain"""
+    try:
+        index = await asyncDatabaseService.getCourtIndex(planning_id)
+        if index is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de la récupération des matchs"
+            )
+
+        at = at or datetime.now()
+        courts = [terrain] if terrain is not None else index.courts()
+        data = []
+        for court in courts:
+            current, upcoming = index.nowAndNext(court, at)
+            data.append({"terrain": court, "current": current, "next": upcoming})
+
+        return CourtsNowNextResponse(
+            success=True,
+            message=f"{len(data)} terrain(s)",
+            at=at,
+            data=data
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération matchs en cours: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération des matchs"
+        )
+
+@router.post("/{planning_id}/matches/{match_id}/result", response_model=ResolutionResponse)
+async def record_match_result(planning_id: str, match_id: str, request: MatchResultRequest):
+    """Enregistre le résultat d'un match et renseigne les matchs qui en dépendent (winner_ / loser_)"""
+    try:
+        try:
+            resolution = await asyncDatabaseService.recordMatchResult(
+                planning_id, match_id, request.winner_team_id, request.loser_team_id
+            )
+        except KeyError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Match non trouvé dans ce planning"
+            )
+        if resolution is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de l'enregistrement du résultat"
+            )
+
+        return ResolutionResponse(
+            success=True,
+            message=f"Résultat enregistré, {len(resolution['resolved'])} match(s) mis à jour en aval",
+            data=resolution
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur enregistrement résultat: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de l'enregistrement du résultat"
+        )
+
+@router.post("/{planning_id}/poules/{poule_id}/ranking", response_model=ResolutionResponse)
+async def record_poule_ranking(planning_id: str, poule_id: str, request: PouleRankingRequest):
+    """Enregistre le classement d'une poule et renseigne les matchs qui en dépendent (1er_ / 2e_)"""
+    try:
+        try:
+            resolution = await asyncDatabaseService.recordPouleRanking(planning_id, poule_id, request.team_ids)
+        except KeyError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Poule non trouvée dans ce planning"
+            )
+        if resolution is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de l'enregistrement du classement"
+            )
+
+        return ResolutionResponse(
+            success=True,
+            message=f"Classement enregistré, {len(resolution['resolved'])} match(s) mis à jour en aval",
+            data=resolution
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur enregistrement classement: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de l'enregistrement du classement"
+        )
+
+@router.get("/{planning_id}/export")
+async def export_planning_matches(
+    planning_id: str,
+    format: str = Query("ndjson", description="ndjson ou csv")
+):
+    """Exporte les matchs d'un planning en flux (NDJSON ou CSV), page par page"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format inconnu : {format} (attendus : {', '.join(EXPORT_FORMATS)})"
+        )
+
+    # Vérification avant le premier octet : après, le statut HTTP ne peut plus changer
+    planning = await asyncDatabaseService.getPlanningDetails(planning_id, fields=["id"], include=[])
+    if not planning:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Planning non trouvé"
+        )
+
+    rows = asyncDatabaseService.iterPlanningMatchRows(planning_id)
+    return StreamingResponse(
+        streamMatches(rows, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="planning_{planning_id}.{format}"'}
+    )
+
 @router.get("/tournament/{tournament_id}", response_model=PlanningResponse)
 async def get_planning_by_tournament_id(tournament_id: str):
     """Récupère un planning complet par l'ID du tournoi"""
     try:
         # Appel du service
-        planning_details = databaseService.getPlanningWithDetailsByTournamentId(tournament_id)
+        planning_details = await asyncDatabaseService.getPlanningWithDetailsByTournamentId(tournament_id)
         
         if not planning_details:
             raise HTTPException(
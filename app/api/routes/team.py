@@ -1,5 +1,7 @@
+from typing import Optional
 from fastapi import APIRouter, HTTPException, status, Query
-from app.services.tournament_service import tournamentService
+from app.core.config import settings
+from app.services.async_tournament_service import asyncTournamentService
 from app.schemas.response import (
     TournamentResponse, 
     CreateTournamentRequest,
@@ -19,18 +21,39 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=TeamsResponse)
-def get_teams():
-    """Récupère toutes les équipes d'un tournoi"""
+async def get_teams(
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Taille de la page"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente"),
+    tournament_id: Optional[str] = Query(None, description="Filtre sur le tournoi"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filtre sur le statut")
+):
+    """Récupère les équipes, page par page (tri created_at, id)"""
     try:
         # Appel du service
-        teams = tournamentService.getTeams()
+        try:
+            page = await asyncTournamentService.getTeamsPage(limit, cursor, tournament_id, status_filter)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        if page is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur interne lors de la récupération des équipes"
+            )
+        teams, next_cursor = page
         
         return TeamsResponse(
             success=True,
             message=f"{len(teams)} équipe(s) récupérée(s) avec succès",
-            data=teams
+            data=teams,
+            limit=limit,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Erreur récupération équipes: {e}")
         raise HTTPException(
@@ -39,10 +62,10 @@ def get_teams():
         )
 
 @router.get("/with-members", response_model=TeamWithMembersResponse)
-def get_teams_with_members(tournament_id: str = Query(None, description="ID du tournoi")):
+async def get_teams_with_members(tournament_id: str = Query(None, description="ID du tournoi")):
     """Récupère toutes les équipes avec leurs membres"""
     try:
-        teams = tournamentService.getTeamsWithMembers(tournament_id)
+        teams = await asyncTournamentService.getTeamsWithMembers(tournament_id)
         
         if teams is None:
             raise HTTPException(
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Header, Response, Query
+from app.core.config import settings
+from app.core.etag import etagMatches, notModified
 from app.services.tournament_service import tournamentService
+from app.services.async_tournament_service import asyncTournamentService
 from app.schemas.response import (
     TournamentResponse, 
     CreateTournamentRequest,
@@ -11,7 +15,7 @@ from app.schemas.response import (
     CreateTeamRequest,
     TeamMemberResponse,
     )
-from app.schemas.requete import AddTeamMembersRequest
+from app.schemas.requete import AddTeamMembersRequest, BulkStatusTransitionRequest
 
 # Router avec préfixe et tags
 router = APIRouter(
@@ -51,19 +55,34 @@ def create_tournament(request: CreateTournamentRequest):
         )
 
 @router.get("/", response_model=TournamentResponse, status_code=status.HTTP_200_OK)
-def get_tournaments():
-    """ Recupere tous les tournois"""
+async def get_tournaments(
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT, description="Taille de la page"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filtre sur le statut"),
+    organizer_id: Optional[str] = Query(None, description="Filtre sur l'organisateur"),
+    tournament_type: Optional[str] = Query(None, description="Filtre sur le type de tournoi")
+):
+    """ Recupere les tournois, page par page (tri created_at, id)"""
     try: 
-        tournaments = tournamentService.getTournaments()
-        if not tournaments:
+        try:
+            page = await asyncTournamentService.getTournamentsPage(limit, cursor, status_filter, organizer_id, tournament_type)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        if not page or not page[0]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tournois non trouvés"
             )
+        tournaments, next_cursor = page
         return TournamentResponse(
             success=True,
             message="Tournoi récupéré avec succès",
-            data=tournaments
+            data=tournaments,
+            limit=limit,
+            next_cursor=next_cursor
         )
     except HTTPException:
         raise
@@ -75,17 +94,23 @@ def get_tournaments():
         )
 
 @router.get("/{tournament_id}", response_model=TournamentResponse)
-def get_tournament(tournament_id: str):
-    """Récupère un tournoi par son ID"""
+async def get_tournament(tournament_id: str,
+                         response: Response,
+                         if_none_match: Optional[str] = Header(None)):
+    """Récupère un tournoi par son ID (304 si l'ETag du client est à jour)"""
     try:
         # Appel du service
-        tournament = tournamentService.getTournamentById(tournament_id)
+        result = await asyncTournamentService.getTournamentByIdWithEtag(tournament_id)
         
-        if not tournament:
+        if not result:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tournoi non trouvé"
             )
+        tournament, etag = result
+        if etagMatches(if_none_match, etag):
+            return notModified(etag)
+        response.headers["ETag"] = etag
         
         return TournamentResponse(
             success=True,
@@ -103,17 +128,23 @@ def get_tournament(tournament_id: str):
         )
 
 @router.get("/{tournament_id}/with-teams", response_model=TournamentWithTeamsResponse)
-def get_tournament_with_teams(tournament_id: str):
-    """Récupère un tournoi avec ses équipes"""
+async def get_tournament_with_teams(tournament_id: str,
+                                    response: Response,
+                                    if_none_match: Optional[str] = Header(None)):
+    """Récupère un tournoi avec ses équipes (304 si l'ETag du client est à jour)"""
     try:
         # Appel du service
-        tournament_data = tournamentService.getTournamentWithTeams(tournament_id)
+        result = await asyncTournamentService.getTournamentWithTeamsAndEtag(tournament_id)
         
-        if not tournament_data:
+        if not result:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Tournoi non trouvé"
             )
+        tournament_data, etag = result
+        if etagMatches(if_none_match, etag):
+            return notModified(etag)
+        response.headers["ETag"] = etag
         
         return TournamentWithTeamsResponse(
             success=True,
@@ -131,11 +162,11 @@ def get_tournament_with_teams(tournament_id: str):
         )
 
 @router.get("/{tournament_id}/teams", response_model=TeamsResponse)
-def get_tournament_teams(tournament_id: str):
+async def get_tournament_teams(tournament_id: str):
     """Récupère toutes les équipes d'un tournoi"""
     try:
         # Appel du service
-        teams = tournamentService.getTournamentTeams(tournament_id)
+        teams = await asyncTournamentService.getTournamentTeams(tournament_id)
         
         return TeamsResponse(
             success=True,
@@ -150,6 +181,32 @@ def get_tournament_teams(tournament_id: str):
             detail="Erreur interne lors de la récupération des équipes"
         )
 
+@router.patch("/status", response_model=StandardResponse)
+def transition_tournaments_status(request: BulkStatusTransitionRequest):
+    """Passe en lot des tournois de expected_status à status (les autres sont ignorés)"""
+    try:
+        report = tournamentService.transitionTournamentStatuses(request.ids, request.expected_status, request.status)
+        if report is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur lors de la mise à jour des statuts"
+            )
+
+        return StandardResponse(
+            success=True,
+            message=f"{len(report['transitioned'])}/{len(request.ids)} tournoi(s) passé(s) à '{request.status}'",
+            data=report
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur transition statuts tournois: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la mise à jour des statuts"
+        )
+
 @router.patch("/{tournament_id}/status", response_model=StandardResponse)
 def update_tournament_status(tournament_id: str, request: UpdateTournamentStatusRequest):
     """Met à jour le statut d'un tournoi"""
@@ -217,11 +274,11 @@ def create_team(tournament_id: str, request: CreateTeamRequest):
         )
 
 @router.get("/teams/{team_id}", response_model=TeamResponse)
-def get_team(team_id: str):
+async def get_team(team_id: str):
     """Récupère une équipe par son ID"""
     try:
         # Appel du service
-        team = tournamentService.getTeamById(team_id)
+        team = await asyncTournamentService.getTeamById(team_id)
         
         if not team:
             raise HTTPException(
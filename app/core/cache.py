@@ -0,0 +1,170 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from app.core.config import settings
+
+# Entrée négative : "on a cherché, ça n'existe pas" (None signifie absent du cache)
+NOT_FOUND = object()
+
+
+class TTLCache:
+    """
+    Cache mémoire borné : expiration par entrée (TTL) + éviction LRU.
+
+    Thread-safe (un verrou par cache) : partagé entre le service sync
+    (threadpool FastAPI) et le service async.
+    """
+
+    def __init__(self, name: str, maxSize: int, ttlSeconds: float):
+        self.name = name
+        self.maxSize = maxSize
+        self.ttlSeconds = ttlSeconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Renvoie la valeur en cache, ou None si absente / expirée"""
+        entry = self.getWithEtag(key)
+        return entry[0] if entry else None
+
+    def getWithEtag(self, key: Hashable) -> Optional[Tuple[Any, Optional[str]]]:
+        """Renvoie (valeur, etag) en une seule lecture, ou None si absente / expirée"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expiresAt, value, etag = entry
+            if expiresAt <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, etag
+
+    def set(self, key: Hashable, value: Any, ttlSeconds: Optional[float] = None, etag: Optional[str] = None):
+        """Ajoute une entrée (et son ETag) ; évince la moins récemment utilisée si le cache est plein"""
+        if self.maxSize <= 0 or value is None:
+            return
+        ttl = self.ttlSeconds if ttlSeconds is None else ttlSeconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._store(key, value, ttl, etag)
+
+    def add(self, key: Hashable, value: Any, ttlSeconds: Optional[float] = None) -> bool:
+        """Ajoute seulement si la clé est absente (ou expirée) ; False si déjà présente"""
+        ttl = self.ttlSeconds if ttlSeconds is None else ttlSeconds
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._store(key, value, ttl, None)
+            return True
+
+    def _store(self, key: Hashable, value: Any, ttl: float, etag: Optional[str]):
+        # Appelé verrou pris
+        self._entries[key] = (time.monotonic() + ttl, value, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxSize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: Hashable):
+        """Supprime les entrées données (les clés absentes sont ignorées)"""
+        with self._lock:
+            for key in keys:
+                if key is not None and self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resetStats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.maxSize,
+                "ttl_seconds": self.ttlSeconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+# Caches partagés, un par type d'entité (TTL configurable séparément)
+tournamentCache = TTLCache("tournament", settings.CACHE_MAX_ENTRIES, settings.CACHE_TOURNAMENT_TTL)
+tournamentTeamsCache = TTLCache("tournament_teams", settings.CACHE_MAX_ENTRIES, settings.CACHE_TOURNAMENT_TEAMS_TTL)
+teamCache = TTLCache("team", settings.CACHE_MAX_ENTRIES, settings.CACHE_TEAM_TTL)
+planningCache = TTLCache("planning", settings.CACHE_MAX_ENTRIES, settings.CACHE_PLANNING_TTL)
+# Index terrain -> matchs triés par horaire, par planning (requêtes "en cours / suivant")
+courtIndexCache = TTLCache("court_index", settings.CACHE_MAX_ENTRIES, settings.CACHE_PLANNING_TTL)
+# Graphe des placeholders (winner_, 1er_...) par planning, tenu à jour à chaque résultat
+bracketGraphCache = TTLCache("bracket_graph", settings.CACHE_MAX_ENTRIES, settings.CACHE_PLANNING_TTL)
+# Profils indexés par ("id", uuid) et ("email", email normalisé)
+profileCache = TTLCache("profile", settings.CACHE_MAX_ENTRIES, settings.CACHE_PROFILE_TTL)
+# Emails invités récemment : pas de nouvel envoi pendant la fenêtre
+invitationCache = TTLCache("invitation", settings.CACHE_MAX_ENTRIES, settings.CACHE_PROFILE_NEGATIVE_TTL)
+
+_caches = (tournamentCache, tournamentTeamsCache, teamCache, planningCache, courtIndexCache, bracketGraphCache, profileCache, invitationCache)
+
+
+def invalidateTournament(tournamentId: Optional[str]):
+    """Invalide un tournoi et la liste de ses équipes (registered_teams en dépend)"""
+    tournamentCache.invalidate(tournamentId)
+    tournamentTeamsCache.invalidate(tournamentId)
+
+
+def invalidatePlanning(planningId: Optional[str]):
+    """Invalide un planning, l'index de ses matchs par terrain et son graphe de placeholders"""
+    planningCache.invalidate(planningId)
+    courtIndexCache.invalidate(planningId)
+    bracketGraphCache.invalidate(planningId)
+
+
+def normalizeEmail(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def profileCacheKey(column: str, value: str) -> tuple:
+    return (column, normalizeEmail(value) if column == "email" else value)
+
+
+def cacheProfile(profile):
+    """Met un profil en cache sous ses deux clés (id et email)"""
+    profileCache.set(profileCacheKey("id", profile.id), profile)
+    profileCache.set(profileCacheKey("email", profile.email), profile)
+
+
+def cacheProfileNotFound(column: str, value: str):
+    """Entrée négative de courte durée pour un profil introuvable"""
+    profileCache.set(profileCacheKey(column, value), NOT_FOUND, settings.CACHE_PROFILE_NEGATIVE_TTL)
+
+
+def clearCaches():
+    """Vide tous les caches et remet leurs compteurs à zéro"""
+    for cache in _caches:
+        cache.clear()
+        cache.resetStats()
+
+
+def getCacheStats() -> Dict[str, Dict[str, Any]]:
+    """Compteurs hit/miss/éviction de chaque cache"""
+    return {cache.name: cache.stats() for cache in _caches}
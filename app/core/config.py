@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     """Classe pour récupérer les variables d'environnement"""
@@ -9,9 +10,75 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_KEY: str # cle admin
     SUPABASE_KEY: str
 
+    # Pool de connexions HTTP vers Supabase (PostgREST)
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 20
+    SUPABASE_POOL_MAX_KEEPALIVE: int = 10
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = 30.0 # secondes
+    SUPABASE_HTTP2: bool = False
+    SUPABASE_TIMEOUT: float = 10.0 # secondes
+
+    # Backend de données : "supabase" (réel) ou "local" (en mémoire, tests / benchmarks)
+    DATABASE_BACKEND: str = "supabase"
+    LOCAL_BACKEND_LATENCY_MS: float = 0.0 # latence simulée par requête
+    LOCAL_BACKEND_SEED_FILE: Optional[str] = None # JSON {table: [lignes]}
+
+    # Cache mémoire des lectures tournoi / équipes (TTL en secondes, 0 = désactivé)
+    CACHE_MAX_ENTRIES: int = 1024 # par type d'entité, éviction LRU au-delà
+    CACHE_TOURNAMENT_TTL: float = 60.0
+    CACHE_TOURNAMENT_TEAMS_TTL: float = 30.0
+    CACHE_TEAM_TTL: float = 60.0
+    CACHE_PLANNING_TTL: float = 15.0
+    CACHE_PROFILE_TTL: float = 300.0
+    CACHE_PROFILE_NEGATIVE_TTL: float = 60.0 # profil introuvable + anti-renvoi des invitations
+
+    # Pagination des listes (tournois, équipes)
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 200
+
+    # Sauvegarde des plannings via la fonction Postgres save_planning_atomic
+    # (supabase/migrations) ; repli automatique si elle n'est pas déployée
+    PLANNING_SAVE_RPC: bool = True
+    # Transitions de statut en lot via la fonction Postgres transition_status
+    STATUS_TRANSITION_RPC: bool = True
+    STATUS_TRANSITION_MAX_IDS: int = 500
+    # Insertion des matchs par paquets (repli sans RPC, saveMatches)
+    MATCH_INSERT_CHUNK_SIZE: int = 500
+    MATCH_INSERT_CONCURRENCY: int = 4
+    # Export en flux des matchs (taille des pages lues en base)
+    EXPORT_PAGE_SIZE: int = 500
+
     # OPENAI
     OPENAI_API_KEY: str
     OPENAI_ASSISTANT_ID: str
+    # "stream" : événements du run consommés au fil de l'eau ; "poll" : interrogation avec backoff
+    OPENAI_RUN_MODE: str = "stream"
+    OPENAI_RUN_TIMEOUT: float = 120.0  # délai total d'un run (secondes)
+    OPENAI_POLL_INITIAL_INTERVAL: float = 0.2
+    OPENAI_POLL_MAX_INTERVAL: float = 2.0
+    OPENAI_POLL_BACKOFF: float = 1.5
+    # Cache disque des réponses de l'assistant (clé : hash canonique des entrées du prompt)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_DIR: str = ".cache/ai_planning"
+    AI_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    # Équipes dans le prompt : "names" (noms complets) ou "codes" (T01…, ré-associés aux équipes
+    # à la lecture de la réponse ; moins de tokens en entrée et surtout en sortie)
+    PLANNING_PROMPT_TEAMS: str = "names"
+
+    # Moteur de planification : "ai" (assistant OpenAI) ou "local" (déterministe, app/services/local_scheduler.py)
+    PLANNING_ENGINE: str = "ai"
+    PLANNING_LOCAL_FALLBACK: bool = False  # moteur local si l'appel à l'assistant échoue
+    # Contraintes horaires vérifiées sur la réponse de l'assistant avant sauvegarde :
+    # "warn" (journalisées), "reject" (planning refusé) ou "off"
+    PLANNING_VALIDATION: str = "warn"
+    # Réparation locale d'un planning non conforme (déplacements bornés) avant warn / reject
+    PLANNING_REPAIR: bool = True
+    PLANNING_REPAIR_MAX_MOVES: int = 200
+
+    # Génération en tâche de fond (POST /api/planning/generate?background=true)
+    PLANNING_JOB_WORKERS: int = 2
+    PLANNING_JOB_QUEUE_SIZE: int = 20  # tâches en attente + en cours
+    PLANNING_JOB_TIMEOUT: float = 180.0  # secondes, par tâche
+    PLANNING_JOB_RETENTION: int = 600  # secondes de suivi après la fin d'une tâche
 
     model_config = ConfigDict(
         env_file=".env",
@@ -1,50 +1,251 @@
-from supabase import create_client, Client
+import threading
+import httpx
+from supabase import Client
+from postgrest import SyncPostgrestClient, AsyncPostgrestClient
+from postgrest.utils import SyncClient as PostgrestSession
+from postgrest.utils import AsyncClient as AsyncPostgrestSession
 from typing import Optional
-from app.core.config import settings 
+from app.core.config import settings
+from app.core.local_backend import LocalSupabaseClient, AsyncLocalSupabaseClient, getLocalDatabase
 
 SUPABASE_URL = settings.SUPABASE_URL
-SUPABASE_KEY = settings.SUPABASE_KEY  
-SUPABASE_SERVICE_KEY = settings.SUPABASE_SERVICE_KEY 
+SUPABASE_KEY = settings.SUPABASE_KEY
+SUPABASE_SERVICE_KEY = settings.SUPABASE_SERVICE_KEY
 
 supabase: Optional[Client] = None
+asyncSupabase: Optional[AsyncPostgrestClient] = None
+_supabaseLock = threading.Lock()
+
+
+class ConnectionStats:
+    """
+    Compteurs du pool HTTP vers Supabase.
+
+    Branché sur l'extension "trace" de httpx : chaque ouverture TCP / TLS est
+    comptée, le reste des requêtes a donc réutilisé une connexion keep-alive.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.newConnections = 0
+            self.tlsHandshakes = 0
+
+    def trace(self, eventName: str, info: dict):
+        if eventName == "connection.connect_tcp.complete":
+            with self._lock:
+                self.newConnections += 1
+        elif eventName == "connection.start_tls.complete":
+            with self._lock:
+                self.tlsHandshakes += 1
+
+    def onRequest(self, request: httpx.Request):
+        request.extensions["trace"] = self.trace
+
+    def onResponse(self, response: httpx.Response):
+        with self._lock:
+            self.requests += 1
+
+    def eventHooks(self) -> dict:
+        return {"request": [self.onRequest], "response": [self.onResponse]}
+
+    # httpx.AsyncClient exige des hooks et un callback "trace" asynchrones
+    async def atrace(self, eventName: str, info: dict):
+        self.trace(eventName, info)
+
+    async def onRequestAsync(self, request: httpx.Request):
+        request.extensions["trace"] = self.atrace
+
+    async def onResponseAsync(self, response: httpx.Response):
+        self.onResponse(response)
+
+    def asyncEventHooks(self) -> dict:
+        return {"request": [self.onRequestAsync], "response": [self.onResponseAsync]}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.newConnections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.newConnections,
+                "reused_connections": reused,
+                "tls_handshakes": self.tlsHandshakes,
+                "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0
+            }
+
+connectionStats = ConnectionStats()
+
+
+def _poolLimits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY
+    )
+
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """Client PostgREST avec un pool keep-alive configurable et instrumenté"""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> PostgrestSession:
+        return PostgrestSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=settings.SUPABASE_HTTP2,
+            limits=_poolLimits(),
+            event_hooks=connectionStats.eventHooks()
+        )
+
+
+class AsyncPooledPostgrestClient(AsyncPostgrestClient):
+    """Équivalent asynchrone de PooledPostgrestClient (httpx.AsyncClient)"""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> AsyncPostgrestSession:
+        return AsyncPostgrestSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=settings.SUPABASE_HTTP2,
+            limits=_poolLimits(),
+            event_hooks=connectionStats.asyncEventHooks()
+        )
+
+
+class PooledSupabaseClient(Client):
+    """Client Supabase dont les requêtes PostgREST passent par le pool partagé"""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=None, verify=True, proxy=None):
+        return PooledPostgrestClient(
+            rest_url,
+            headers=headers,
+            schema=schema,
+            timeout=settings.SUPABASE_TIMEOUT,
+            verify=verify,
+            proxy=proxy
+        )
+
+
+def _useLocalBackend() -> bool:
+    return settings.DATABASE_BACKEND.lower() == "local"
 
 def initSupabase():
+    """Construit le client partagé s'il n'existe pas encore (thread-safe)"""
     global supabase
 
     if SUPABASE_URL is None:
         raise Exception("SUPABASE_URL manquant dans les variables d'environnement")
     if SUPABASE_KEY is None:
         raise Exception("SUPABASE_KEY manquant dans les variables d'environnement")
-    
+
     if SUPABASE_SERVICE_KEY is None:
         raise Exception("SUPABASE_SERVICE_KEY manquant dans les variables d'environnement")
-    
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
-        print("Connexion à Supabase !")
-    except Exception as e:
-        print(f"Erreur : {e}")
-        raise
+    with _supabaseLock:
+        if supabase is not None:
+            return supabase
+        try:
+            if _useLocalBackend():
+                supabase = LocalSupabaseClient(getLocalDatabase())
+                print("Backend local (en mémoire) !")
+                return supabase
+
+            supabase = PooledSupabaseClient.create(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+            print("Connexion à Supabase !")
+        except Exception as e:
+            print(f"Erreur : {e}")
+            raise
+    return supabase
 
 def getSupabase():
-    initSupabase()
+    # Chemin rapide sans verrou : le client est construit une seule fois par process
+    if supabase is None:
+        initSupabase()
     if supabase is None:
         raise Exception("Supabase pas initialisé - appeler init_supabase() d'abord")
-    
+
     return supabase
 
+def closeSupabase():
+    """Ferme les connexions HTTP du client partagé (arrêt de l'application)"""
+    global supabase
+
+    with _supabaseLock:
+        if supabase is None:
+            return
+        try:
+            if supabase._postgrest is not None:
+                supabase._postgrest.aclose()
+            print("Connexions Supabase fermées")
+        except Exception as e:
+            print(f"Erreur fermeture Supabase : {e}")
+        finally:
+            supabase = None
+
+def getAsyncSupabase() -> AsyncPostgrestClient:
+    """
+    Retourne le client PostgREST asynchrone partagé (construit à la demande).
+
+    Il expose la même API de requêtes que getSupabase() (table/select/eq/...),
+    mais execute() est une coroutine : les routes async ne bloquent plus la boucle.
+    """
+    global asyncSupabase
+
+    if asyncSupabase is None:
+        with _supabaseLock:
+            if asyncSupabase is None and _useLocalBackend():
+                asyncSupabase = AsyncLocalSupabaseClient(getLocalDatabase())
+            elif asyncSupabase is None:
+                asyncSupabase = AsyncPooledPostgrestClient(
+                    f"{SUPABASE_URL}/rest/v1",
+                    headers={
+                        "apiKey": SUPABASE_SERVICE_KEY,
+                        "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}"
+                    },
+                    timeout=settings.SUPABASE_TIMEOUT
+                )
+    return asyncSupabase
+
+async def closeAsyncSupabase():
+    """Ferme les connexions HTTP du client asynchrone partagé"""
+    global asyncSupabase
+
+    client = asyncSupabase
+    asyncSupabase = None
+    if client is None:
+        return
+    try:
+        await client.aclose()
+    except Exception as e:
+        print(f"Erreur fermeture Supabase async : {e}")
+
+def getConnectionStats() -> dict:
+    """Retourne les compteurs de réutilisation du pool HTTP"""
+    return connectionStats.snapshot()
+
 def testConnection():
     try:
         db = getSupabase()
-        
+
         # Test simple - récupérer les tournois (même s'il n'y en a pas)
         result = db.table("tournaments").select("id").limit(1).execute()
-        
+
         print("✅ Test connexion DB réussi")
         print(f"Données récupérées: {len(result.data)} lignes")
         return True
-        
+
     except Exception as e:
         print(f"❌ Test connexion échoué: {e}")
         return False
@@ -52,11 +253,11 @@ def testConnection():
 # Test rapide si on lance ce fichier directement
 if __name__ == "__main__":
     print("🔧 Test de la connexion Supabase...")
-    
+
     # Initialiser
     initSupabase()
-    
+
     # Tester
     testConnection()
-    
-    print("🎉 Test terminé !")
\ No newline at end of file
+
+    print("🎉 Test terminé !")
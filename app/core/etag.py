@@ -0,0 +1,27 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Response, status
+
+
+def computeEtag(*parts: Any) -> str:
+    """
+    ETag faible calculé à partir de quelques champs (id, updated_at, compteurs...)
+    plutôt que du payload sérialisé : coût constant, même pour un gros planning_data.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def etagMatches(ifNoneMatch: Optional[str], etag: Optional[str]) -> bool:
+    """Comparaison faible If-None-Match (liste séparée par des virgules, ou *)"""
+    if not ifNoneMatch or not etag:
+        return False
+    if ifNoneMatch.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in ifNoneMatch.split(","))
+
+
+def notModified(etag: str) -> Response:
+    """Réponse 304 sans corps"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
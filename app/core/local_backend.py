@@ -0,0 +1,651 @@
+"""
+Backend local compatible PostgREST (en mémoire).
+
+Remplace le client Supabase quand DATABASE_BACKEND=local : mêmes chaînes
+table().select().eq().single().execute(), mêmes réponses (APIResponse) et mêmes
+erreurs (APIError), sans projet Supabase. Sert aux tests, au profiling et aux
+benchmarks ; LOCAL_BACKEND_LATENCY_MS simule l'aller-retour réseau de chaque requête.
+"""
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, date, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from postgrest import APIError
+from postgrest.base_request_builder import APIResponse, SingleAPIResponse
+
+# Tables utilisées par l'application et leurs valeurs par défaut (côté DB)
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "tournament": {"status": "draft", "constraints": {}, "description": None, "start_time": None},
+    "team": {"status": "registered", "captain_id": None},
+    "team_member": {"role": "player", "position": None, "status": "active", "joined_at": "now"},
+    "profile": {},
+    "ai_tournament_planning": {"status": "generating", "planning_data": {}, "total_matches": 0},
+    "ai_generated_match": {"status": "scheduled", "poule_id": None, "journee": None,
+                           "resolved_equipe_a_id": None, "resolved_equipe_b_id": None},
+    "ai_generated_poule": {"equipes": [], "nb_equipes": 0, "nb_matches": 0},
+}
+
+# Tables sans colonne updated_at
+NO_UPDATED_AT = {"team_member", "ai_generated_match", "ai_generated_poule"}
+
+# Clés étrangères : table -> {colonne: table référencée}
+FOREIGN_KEYS: Dict[str, Dict[str, str]] = {
+    "team": {"tournament_id": "tournament", "captain_id": "profile"},
+    "team_member": {"team_id": "team", "user_id": "profile"},
+    "ai_tournament_planning": {"tournament_id": "tournament"},
+    "ai_generated_match": {"planning_id": "ai_tournament_planning"},
+    "ai_generated_poule": {"planning_id": "ai_tournament_planning"},
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ===== COMPARAISONS =====
+
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+
+def _comparable(value: Any) -> Any:
+    """Convertit une valeur (colonne ou filtre) dans un type comparable"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        text = value.strip('"')
+        if text in ("true", "false"):
+            return text == "true"
+        if _NUMBER.match(text):
+            return float(text)
+        if len(text) >= 10 and text[4:5] == "-" and text[7:8] == "-":
+            try:
+                return _comparable(datetime.fromisoformat(text.replace("Z", "+00:00")))
+            except ValueError:
+                pass
+        return text
+    return value
+
+
+def _compare(left: Any, right: Any) -> int:
+    a, b = _comparable(left), _comparable(right)
+    if type(a) is not type(b):
+        a, b = str(a), str(b)
+    return (a > b) - (a < b)
+
+
+@lru_cache(maxsize=256)
+def _likePattern(pattern: str, ignoreCase: bool) -> "re.Pattern":
+    """Motif LIKE (jokers % ou *, _ ; échappement par \\) -> expression régulière"""
+    regex, escaped = "", False
+    for char in pattern:
+        if escaped:
+            regex += re.escape(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in "%*":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        else:
+            regex += re.escape(char)
+    return re.compile(regex, re.DOTALL | (re.IGNORECASE if ignoreCase else 0))
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda cell, value: cell is not None and _compare(cell, value) == 0,
+    "neq": lambda cell, value: cell is not None and _compare(cell, value) != 0,
+    "gt": lambda cell, value: cell is not None and _compare(cell, value) > 0,
+    "gte": lambda cell, value: cell is not None and _compare(cell, value) >= 0,
+    "lt": lambda cell, value: cell is not None and _compare(cell, value) < 0,
+    "lte": lambda cell, value: cell is not None and _compare(cell, value) <= 0,
+    "in": lambda cell, values: cell is not None and any(_compare(cell, v) == 0 for v in values),
+    "is": lambda cell, value: cell is value if value in (None, True, False) else cell == value,
+    "like": lambda cell, value: cell is not None and _likePattern(value, False).fullmatch(str(cell)) is not None,
+    "ilike": lambda cell, value: cell is not None and _likePattern(value, True).fullmatch(str(cell)) is not None,
+}
+
+
+def _splitTopLevel(text: str) -> List[str]:
+    """Découpe sur les virgules hors parenthèses et hors guillemets"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _parseLogicTree(text: str) -> Callable[[dict], bool]:
+    """
+    Parse un filtre logique PostgREST ("a.eq.1,and(b.gt.2,c.lt.3)")
+    et retourne le prédicat OR correspondant
+    """
+    predicates = [_parseCondition(part) for part in _splitTopLevel(text)]
+    return lambda row: any(predicate(row) for predicate in predicates)
+
+
+def _parseCondition(text: str) -> Callable[[dict], bool]:
+    for keyword, combine in (("and(", all), ("or(", any)):
+        if text.startswith(keyword) and text.endswith(")"):
+            predicates = [_parseCondition(part) for part in _splitTopLevel(text[len(keyword):-1])]
+            return lambda row, predicates=predicates, combine=combine: combine(p(row) for p in predicates)
+
+    column, operator, value = text.split(".", 2)
+    negate = operator == "not"
+    if negate:
+        operator, value = value.split(".", 1)
+    if operator == "in":
+        value = [part.strip('"') for part in _splitTopLevel(value.strip("()"))]
+    elif operator == "is":
+        value = {"null": None, "true": True, "false": False}.get(value, value)
+    else:
+        value = value.strip('"')
+
+    check = _OPERATORS[operator]
+    if negate:
+        return lambda row: not check(row.get(column), value)
+    return lambda row: check(row.get(column), value)
+
+
+# ===== SELECT AVEC RELATIONS EMBARQUÉES =====
+
+class _SelectNode:
+    """Arbre d'un select PostgREST : colonnes, relations embarquées, count"""
+
+    def __init__(self, text: str):
+        self.star = False
+        self.count = False
+        self.columns: List[Tuple[str, str]] = []  # (alias, colonne)
+        self.embeds: List[Tuple[str, str, bool, "_SelectNode"]] = []  # (alias, table, inner, noeud)
+
+        text = (text or "*").replace(" ", "").replace("\n", "")
+        for item in _splitTopLevel(text):
+            if item == "*":
+                self.star = True
+            elif item == "count":
+                self.count = True
+            elif "(" in item:
+                head, inner = item.split("(", 1)
+                alias, _, relation = head.rpartition(":")
+                relation, _, hint = relation.partition("!")
+                self.embeds.append((alias or relation, relation, hint == "inner", _SelectNode(inner[:-1])))
+            else:
+                alias, _, column = item.rpartition(":")
+                column = column.split("::")[0]
+                self.columns.append((alias or column, column))
+        if not (self.star or self.count or self.columns or self.embeds):
+            self.star = True
+
+
+class LocalDatabase:
+    """
+    Base en mémoire partagée par les clients locaux.
+
+    Chaque execute() compte pour un aller-retour (requestCount) et attend
+    latencyMs millisecondes hors verrou, comme une vraie requête réseau.
+    """
+
+    def __init__(self, latencyMs: float = 0.0):
+        self.lock = threading.RLock()
+        self.latencyMs = latencyMs
+        self.rpcs: Dict[str, Callable[["LocalDatabase", dict], Any]] = {}
+        self.reset()
+        # Équivalents des fonctions Postgres de supabase/migrations
+        self.registerRpc("save_planning_atomic", _savePlanningAtomic)
+        self.registerRpc("transition_status", _transitionStatus)
+
+    def reset(self):
+        with self.lock:
+            self.tables: Dict[str, List[dict]] = {name: [] for name in TABLE_DEFAULTS}
+            self.invitations: List[str] = []
+            self.requestCount = 0
+
+    def seed(self, data: Dict[str, List[dict]]):
+        """Charge des lignes (dict table -> liste de lignes) avec les valeurs par défaut"""
+        with self.lock:
+            for table, rows in data.items():
+                for row in rows:
+                    self.tables.setdefault(table, []).append(self._withDefaults(table, row))
+
+    def loadSeedFile(self, path: str):
+        with open(path, encoding="utf-8") as seedFile:
+            self.seed(json.load(seedFile))
+
+    def registerRpc(self, name: str, function: Callable[["LocalDatabase", dict], Any]):
+        """Déclare une fonction appelable via client.rpc(name, params)"""
+        self.rpcs[name] = function
+
+    def rows(self, table: str) -> List[dict]:
+        if table not in self.tables:
+            raise APIError({"message": f'relation "public.{table}" does not exist', "code": "42P01"})
+        return self.tables[table]
+
+    def startRoundTrip(self) -> float:
+        with self.lock:
+            self.requestCount += 1
+        return self.latencyMs / 1000.0
+
+    def _withDefaults(self, table: str, row: dict) -> dict:
+        row = json.loads(json.dumps(row))  # même contrainte qu'un envoi JSON réel
+        filled = {"id": str(uuid.uuid4())}
+        for column, default in TABLE_DEFAULTS.get(table, {}).items():
+            filled[column] = _now() if default == "now" else copy.deepcopy(default)
+        filled["created_at"] = _now()
+        if table not in NO_UPDATED_AT:
+            filled["updated_at"] = _now()
+        filled.update({key: value for key, value in row.items()})
+        return filled
+
+    # ----- Projection des relations -----
+
+    def project(self, table: str, row: dict, node: _SelectNode, embedOptions: dict) -> Optional[dict]:
+        result = dict(row) if node.star else {}
+        for alias, column in node.columns:
+            result[alias] = row.get(column)
+
+        for alias, relation, inner, child in node.embeds:
+            fk = FOREIGN_KEYS.get(table, {})
+            parentColumn = next((col for col, ref in fk.items() if ref == relation), None)
+            if parentColumn:
+                # many-to-one : objet (ou None)
+                target = next((r for r in self.rows(relation) if r.get("id") == row.get(parentColumn)), None)
+                value = self.project(relation, target, child, {}) if target else None
+                if inner and value is None:
+                    return None
+                result[alias] = value
+                continue
+
+            childColumn = next((col for col, ref in FOREIGN_KEYS.get(relation, {}).items() if ref == table), None)
+            if childColumn is None:
+                raise APIError({
+                    "message": f"Could not find a relationship between '{table}' and '{relation}'",
+                    "code": "PGRST200"
+                })
+            children = [r for r in self.rows(relation) if r.get(childColumn) == row.get("id")]
+            if child.count and not (child.star or child.columns or child.embeds):
+                result[alias] = [{"count": len(children)}]
+                continue
+            children = _applyOrderAndRange(children, embedOptions.get(alias, {}))
+            projected = [p for p in (self.project(relation, r, child, {}) for r in children) if p is not None]
+            if inner and not projected:
+                return None
+            result[alias] = projected
+        return result
+
+
+def _applyOrderAndRange(rows: List[dict], options: dict) -> List[dict]:
+    for column, desc, nullsfirst in reversed(options.get("order", [])):
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: _SortKey(r.get(column)), reverse=desc)
+        # Comme PostgreSQL : NULLS LAST en ASC, NULLS FIRST en DESC
+        rows = missing + present if (nullsfirst or desc) else present + missing
+    start = options.get("offset", 0)
+    limit = options.get("limit")
+    return rows[start:start + limit] if limit is not None else rows[start:]
+
+
+class _SortKey:
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        return _compare(self.value, other.value) < 0
+
+
+class LocalQueryBuilder:
+    """
+    Constructeur de requête compatible avec postgrest-py
+    (select/insert/upsert/update/delete + filtres, order, limit, range, single)
+    """
+
+    def __init__(self, db: LocalDatabase, table: Optional[str]):
+        self.db = db
+        self.table = table
+        self.operation = "select"
+        self.selectNode = _SelectNode("*")
+        self.payload: Any = None
+        self.filters: List[Callable[[dict], bool]] = []
+        self.options: Dict[Optional[str], dict] = {}
+        self.singleMode: Optional[str] = None
+        self.countMethod = None
+        self.returning = "representation"
+        self.onConflict = "id"
+        self.ignoreDuplicates = False
+        self.rpcName: Optional[str] = None
+
+    # ----- Opérations -----
+
+    def select(self, *columns: str, count=None, head=None):
+        self.operation = "select"
+        self.selectNode = _SelectNode(",".join(columns) if columns else "*")
+        self.countMethod = count
+        return self
+
+    def insert(self, json, *, count=None, returning="representation", upsert=False, default_to_null=True):
+        self.operation = "upsert" if upsert else "insert"
+        self.payload = json
+        self.countMethod = count
+        self.returning = str(getattr(returning, "value", returning))
+        return self
+
+    def upsert(self, json, *, count=None, returning="representation", ignore_duplicates=False,
+               on_conflict="", default_to_null=True):
+        self.insert(json, count=count, returning=returning, upsert=True)
+        self.onConflict = on_conflict or "id"
+        self.ignoreDuplicates = ignore_duplicates
+        return self
+
+    def update(self, json, *, count=None, returning="representation"):
+        self.operation = "update"
+        self.payload = json
+        self.countMethod = count
+        self.returning = str(getattr(returning, "value", returning))
+        return self
+
+    def delete(self, *, count=None, returning="representation"):
+        self.operation = "delete"
+        self.countMethod = count
+        self.returning = str(getattr(returning, "value", returning))
+        return self
+
+    def rpcCall(self, name: str, params: Optional[dict]):
+        self.operation = "rpc"
+        self.rpcName = name
+        self.payload = params or {}
+        return self
+
+    # ----- Filtres -----
+
+    def _filter(self, operator: str, column: str, value: Any):
+        check = _OPERATORS[operator]
+        self.filters.append(lambda row: check(row.get(column), value))
+        return self
+
+    def eq(self, column, value): return self._filter("eq", column, value)
+    def neq(self, column, value): return self._filter("neq", column, value)
+    def gt(self, column, value): return self._filter("gt", column, value)
+    def gte(self, column, value): return self._filter("gte", column, value)
+    def lt(self, column, value): return self._filter("lt", column, value)
+    def lte(self, column, value): return self._filter("lte", column, value)
+    def like(self, column, pattern): return self._filter("like", column, pattern)
+    def ilike(self, column, pattern): return self._filter("ilike", column, pattern)
+    def is_(self, column, value):
+        value = {"null": None, "true": True, "false": False}.get(value, value) if isinstance(value, str) else value
+        return self._filter("is", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        self.filters.append(_parseLogicTree(filters))
+        return self
+
+    def match(self, query: dict):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    # ----- Tri / pagination -----
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False, foreign_table: Optional[str] = None):
+        self.options.setdefault(foreign_table, {}).setdefault("order", []).append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, *, foreign_table: Optional[str] = None):
+        self.options.setdefault(foreign_table, {})["limit"] = size
+        return self
+
+    def range(self, start: int, end: int, foreign_table: Optional[str] = None):
+        options = self.options.setdefault(foreign_table, {})
+        options["offset"] = start
+        options["limit"] = end - start + 1
+        return self
+
+    def single(self):
+        self.singleMode = "single"
+        return self
+
+    def maybe_single(self):
+        self.singleMode = "maybe"
+        return self
+
+    # ----- Exécution -----
+
+    def execute(self):
+        delay = self.db.startRoundTrip()
+        if delay:
+            time.sleep(delay)
+        return self._run()
+
+    def _run(self):
+        with self.db.lock:
+            if self.operation == "rpc":
+                function = self.db.rpcs.get(self.rpcName)
+                if function is None:
+                    raise APIError({"message": f"Could not find the function public.{self.rpcName}", "code": "PGRST202"})
+                result = function(self.db, copy.deepcopy(self.payload))
+                if isinstance(result, list):
+                    return APIResponse(data=copy.deepcopy(result))
+                return SingleAPIResponse(data=copy.deepcopy(result))
+
+            rows = self.db.rows(self.table)
+            if self.operation in ("insert", "upsert"):
+                data = self._insert(rows)
+            elif self.operation == "update":
+                data = self._update(rows)
+            elif self.operation == "delete":
+                data = self._delete(rows)
+            else:
+                data = [row for row in rows if all(check(row) for check in self.filters)]
+
+            total = len(data)
+            data = _applyOrderAndRange(data, self.options.get(None, {}))
+            embedOptions = {key: value for key, value in self.options.items() if key}
+            projected = [self.db.project(self.table, row, self.selectNode, embedOptions) for row in data]
+            projected = copy.deepcopy([row for row in projected if row is not None])
+            if self.operation != "select" and self.returning == "minimal":
+                projected = []
+
+        count = total if self.countMethod else None
+        if self.singleMode:
+            if len(projected) != 1:
+                if self.singleMode == "maybe" and not projected:
+                    return None
+                raise APIError({
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "code": "PGRST116",
+                    "details": f"The result contains {len(projected)} rows"
+                })
+            return SingleAPIResponse(data=projected[0], count=count)
+        return APIResponse(data=projected, count=count)
+
+    def _insert(self, rows: List[dict]) -> List[dict]:
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        conflictColumns = [col.strip() for col in self.onConflict.split(",")]
+        written, inserted = [], []
+        for newRow in payload:
+            if self.operation == "upsert":
+                existing = next(
+                    (r for r in rows if all(r.get(c) == newRow.get(c) for c in conflictColumns if c in newRow)
+                     and all(c in newRow for c in conflictColumns)),
+                    None
+                )
+                if existing is not None:
+                    if not self.ignoreDuplicates:
+                        existing.update(json.loads(json.dumps(newRow)))
+                        if self.table not in NO_UPDATED_AT and "updated_at" not in newRow:
+                            existing["updated_at"] = _now()
+                        written.append(existing)
+                    continue
+            row = self.db._withDefaults(self.table, newRow)
+            if any(r.get("id") == row["id"] for r in rows):
+                # Une requête = une transaction : les lignes déjà ajoutées sont retirées
+                rows[:] = [r for r in rows if not any(r is w for w in inserted)]
+                raise APIError({
+                    "message": f'duplicate key value violates unique constraint "{self.table}_pkey"',
+                    "code": "23505"
+                })
+            rows.append(row)
+            inserted.append(row)
+            written.append(row)
+        return written
+
+    def _update(self, rows: List[dict]) -> List[dict]:
+        changes = json.loads(json.dumps(self.payload))
+        updated = []
+        for row in rows:
+            if all(check(row) for check in self.filters):
+                row.update(changes)
+                updated.append(row)
+        return updated
+
+    def _delete(self, rows: List[dict]) -> List[dict]:
+        deleted = [row for row in rows if all(check(row) for check in self.filters)]
+        rows[:] = [row for row in rows if not any(row is d for d in deleted)]
+        return deleted
+
+
+class AsyncLocalQueryBuilder(LocalQueryBuilder):
+    """Même constructeur, mais execute() est une coroutine (latence via asyncio.sleep)"""
+
+    async def execute(self):
+        delay = self.db.startRoundTrip()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._run()
+
+
+class _LocalAdminAuth:
+    def __init__(self, db: LocalDatabase):
+        self.db = db
+
+    def invite_user_by_email(self, email: str, options: Optional[dict] = None) -> dict:
+        delay = self.db.startRoundTrip()
+        if delay:
+            time.sleep(delay)
+        with self.db.lock:
+            self.db.invitations.append(email)
+        return {"email": email}
+
+
+class _LocalAuth:
+    def __init__(self, db: LocalDatabase):
+        self.admin = _LocalAdminAuth(db)
+
+
+class LocalSupabaseClient:
+    """Remplaçant du client Supabase synchrone (table, from_, rpc, auth.admin)"""
+
+    builderClass = LocalQueryBuilder
+
+    def __init__(self, db: LocalDatabase):
+        self.db = db
+        self.auth = _LocalAuth(db)
+        self._postgrest = None
+
+    def table(self, tableName: str) -> LocalQueryBuilder:
+        return self.builderClass(self.db, tableName)
+
+    def from_(self, tableName: str) -> LocalQueryBuilder:
+        return self.table(tableName)
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> LocalQueryBuilder:
+        return self.builderClass(self.db, None).rpcCall(fn, params)
+
+
+class AsyncLocalSupabaseClient(LocalSupabaseClient):
+    """Remplaçant du client PostgREST asynchrone"""
+
+    builderClass = AsyncLocalQueryBuilder
+
+    async def aclose(self):
+        pass
+
+
+# ===== FONCTIONS RPC (équivalents de supabase/migrations) =====
+
+def _insertAll(db: LocalDatabase, table: str, newRows: List[dict]) -> List[str]:
+    rows = db.rows(table)
+    ids = []
+    for newRow in newRows:
+        row = db._withDefaults(table, newRow)
+        if any(r.get("id") == row["id"] for r in rows):
+            raise APIError({
+                "message": f'duplicate key value violates unique constraint "{table}_pkey"',
+                "code": "23505"
+            })
+        rows.append(row)
+        ids.append(row["id"])
+    return ids
+
+
+def _savePlanningAtomic(db: LocalDatabase, params: dict) -> dict:
+    """save_planning_atomic : tout ou rien sur les trois tables, renvoie les ids"""
+    tables = ("ai_tournament_planning", "ai_generated_match", "ai_generated_poule")
+    snapshot = {table: list(db.rows(table)) for table in tables}
+    try:
+        planningIds = _insertAll(db, "ai_tournament_planning", [params["p_planning"]])
+        matchIds = _insertAll(db, "ai_generated_match", params.get("p_matches") or [])
+        pouleIds = _insertAll(db, "ai_generated_poule", params.get("p_poules") or [])
+    except Exception:
+        # ROLLBACK
+        for table, rows in snapshot.items():
+            db.tables[table] = rows
+        raise
+    return {"planning_id": planningIds[0], "match_ids": matchIds, "poule_ids": pouleIds}
+
+
+def _transitionStatus(db: LocalDatabase, params: dict) -> List[str]:
+    """transition_status : UPDATE ... WHERE id = any(p_ids) AND status = p_expected, renvoie les ids"""
+    if params["p_table"] not in ("ai_tournament_planning", "tournament"):
+        raise APIError({"message": f"transition_status: table non autorisée {params['p_table']}", "code": "P0001"})
+    ids = set(params["p_ids"])
+    transitioned = []
+    for row in db.rows(params["p_table"]):
+        if row.get("id") in ids and row.get("status") == params["p_expected"]:
+            row["status"] = params["p_status"]
+            row["updated_at"] = _now()
+            transitioned.append(row["id"])
+    return transitioned
+
+
+_localDatabase: Optional[LocalDatabase] = None
+_localDatabaseLock = threading.Lock()
+
+def getLocalDatabase() -> LocalDatabase:
+    """Retourne la base locale du process (créée et éventuellement seedée au premier appel)"""
+    global _localDatabase
+
+    if _localDatabase is None:
+        from app.core.config import settings
+        with _localDatabaseLock:
+            if _localDatabase is None:
+                db = LocalDatabase(latencyMs=settings.LOCAL_BACKEND_LATENCY_MS)
+                if settings.LOCAL_BACKEND_SEED_FILE:
+                    db.loadSeedFile(settings.LOCAL_BACKEND_SEED_FILE)
+                    print(f"Backend local seedé depuis {settings.LOCAL_BACKEND_SEED_FILE}")
+                _localDatabase = db
+    return _localDatabase
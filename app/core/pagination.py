@@ -0,0 +1,47 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pagination par clé (keyset) sur (created_at, id) : chaque page repart de la
+# dernière ligne vue au lieu d'un OFFSET, coût constant quelle que soit la page.
+
+
+def encodeCursor(row: Dict[str, Any]) -> str:
+    """Curseur opaque (base64 url-safe) construit depuis la dernière ligne de la page"""
+    raw = json.dumps([str(row["created_at"]), str(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decodeCursor(cursor: str) -> Tuple[str, str]:
+    """Retourne (created_at, id) ; ValueError si le curseur est invalide"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        createdAt, rowId = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(createdAt), str(rowId)
+    except Exception as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+
+
+def applyKeyset(query, cursor: Optional[str], limit: int):
+    """
+    Ajoute au query builder l'ordre (created_at, id), le filtre "après le curseur"
+    et limit + 1 (la ligne en trop indique qu'une page suivante existe)
+    """
+    if cursor:
+        createdAt, rowId = decodeCursor(cursor)
+        query = keysetAfter(query, "created_at", createdAt, rowId)
+    return query.order("created_at").order("id").limit(limit + 1)
+
+
+def keysetAfter(query, column: str, value: Any, rowId: str):
+    """Filtre "strictement après (value, rowId)" pour un ordre (column, id)"""
+    return query.or_(f'{column}.gt."{value}",and({column}.eq."{value}",id.gt."{rowId}")')
+
+
+def splitPage(rows: Optional[List[Dict[str, Any]]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Coupe le résultat à limit lignes et calcule next_cursor (None sur la dernière page)"""
+    rows = rows or []
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encodeCursor(page[-1])
@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Iterable, List
+from postgrest import APIError
+from app.core.config import settings
+
+# Transitions de statut en lot, avec contrôle de concurrence optimiste : une ligne
+# ne change que si elle est encore dans le statut attendu, en un seul
+# UPDATE ... WHERE id IN (...) AND status = expected.
+#
+# Chemin principal : fonction Postgres transition_status (supabase/migrations),
+# qui ne renvoie que les ids. Repli si elle n'est pas déployée : update PostgREST
+# filtré, dont la représentation complète sert à lire les ids modifiés.
+
+
+def transitionStatus(client, table: str, ids: Iterable[str], expectedStatus: str, newStatus: str) -> dict:
+    """
+    Args:
+        client: client Supabase / PostgREST synchrone
+        table: "ai_tournament_planning" ou "tournament"
+
+    Returns:
+        dict: {"expected_status", "new_status", "transitioned": [ids], "skipped": [ids]}
+        (skipped : id inconnu ou statut courant différent de expectedStatus)
+    """
+    ids = _uniqueIds(ids)
+    if not ids:
+        return _report(ids, [], expectedStatus, newStatus)
+
+    if settings.STATUS_TRANSITION_RPC:
+        try:
+            result = client.rpc("transition_status", _rpcParams(table, ids, expectedStatus, newStatus)).execute()
+            return _report(ids, result.data or [], expectedStatus, newStatus)
+        except APIError as e:
+            if e.code != "PGRST202":
+                raise
+            print("⚠️ Fonction transition_status absente : update filtré")
+
+    result = _updateQuery(client, table, ids, expectedStatus, newStatus).execute()
+    return _report(ids, [row["id"] for row in result.data or []], expectedStatus, newStatus)
+
+
+async def transitionStatusAsync(client, table: str, ids: Iterable[str], expectedStatus: str, newStatus: str) -> dict:
+    """Version asynchrone de transitionStatus (client PostgREST async)"""
+    ids = _uniqueIds(ids)
+    if not ids:
+        return _report(ids, [], expectedStatus, newStatus)
+
+    if settings.STATUS_TRANSITION_RPC:
+        try:
+            result = await client.rpc("transition_status", _rpcParams(table, ids, expectedStatus, newStatus)).execute()
+            return _report(ids, result.data or [], expectedStatus, newStatus)
+        except APIError as e:
+            if e.code != "PGRST202":
+                raise
+            print("⚠️ Fonction transition_status absente : update filtré")
+
+    result = await _updateQuery(client, table, ids, expectedStatus, newStatus).execute()
+    return _report(ids, [row["id"] for row in result.data or []], expectedStatus, newStatus)
+
+
+def _uniqueIds(ids: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(ids))
+
+
+def _rpcParams(table: str, ids: List[str], expectedStatus: str, newStatus: str) -> dict:
+    return {"p_table": table, "p_ids": ids, "p_expected": expectedStatus, "p_status": newStatus}
+
+
+def _updateQuery(client, table: str, ids: List[str], expectedStatus: str, newStatus: str):
+    return client.table(table)\
+        .update({"status": newStatus, "updated_at": datetime.now().isoformat()})\
+        .in_("id", ids)\
+        .eq("status", expectedStatus)
+
+
+def _report(ids: List[str], transitionedIds: List[str], expectedStatus: str, newStatus: str) -> dict:
+    transitioned = set(str(rowId) for rowId in transitionedIds)
+    return {
+        "expected_status": expectedStatus,
+        "new_status": newStatus,
+        "transitioned": [rowId for rowId in ids if rowId in transitioned],
+        "skipped": [rowId for rowId in ids if rowId not in transitioned]
+    }
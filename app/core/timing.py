@@ -0,0 +1,24 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StageTimer:
+    """Chronomètre par étape (ms), pour tracer les pipelines"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(self.timings.get(name, 0.0) + (time.perf_counter() - start) * 1000, 3)
+
+    def total(self) -> float:
+        return round(sum(self.timings.values()), 3)
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}={ms:.1f}ms" for name, ms in self.timings.items())
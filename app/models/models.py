@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, time 
 
 class Tournament(BaseModel):
@@ -132,6 +132,9 @@ class AIPlanningData(BaseModel):
         for poule in self.poules:
             total += len(poule.matchs)
         
+        # Élimination directe
+        total += len(self.elimination_rounds_matches())
+
         # Phase d'élimination après poules
         if self.phase_elimination_apres_poules:
             total += len(self.phase_elimination_apres_poules.quarts)
@@ -143,6 +146,39 @@ class AIPlanningData(BaseModel):
         
         return total
 
+    def iter_matches(self):
+        """(match, phase, poule_id) dans l'ordre : round robin, poules, élimination directe, élimination"""
+        for match in self.matchs_round_robin:
+            yield match, "round_robin", None
+
+        for poule in self.poules:
+            for match in poule.matchs:
+                yield match, "poules", poule.poule_id
+
+        for roundName, match in self.elimination_rounds_matches():
+            yield match, "finale" if roundName == "finale" else "elimination", None
+
+        elimination = self.phase_elimination_apres_poules
+        if not elimination:
+            return
+        for match in elimination.quarts + elimination.demi_finales:
+            yield match, "elimination", None
+        if elimination.finale:
+            yield elimination.finale, "finale", None
+        if elimination.match_troisieme_place:
+            yield elimination.match_troisieme_place, "elimination", None
+
+    def elimination_rounds_matches(self) -> List[Tuple[str, EliminationMatch]]:
+        """(tour, match) de rounds_elimination : {tour: [matchs]} ou {tour: match} ; entrées invalides ignorées"""
+        matches = []
+        for roundName, roundMatches in self.rounds_elimination.items():
+            for match in roundMatches if isinstance(roundMatches, list) else [roundMatches]:
+                try:
+                    matches.append((roundName, EliminationMatch(**match)))
+                except Exception as e:
+                    print(f"⚠️ Match élimination invalide ignore ({roundName}): {e}")
+        return matches
+
 class AITournamentPlanning(BaseModel):
     """Planning généré par l'IA (table principale)"""
     
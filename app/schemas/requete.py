@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from app.core.config import settings
 
 class GeneratePlanningRequest(BaseModel):
     """Requête pour générer un planning"""
@@ -12,6 +13,24 @@ class RegeneratePlanningRequest(BaseModel):
     planning_id: str = Field(..., description="ID du planning à régénérer (UUID)")
 
 
+class MatchResultRequest(BaseModel):
+    """Résultat d'un match, pour résoudre les placeholders winner_ / loser_"""
+    winner_team_id: str = Field(..., description="ID de l'équipe gagnante (UUID)")
+    loser_team_id: Optional[str] = Field(None, description="ID de l'équipe perdante (UUID)")
+
+
+class PouleRankingRequest(BaseModel):
+    """Classement final d'une poule, pour résoudre les placeholders 1er_ / 2e_"""
+    team_ids: List[str] = Field(..., min_length=1, description="IDs des équipes, 1er en premier")
+
+
+class BulkStatusTransitionRequest(BaseModel):
+    """Transition de statut en lot : seules les lignes encore dans expected_status changent"""
+    ids: List[str] = Field(..., min_length=1, max_length=settings.STATUS_TRANSITION_MAX_IDS, description="IDs (UUID)")
+    expected_status: str = Field(..., description="Statut courant attendu")
+    status: str = Field(..., description="Nouveau statut")
+
+
 class GetUserRequest(BaseModel):
     """Requête pour récupérer un utilisateur"""
     user_id: str = Field(..., description="ID de l'utilisateur (UUID)")
@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from app.models.models import (
     AITournamentPlanning, 
+    AIGeneratedMatch,
     Tournament, 
     Team, 
     Profile, 
@@ -20,11 +21,30 @@ class StandardResponse(BaseModel):
 class PlanningResponse(StandardResponse):
     """Réponse avec données de planning"""
     data: Optional[AITournamentPlanning] = None
+    changes: Optional[Dict[str, Any]] = None # régénération incrémentale : lignes écrites par table
 
 
+class PlanningDetailsResponse(StandardResponse):
+    """Réponse avec planning (colonnes demandées), matchs et poules"""
+    data: Optional[Dict[str, Any]] = None
+
+
+class MatchesResponse(StandardResponse):
+    """Réponse avec une liste de matchs générés"""
+    data: Optional[List[AIGeneratedMatch]] = None
+
+class CourtsNowNextResponse(StandardResponse):
+    """Réponse "en cours / suivant" par terrain"""
+    at: Optional[datetime] = None
+    data: Optional[List[Dict[str, Any]]] = None # [{terrain, current, next}]
+
+class ResolutionResponse(StandardResponse):
+    """Réponse d'une résolution de placeholders"""
+    data: Optional[Dict[str, Any]] = None # {"resolved": {match_id_ai: {colonne: team_id}}, "rows_written": int}
+
 class StatusResponse(StandardResponse):
-    """Réponse avec statut de planning"""
-    data: Optional[Dict[str, str]] = None
+    """Réponse avec statut de planning (et étape de la tâche de fond si elle est suivie)"""
+    data: Optional[Dict[str, Optional[str]]] = None
 
 class HealthResponse(BaseModel):
     """Réponse du health check"""
@@ -45,6 +65,8 @@ class DetailedHealthResponse(BaseModel):
 class TournamentResponse(StandardResponse):
     """Réponse avec données de tournoi"""
     data: Optional[list[Tournament]] = None
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None # None : dernière page
 
 
 class TournamentWithTeamsResponse(StandardResponse):
@@ -55,6 +77,8 @@ class TournamentWithTeamsResponse(StandardResponse):
 class TeamsResponse(StandardResponse):
     """Réponse avec liste d'équipes"""
     data: Optional[List[Team]] = None
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None # None : dernière page
 
 
 class TeamResponse(StandardResponse):
@@ -0,0 +1,86 @@
+"""
+Mesure le coût de la validation des contraintes horaires (app/services/schedule_validator.py).
+
+Usage :
+    python -m app.script.benchmark_schedule_validator --matches 2000 --courts 32 --repeat 20
+
+Deux plannings de `--matches` matchs (round robin du moteur local) : tel quel, puis avec
+une partie des matchs décalés au hasard pour produire des violations. Le temps est mesuré
+depuis le JSON (validation Pydantic comprise) et depuis un AIPlanningData déjà construit ;
+le planning perturbé est ensuite réparé (app/services/schedule_repair.py).
+"""
+import argparse
+import random
+import statistics
+import time as clock
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from app.models.models import AIPlanningData
+from app.services.local_scheduler import generateLocalPlanning
+from app.services.schedule_validator import validateSchedule
+from app.services.schedule_repair import repairSchedule
+
+
+def buildPlanning(nbMatches: int, courts: int) -> tuple:
+    """(tournoi, JSON) : round robin tronqué à nbMatches matchs"""
+    nbTeams = 2
+    while nbTeams * (nbTeams - 1) // 2 < nbMatches:
+        nbTeams += 1
+    tournament = SimpleNamespace(tournament_type="round_robin", courts_available=courts,
+                                 start_date=date(2025, 7, 15), start_time=time(9, 0),
+                                 match_duration_minutes=10, break_duration_minutes=2)
+    teams = [SimpleNamespace(name=f"Équipe {index + 1}", skill_level="amateur") for index in range(nbTeams)]
+    planning = generateLocalPlanning(tournament, teams)
+    planning["matchs_round_robin"] = planning["matchs_round_robin"][:nbMatches]
+    return tournament, planning
+
+
+def perturb(planning: dict, ratio: float, seed: int = 42) -> dict:
+    """Copie du planning dont `ratio` des matchs sont décalés de -30 à +30 minutes"""
+    rng = random.Random(seed)
+    matches = []
+    for match in planning["matchs_round_robin"]:
+        match = dict(match)
+        if rng.random() < ratio:
+            shift = timedelta(minutes=rng.randint(-30, 30))
+            for column in ("debut_horaire", "fin_horaire"):
+                match[column] = (datetime.fromisoformat(match[column]) + shift).isoformat()
+        matches.append(match)
+    return {**planning, "matchs_round_robin": matches}
+
+
+def measure(function, repeat: int) -> dict:
+    durations = []
+    for _ in range(repeat):
+        start = clock.perf_counter()
+        function()
+        durations.append((clock.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(durations), 2), "min_ms": round(min(durations), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du validateur de contraintes horaires")
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--courts", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--perturb", type=float, default=0.1, help="part des matchs décalés")
+    args = parser.parse_args()
+
+    tournament, planning = buildPlanning(args.matches, args.courts)
+    for label, data in (("moteur local", planning), ("perturbé", perturb(planning, args.perturb))):
+        parsed = AIPlanningData(**data)
+        report = validateSchedule(parsed, tournament)
+        fromJson = measure(lambda: validateSchedule(data, tournament), args.repeat)
+        sweepsOnly = measure(lambda: validateSchedule(parsed, tournament), args.repeat)
+        print(f"📊 {label}: {report['matches']} matchs, {len(report['violations'])} violation(s) {report['counts']}")
+        print(f"   depuis le JSON : {fromJson['median_ms']} ms (min {fromJson['min_ms']})")
+        print(f"   balayages seuls : {sweepsOnly['median_ms']} ms (min {sweepsOnly['min_ms']})")
+        if not report["valid"]:
+            repaired = repairSchedule(data, tournament, report)
+            repairTime = measure(lambda: repairSchedule(data, tournament, report), max(args.repeat // 4, 1))
+            print(f"   réparation : {len(repaired['moves'])} déplacement(s), valide={repaired['valid']}, "
+                  f"{repairTime['median_ms']} ms (min {repairTime['min_ms']})")
+
+
+if __name__ == "__main__":
+    main()
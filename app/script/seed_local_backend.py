@@ -0,0 +1,70 @@
+"""
+Génère un jeu de données pour le backend local (DATABASE_BACKEND=local).
+
+Usage :
+    python -m app.script.seed_local_backend seed.json --tournaments 200 --teams 16 --members 6
+puis LOCAL_BACKEND_SEED_FILE=seed.json LOCAL_BACKEND_LATENCY_MS=20 uvicorn main:app
+"""
+import argparse
+import json
+import uuid
+from datetime import date, timedelta
+
+
+def buildDataset(nbTournaments: int = 50, teamsPerTournament: int = 16, membersPerTeam: int = 6) -> dict:
+    """Construit {table: [lignes]} : tournois, équipes, profils et membres"""
+    data = {"tournament": [], "team": [], "profile": [], "team_member": []}
+    organizerId = str(uuid.uuid4())
+    data["profile"].append({"id": organizerId, "email": "organisateur@volley.com"})
+
+    for t in range(nbTournaments):
+        tournamentId = str(uuid.uuid4())
+        data["tournament"].append({
+            "id": tournamentId,
+            "name": f"Tournoi {t + 1}",
+            "description": "Tournoi généré pour les benchmarks",
+            "tournament_type": ("round_robin", "poules_elimination", "elimination_directe")[t % 3],
+            "max_teams": max(teamsPerTournament, 2),
+            "courts_available": 4,
+            "start_date": (date(2025, 7, 1) + timedelta(days=t)).isoformat(),
+            "start_time": "09:00:00",
+            "match_duration_minutes": 15,
+            "break_duration_minutes": 5,
+            "organizer_id": organizerId,
+            "status": "ready"
+        })
+        for e in range(teamsPerTournament):
+            teamId = str(uuid.uuid4())
+            data["team"].append({
+                "id": teamId,
+                "name": f"Équipe {t + 1}-{e + 1:02d}",
+                "description": "Équipe de test",
+                "tournament_id": tournamentId,
+                "contact_email": f"equipe{t}_{e}@volley.com",
+                "contact_phone": "0600000000",
+                "skill_level": "amateur",
+                "notes": ""
+            })
+            for m in range(membersPerTeam):
+                userId = str(uuid.uuid4())
+                data["profile"].append({"id": userId, "email": f"joueur{t}_{e}_{m}@volley.com"})
+                data["team_member"].append({
+                    "team_id": teamId,
+                    "user_id": userId,
+                    "role": "captain" if m == 0 else "player"
+                })
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère un seed JSON pour le backend local")
+    parser.add_argument("output")
+    parser.add_argument("--tournaments", type=int, default=50)
+    parser.add_argument("--teams", type=int, default=16)
+    parser.add_argument("--members", type=int, default=6)
+    args = parser.parse_args()
+
+    dataset = buildDataset(args.tournaments, args.teams, args.members)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(dataset, output, ensure_ascii=False)
+    print(f"✅ Seed écrit dans {args.output} ({sum(len(rows) for rows in dataset.values())} lignes)")
@@ -1,11 +1,28 @@
 import uuid
+import time
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Callable
+from app.core.config import settings
 from app.core.database import getSupabase
-from app.models.models import AITournamentPlanning, AIPlanningData
+from app.core.cache import invalidatePlanning
+from app.models.models import AITournamentPlanning, AIPlanningData, Team
 from app.services.tournament_service import tournamentService
 from app.services.openai_client_service import openai_service
 from app.services.database_service import databaseService
+from app.services.planning_jobs import planningJobQueue, QueueFullError
+from app.services.ai_response_cache import aiResponseCache, canonicalKey
+from app.services.local_scheduler import generateLocalPlanning, LUNCH_BREAK, DAY_END
+from app.services.schedule_validator import validateSchedule
+from app.services.schedule_repair import repairSchedule
+from app.services.team_codes import teamCodes, teamIdsByCode, decodeTeams
+
+
+# À incrémenter quand le texte de _buildStaticPrompt change : invalide le cache des réponses IA
+PROMPT_VERSION = 2
+# Contraintes fixes du prompt (font partie de la clé de cache)
+PROMPT_CONSTRAINTS = {"pause_sans_match": [bound.strftime("%H:%M") for bound in LUNCH_BREAK], "tous_les_terrains": True,
+                      "fin_journee": DAY_END.strftime("%H:%M")}
 
 
 class AIPlanningService():
@@ -15,63 +32,46 @@ class AIPlanningService():
         self.openAIService = openai_service
         self.databaseService = databaseService
         self.tournamentService = tournamentService
+        # tokens consommés par mode de prompt (PLANNING_PROMPT_TEAMS), pour ce process
+        self._usageLock = threading.Lock()
+        self._tokenUsage: Dict[str, dict] = {}
 
-    def generatePlanning(self, tournamentId: str) -> Optional[AITournamentPlanning]:
+    def generatePlanning(self,
+                         tournamentId: str,
+                         useCache: bool = True,
+                         engine: Optional[str] = None) -> Optional[AITournamentPlanning]:
         """
         Génère un planning complet pour un tournoi
         
         Args:
             tournament_id: ID du tournoi
+            useCache: False force un nouvel appel à l'assistant
+            engine: "ai" ou "local" (défaut : PLANNING_ENGINE)
             
         Returns:
             AITournamentPlanning si succès, None sinon
         """
         try: 
-
-            # recup donnees tournoi
-            tournamentData = self.tournamentService.getTournamentWithTeams(tournamentId)
-            if not tournamentData:
-                print("Impossible de récupérer les données du tournoi")
-                return None
-
-            # valide les donnees
-            isValidTournamentData = self.tournamentService._validateTournamentData(tournamentData)
-            if not isValidTournamentData:
-                print("Tournament data non valide")
-                return None
-            
-            # construction prompt
-            prompt = self._buildStaticPrompt(tournamentData)
-
-            # appel OpenAI
-            aiResponse = self.openAIService.generate_planning(prompt)
-            if not aiResponse:
-                print("Echec OpenAI")
+            requested = self._requestAIPlanning(tournamentId, useCache=useCache, engine=engine)
+            if not requested:
                 return None
+            tournamentData, aiResponse = requested
 
-            # sauvegarde via database service
+            # sauvegarde via database service (planning, matchs et poules, JSON validé une fois)
             tournament = tournamentData["tournament"]
-            planning = self.databaseService.savePlanning(
+            saved = self.databaseService.persistPlanning(
                 tournamentId,
                 aiResponse, 
                 tournament.tournament_type
             )
 
-            if not planning:
+            if not saved:
                 print("Echec sauvegarde planning")
                 return None
             
-            # sauvegarde les matchs
-            matches = self.databaseService.saveMatches(planning.id, aiResponse)
-            if matches is None:
-                print("Echec sauvegarde matchs - suppression planning")
-                self._deletePlanning(planning.id)
-                return None
-            
-            # sauvegarde les poules
-            poules = self.databaseService.savePoules(planning.id, aiResponse)
-            if poules is None:
-                print("Echec sauvegarde poules - suppression planning")
+            planning = saved["planning"]
+            if saved["failed_stage"]:
+                print(f"Echec sauvegarde ({saved['failed_stage']}) - suppression planning")
                 self._deletePlanning(planning.id)
                 return None
 
@@ -82,6 +82,260 @@ class AIPlanningService():
             print(f"Erreur generation planning: {e}")
             return None
     
+    def _requestAIPlanning(self,
+                           tournamentId: str,
+                           onStage: Optional[Callable[..., None]] = None,
+                           deadline: Optional[float] = None,
+                           useCache: bool = True,
+                           engine: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], dict]]:
+        """
+        Données du tournoi validées + JSON du planning, ou None si une étape échoue.
+        onStage est appelé à chaque étape (tâche de fond) ; deadline borne l'appel OpenAI.
+        Une réponse déjà obtenue pour les mêmes entrées est relue dans le cache disque,
+        sauf si useCache est False (elle est alors remplacée par la nouvelle).
+        Avec engine="local" (ou en repli, PLANNING_LOCAL_FALLBACK), le planning est
+        calculé par le moteur local, sans appel à l'assistant.
+        """
+        onStage = onStage or (lambda stage, error=None: None)
+
+        # recup donnees tournoi
+        onStage("loading_tournament")
+        tournamentData = self.tournamentService.getTournamentWithTeams(tournamentId)
+        if not tournamentData:
+            print("Impossible de récupérer les données du tournoi")
+            return None
+
+        # valide les donnees
+        isValidTournamentData = self.tournamentService._validateTournamentData(tournamentData)
+        if not isValidTournamentData:
+            print("Tournament data non valide")
+            return None
+
+        if (engine or settings.PLANNING_ENGINE) == "local":
+            return self._localPlanning(tournamentData, onStage)
+        
+        # équipes en codes courts si PLANNING_PROMPT_TEAMS="codes" : le cache garde la réponse
+        # brute (codes), décodée à chaque requête avec les équipes de ce tournoi-ci
+        promptTeams = settings.PLANNING_PROMPT_TEAMS
+        codes = teamCodes(tournamentData["teams"]) if promptTeams == "codes" else None
+
+        cacheKey = canonicalKey(self._promptInputs(tournamentData))
+        if useCache:
+            cached = aiResponseCache.get(cacheKey)
+            if cached:
+                print(f"✅ Réponse IA relue du cache ({cacheKey[:12]})")
+                return self._checkedResponse(tournamentData, self._decodedResponse(cached, codes), onStage)
+
+        prompt = self._buildStaticPrompt(tournamentData, codes)
+
+        # appel OpenAI
+        onStage("calling_ai")
+        usage: Dict[str, int] = {}
+        started = time.monotonic()
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        rawResponse = self.openAIService.generate_planning(prompt, timeout=timeout, on_usage=usage.update)
+        if usage:
+            self._recordUsage(promptTeams, usage, time.monotonic() - started)
+        aiResponse = self._decodedResponse(rawResponse, codes)
+        if not aiResponse:
+            print("Echec OpenAI")
+            if settings.PLANNING_LOCAL_FALLBACK:
+                print("↩️ Repli sur le moteur local")
+                return self._localPlanning(tournamentData, onStage)
+            onStage("calling_ai", "Échec de l'appel OpenAI")
+            return None
+
+        checked = self._checkedResponse(tournamentData, aiResponse, onStage)
+        if checked:
+            aiResponseCache.set(cacheKey, rawResponse)
+        return checked
+
+    def _decodedResponse(self, response: Optional[dict], codes: Optional[Dict[str, Any]]) -> Optional[dict]:
+        """
+        Réponse en codes -> noms dans les matchs et poules, Team.id dans final_ranking ; la table
+        des codes reste dans planning_data pour relire la réponse brute de l'assistant
+        """
+        if not response or not codes:
+            return response
+        return {**decodeTeams(response, codes), "team_codes": teamIdsByCode(codes)}
+
+    def _checkedResponse(self,
+                         tournamentData: Dict[str, Any],
+                         aiResponse: dict,
+                         onStage: Callable[..., None]) -> Optional[Tuple[Dict[str, Any], dict]]:
+        """
+        Contraintes horaires du prompt vérifiées sur la réponse avant sauvegarde (PLANNING_VALIDATION) :
+        "warn" journalise les violations, "reject" refuse le planning, "off" ne vérifie rien.
+        Un planning non conforme est d'abord réparé localement (PLANNING_REPAIR) plutôt que régénéré.
+        """
+        if settings.PLANNING_VALIDATION == "off":
+            return tournamentData, aiResponse
+
+        onStage("validating")
+        try:
+            report = validateSchedule(aiResponse, tournamentData["tournament"])
+        except Exception as e:
+            # JSON hors schéma : l'erreur remontera à la sauvegarde
+            print(f"⚠️ Validation du planning impossible: {e}")
+            return tournamentData, aiResponse
+
+        if report["valid"]:
+            return tournamentData, aiResponse
+        print(f"⚠️ Planning non conforme ({report['matches']} matchs): {report['counts']}")
+        if settings.PLANNING_REPAIR:
+            onStage("repairing")
+            repaired = repairSchedule(aiResponse, tournamentData["tournament"], report,
+                                      maxMoves=settings.PLANNING_REPAIR_MAX_MOVES)
+            if repaired["valid"]:
+                print(f"🔧 Planning réparé localement: {len(repaired['moves'])} déplacement(s), "
+                      f"{repaired['span_minutes_before']} -> {repaired['span_minutes_after']} min")
+                return tournamentData, repaired["planning"]
+            print(f"⚠️ Réparation incomplète: {repaired['error'] or repaired['violations_after']}")
+        if settings.PLANNING_VALIDATION == "reject":
+            onStage("validating", f"Contraintes non respectées: {report['counts']}")
+            return None
+        return tournamentData, aiResponse
+
+    def _localPlanning(self,
+                       tournamentData: Dict[str, Any],
+                       onStage: Callable[..., None]) -> Optional[Tuple[Dict[str, Any], dict]]:
+        """
+        Planning calculé par le moteur local (None si le type de tournoi n'est pas géré),
+        vérifié comme une réponse de l'assistant avant sauvegarde
+        """
+        onStage("scheduling")
+        try:
+            planning = generateLocalPlanning(tournamentData["tournament"], tournamentData["teams"])
+        except ValueError as e:
+            print(f"❌ Moteur local: {e}")
+            onStage("scheduling", str(e))
+            return None
+        print(f"✅ Planning calculé localement ({tournamentData['tournament'].tournament_type})")
+        return self._checkedResponse(tournamentData, planning, onStage)
+
+    def _promptInputs(self, tournamentData: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Forme canonique de ce qui détermine la réponse de l'assistant : l'ordre des
+        équipes et les champs sans effet sur le planning (nom, description) sont ignorés.
+        """
+        tournament = tournamentData["tournament"]
+        return {
+            "prompt_version": PROMPT_VERSION,
+            "prompt_teams": settings.PLANNING_PROMPT_TEAMS,
+            "assistant_id": self.openAIService.assistant_id,
+            "tournament_type": tournament.tournament_type,
+            "teams": sorted(team.name for team in tournamentData["teams"]),
+            "courts": tournament.courts_available,
+            "start_date": tournament.start_date,
+            "start_time": tournament.start_time or "09:00",
+            "match_duration_minutes": tournament.match_duration_minutes,
+            "break_duration_minutes": tournament.break_duration_minutes,
+            "constraints": {**PROMPT_CONSTRAINTS, **(tournament.constraints or {})}
+        }
+
+    def _recordUsage(self, promptTeams: str, usage: Dict[str, int], seconds: float) -> None:
+        """Journalise les tokens d'une génération et les cumule par mode de prompt"""
+        print(f"🔢 Tokens ({promptTeams}): prompt {usage['prompt_tokens']}, "
+              f"completion {usage['completion_tokens']} - {seconds:.1f} s")
+        with self._usageLock:
+            stats = self._tokenUsage.setdefault(
+                promptTeams, {"generations": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0}
+            )
+            stats["generations"] += 1
+            stats["prompt_tokens"] += usage["prompt_tokens"]
+            stats["completion_tokens"] += usage["completion_tokens"]
+            stats["seconds"] += seconds
+
+    def tokenUsageStats(self) -> Dict[str, dict]:
+        """Tokens et durée moyens des appels à l'assistant, par mode de prompt"""
+        with self._usageLock:
+            return {
+                promptTeams: {
+                    "generations": stats["generations"],
+                    "avg_prompt_tokens": round(stats["prompt_tokens"] / stats["generations"]),
+                    "avg_completion_tokens": round(stats["completion_tokens"] / stats["generations"]),
+                    "avg_seconds": round(stats["seconds"] / stats["generations"], 2)
+                }
+                for promptTeams, stats in self._tokenUsage.items()
+            }
+
+    def startPlanningJob(self,
+                         tournamentId: str,
+                         useCache: bool = True,
+                         engine: Optional[str] = None) -> Optional[AITournamentPlanning]:
+        """
+        Génération en tâche de fond : crée le planning en statut "generating" et
+        confie l'appel OpenAI + la sauvegarde au pool de workers.
+
+        Returns:
+            Planning "generating" ou None si le tournoi est introuvable ;
+            QueueFullError si la file de génération est pleine
+        """
+        if planningJobQueue.isFull():
+            raise QueueFullError(f"File de génération pleine ({planningJobQueue.maxDepth} tâches)")
+
+        tournament = self.tournamentService.getTournamentById(tournamentId)
+        if not tournament:
+            print("Impossible de récupérer le tournoi")
+            return None
+
+        planning = self.databaseService.createPendingPlanning(tournamentId, tournament.tournament_type)
+        if not planning:
+            return None
+
+        try:
+            planningJobQueue.submit(
+                planning.id,
+                lambda onStage, deadline: self._runPlanningJob(planning.id, tournamentId, onStage, deadline, useCache, engine)
+            )
+        except QueueFullError:
+            self._deletePlanning(planning.id)
+            raise
+
+        print(f"Planning {planning.id} en file de génération")
+        return planning
+
+    def _runPlanningJob(self,
+                        planningId: str,
+                        tournamentId: str,
+                        onStage: Callable[..., None],
+                        deadline: float,
+                        useCache: bool = True,
+                        engine: Optional[str] = None) -> bool:
+        """Exécuté par un worker : appel OpenAI (ou moteur local) puis sauvegarde dans le planning existant"""
+        try:
+            requested = self._requestAIPlanning(tournamentId, onStage, deadline, useCache, engine)
+            if requested and time.monotonic() > deadline:
+                onStage("calling_ai", "Délai de la tâche dépassé")
+                requested = None
+            if not requested:
+                self.databaseService.updatePlanningStatus(planningId, "error")
+                return False
+            _, aiResponse = requested
+
+            onStage("saving")
+            if not self.databaseService.syncPlanning(planningId, aiResponse):
+                onStage("saving", "Échec de la sauvegarde")
+                self.databaseService.updatePlanningStatus(planningId, "error")
+                return False
+            return True
+
+        except Exception as e:
+            print(f"❌ Erreur tâche de génération {planningId}: {e}")
+            onStage("failed", str(e))
+            self.databaseService.updatePlanningStatus(planningId, "error")
+            return False
+
+    def shutdownPlanningJobs(self) -> None:
+        """Arrêt du service : attend les tâches en cours, passe en erreur les plannings jamais générés"""
+        for planningId in planningJobQueue.shutdown():
+            print(f"⚠️ Génération du planning {planningId} annulée (arrêt du service)")
+            self.databaseService.updatePlanningStatus(planningId, "error")
+
+    def getPlanningJob(self, planningId: str) -> Optional[dict]:
+        """Étape de la tâche de fond (None si le planning n'a pas été généré par ce process)"""
+        return planningJobQueue.getJob(planningId)
+
     def getPlanningStatus(self, planningId: str) -> Optional[str]:
         """
         Récupère le statut d'un planning
@@ -112,12 +366,17 @@ class AIPlanningService():
             print(f"❌ Erreur récupération statut: {e}")
             return None
 
-    def regeneratePlanning(self, planningId: str) -> Optional[AITournamentPlanning]:
+    def regeneratePlanning(self,
+                           planningId: str,
+                           useCache: bool = True,
+                           engine: Optional[str] = None) -> Optional[AITournamentPlanning]:
         """
         Régénère un planning existant
         
         Args:
             planning_id: ID du planning à régénérer
+            useCache: False force un nouvel appel à l'assistant
+            engine: "ai" ou "local" (défaut : PLANNING_ENGINE)
             
         Returns:
             Nouveau planning généré ou None si erreur
@@ -135,7 +394,7 @@ class AIPlanningService():
             self._deletePlanning(planningId)
             
             # Générer un nouveau planning
-            new_planning = self.generatePlanning(old_planning.tournament_id)
+            new_planning = self.generatePlanning(old_planning.tournament_id, useCache, engine)
             
             if new_planning:
                 print(f"✅ Planning régénéré: {new_planning.id}")
@@ -146,12 +405,49 @@ class AIPlanningService():
             print(f"❌ Erreur régénération planning: {e}")
             return None
 
-    def _buildStaticPrompt(self, tournamentData: Dict[str, Any]) -> str:
-        """Construit le prompt statique pour l'IA"""
+    def regeneratePlanningIncremental(self,
+                                      planningId: str,
+                                      useCache: bool = True,
+                                      engine: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Régénère un planning sur place : seuls les matchs et poules qui ont changé
+        (clé match_id_ai / poule_id) sont réécrits, le planning garde son ID.
+
+        Args:
+            planning_id: ID du planning à régénérer
+            useCache: False force un nouvel appel à l'assistant
+            engine: "ai" ou "local" (défaut : PLANNING_ENGINE)
+
+        Returns:
+            Rapport de DatabaseService.syncPlanning (planning + lignes écrites) ou None si erreur
+        """
+        try:
+            print(f"🔄 Régénération incrémentale planning {planningId}")
+
+            old_planning = self._getPlanningById(planningId)
+            if not old_planning:
+                print("❌ Planning original non trouvé")
+                return None
+
+            requested = self._requestAIPlanning(old_planning.tournament_id, useCache=useCache, engine=engine)
+            if not requested:
+                return None
+            _, aiResponse = requested
+
+            return self.databaseService.syncPlanning(planningId, aiResponse)
+
+        except Exception as e:
+            print(f"❌ Erreur régénération incrémentale planning: {e}")
+            return None
+
+    def _buildStaticPrompt(self, tournamentData: Dict[str, Any], codes: Optional[Dict[str, Team]] = None) -> str:
+        """Construit le prompt statique pour l'IA (codes : équipes désignées par T01…)"""
         tournament = tournamentData["tournament"]
         teams = tournamentData["teams"]
         
-        team_names = [team.name for team in teams]
+        team_names = list(codes) if codes else [team.name for team in teams]
+        teams_rule = ("\n            - Les équipes sont désignées par leur code (T01…) : utilise uniquement "
+                      "ces codes pour equipe_a, equipe_b et les équipes des poules.") if codes else ""
         
         # Prompt statique optimisé
         prompt = f"""
@@ -184,13 +480,14 @@ class AIPlanningService():
             Terrain 2: Match 3 (09h00-09h15) → Pause 5min → Match 4 (09h20-09h35)
 
             CONTRAINTES SUPPLEMENTAIRES:
-            - Tous les matchs doivent rentrer dans la journée
+            - Tous les matchs doivent rentrer dans la journée : aucun match ne se termine après {DAY_END:%H:%M} ;
+              s'il en reste, ils continuent le lendemain à l'heure de début
             - Optimiser l'utilisation des terrains
             - Éviter les temps d'attente trop longs
 
             CONTRAINTES OBLIGATOIRES:
             - Pas de match entre 12h et 13h30.
-            - Tu utilises tous les terrains disponibles pour la plannification des matchs.
+            - Tu utilises tous les terrains disponibles pour la plannification des matchs.{teams_rule}
 
             IMPORTANT: Réponds UNIQUEMENT avec du JSON valide selon le type de tournoi.
             Pour round_robin: utilise la structure avec matchs_round_robin.
@@ -212,6 +509,7 @@ class AIPlanningService():
             
             # Supprimer le planning principal
             result = self.supabase.table("ai_tournament_planning").delete().eq("id", planningId).execute()
+            invalidatePlanning(planningId)
             
             print(f"🗑️ Planning {planningId} supprimé")
             return True
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+# Cache disque des réponses de l'assistant, adressé par contenu : la clé est le
+# SHA-256 de la forme canonique des entrées du prompt (type, équipes, terrains,
+# horaires, durées, contraintes). Un nouvel essai, un double clic sur "générer"
+# ou une régénération après un échec de sauvegarde relisent la réponse sur disque
+# au lieu de relancer un run. Un fichier JSON par clé, éviction du moins
+# récemment lu (mtime) au-delà de AI_CACHE_MAX_BYTES.
+
+
+def canonicalKey(inputs: Dict[str, Any]) -> str:
+    """SHA-256 de la sérialisation canonique (clés triées, séparateurs fixes)"""
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """Réponses IA persistées sur disque, taille totale bornée"""
+
+    def __init__(self, directory: str, maxBytes: int):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self._lock = threading.Lock()
+        self._sizes: Optional[Dict[str, int]] = None  # nom de fichier -> taille, chargé au premier accès
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        """Réponse en cache, ou None (absente, illisible ou cache désactivé)"""
+        if self.maxBytes <= 0:
+            return None
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    value = json.load(f)
+                os.utime(path)  # lecture = utilisation récente pour l'éviction
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Entrée de cache IA illisible {key[:12]}: {e}")
+                self._remove(os.path.basename(path))
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: dict) -> bool:
+        """Écrit la réponse (écriture atomique) puis évince jusqu'à repasser sous maxBytes"""
+        if self.maxBytes <= 0 or not value:
+            return False
+        data = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        if len(data) > self.maxBytes:
+            return False
+        path = self._path(key)
+        name = os.path.basename(path)
+        with self._lock:
+            try:
+                sizes = self._loadSizes()
+                tmpPath = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmpPath, "wb") as f:
+                    f.write(data)
+                os.replace(tmpPath, path)
+            except OSError as e:
+                print(f"⚠️ Écriture du cache IA impossible: {e}")
+                return False
+            sizes[name] = len(data)
+            self._evict(keep=name)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in list(self._loadSizes()):
+                self._remove(name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = self._sizes or {}
+            return {
+                "entries": len(sizes),
+                "bytes": sum(sizes.values()),
+                "max_bytes": self.maxBytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _loadSizes(self) -> Dict[str, int]:
+        # Appelé verrou pris ; l'état disque n'est relu qu'une fois par process
+        if self._sizes is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._sizes = {
+                entry.name: entry.stat().st_size
+                for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(".json")
+            }
+        return self._sizes
+
+    def _evict(self, keep: str) -> None:
+        # Appelé verrou pris : supprime les fichiers les moins récemment utilisés
+        sizes = self._sizes
+        total = sum(sizes.values())
+        if total <= self.maxBytes:
+            return
+        byAge = sorted((self._mtime(name), name) for name in sizes if name != keep)
+        for _, name in byAge:
+            if total <= self.maxBytes:
+                break
+            total -= sizes.get(name, 0)
+            self._remove(name)
+            self.evictions += 1
+
+    def _mtime(self, name: str) -> float:
+        try:
+            return os.path.getmtime(os.path.join(self.directory, name))
+        except OSError:
+            return 0.0
+
+    def _remove(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+        if self._sizes is not None:
+            self._sizes.pop(name, None)
+
+
+aiResponseCache = AIResponseCache(
+    settings.AI_CACHE_DIR,
+    settings.AI_CACHE_MAX_BYTES if settings.AI_CACHE_ENABLED else 0
+)
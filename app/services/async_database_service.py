@@ -0,0 +1,373 @@
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from postgrest.types import ReturnMethod
+from app.core.config import settings
+from app.core.database import getAsyncSupabase, getSupabase
+from app.core.status_transition import transitionStatusAsync
+from app.core.cache import (
+    planningCache, courtIndexCache, bracketGraphCache, invalidatePlanning, profileCache, invitationCache, NOT_FOUND,
+    normalizeEmail, profileCacheKey, cacheProfile, cacheProfileNotFound
+)
+from app.models.models import (
+    AITournamentPlanning,
+    AIGeneratedMatch, AIGeneratedPoule,
+    Profile
+)
+from app.services.court_index import CourtScheduleIndex
+from app.services.bracket_resolver import PlaceholderGraph
+from app.services.planning_rows import PlanningRowsMixin
+
+
+class AsyncDatabaseService(PlanningRowsMixin):
+    """
+    Version asynchrone de DatabaseService.
+
+    Chaque requête passe par le client PostgREST async : les routes `async def`
+    peuvent les attendre sans bloquer la boucle. La construction des lignes
+    (_build*, _extract*) est partagée avec DatabaseService via PlanningRowsMixin.
+    Les écritures du pipeline de génération (persistPlanning, syncPlanning...)
+    n'existent qu'en version sync : elles tournent dans les jobs.
+    """
+
+    def __init__(self):
+        self.supabase = getAsyncSupabase()
+
+    async def savePlanning(self,
+                           tournamentId: str,
+                           planningData: dict,
+                           typeTournoi: str) -> Optional[AITournamentPlanning]:
+        """Sauvegarde le planning principal en DB"""
+        try:
+            print(f"💾 Sauvegarde planning pour tournoi {tournamentId}")
+
+            planning_dict = self._buildPlanningDict(tournamentId, planningData, typeTournoi)
+            result = await self.supabase.table("ai_tournament_planning").insert(planning_dict).execute()
+
+            print(f"✅ Planning {planning_dict['id']} sauvegardé ({planning_dict['total_matches']} matchs)")
+            return AITournamentPlanning(**result.data[0])
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde : {e}")
+            return None
+
+    async def saveMatches(self,
+                          planningId: str,
+                          planningData: dict,
+                          minimal: bool = False) -> Optional[List[AIGeneratedMatch]]:
+        """Sauvegarde tous les matchs, par paquets envoyés en parallèle"""
+        try:
+            print(f"Extraction et sauvegarde des matchs pour planning {planningId}")
+
+            matchesDicts = self._buildMatchesDicts(planningId, planningData)
+            if not matchesDicts:
+                print("Aucun match à sauvegarder")
+                return []
+
+            report = await self._insertInChunks("ai_generated_match", matchesDicts, minimal)
+            if report["errors"]:
+                return None
+
+            print(f"{report['inserted']} matchs sauvegardes en {report['chunks']} paquet(s)")
+            return [AIGeneratedMatch(**data) for data in (matchesDicts if minimal else report["rows"])]
+
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde des matchs: {e}")
+            return None
+
+    async def _insertInChunks(self, table: str, rows: List[dict], minimal: bool = True) -> dict:
+        """Paquets insérés avec asyncio.gather, bornés par un sémaphore"""
+        chunks = self._chunks(rows)
+        returning = ReturnMethod.minimal if minimal else ReturnMethod.representation
+        semaphore = asyncio.Semaphore(max(1, settings.MATCH_INSERT_CONCURRENCY))
+
+        async def insertChunk(chunk: List[dict]) -> List[dict]:
+            async with semaphore:
+                result = await self.supabase.table(table).insert(chunk, returning=returning).execute()
+                return result.data or []
+
+        outcomes = await asyncio.gather(*(insertChunk(chunk) for chunk in chunks), return_exceptions=True)
+        report = self._chunkReport(table, chunks, outcomes)
+        for chunk in self._insertedIdChunks(chunks, report):
+            try:
+                await self.supabase.table(table).delete(returning=ReturnMethod.minimal).in_("id", chunk).execute()
+                report["rolled_back"] += len(chunk)
+            except Exception as e:
+                print(f"❌ {table} : suppression des paquets insérés en échec : {e}")
+        return report
+
+    async def savePoules(self,
+                         planningId: str,
+                         planningData: dict) -> Optional[List[AIGeneratedPoule]]:
+        """Sauvegarde les poules en lot"""
+        try:
+            poulesDicts = self._buildPoulesDicts(planningId, planningData)
+            if not poulesDicts:
+                print("Pas de poules à sauvegarder")
+                return []
+
+            result = await self.supabase.table("ai_generated_poule").insert(poulesDicts).execute()
+            print(f"{len(poulesDicts)} poules sauvegardees")
+            return [AIGeneratedPoule(**data) for data in result.data]
+
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde des poules {e}")
+            return None
+
+    async def getPlanningWithDetailsByPlanningId(self, planningId: str) -> Optional[AITournamentPlanning]:
+        """Récupère un planning par son ID"""
+        result = await self.getPlanningByIdWithEtag(planningId)
+        return result[0] if result else None
+
+    async def getPlanningByIdWithEtag(self, planningId: str) -> Optional[Tuple[AITournamentPlanning, str]]:
+        """Planning + ETag, servis par le cache partagé quand c'est possible"""
+        cached = planningCache.getWithEtag(planningId)
+        if cached is not None:
+            return cached
+
+        try:
+            print(f"Recuperation planning {planningId}")
+
+            planningResult = await self.supabase.table("ai_tournament_planning")\
+                .select("*")\
+                .eq("id", planningId)\
+                .single()\
+                .execute()
+            if not planningResult.data:
+                print("Planning non trouve")
+                return None
+            planningObj = AITournamentPlanning(**planningResult.data)
+            etag = self._planningEtag(planningObj)
+            planningCache.set(planningId, planningObj, etag=etag)
+            return planningObj, etag
+
+        except Exception as e:
+            print(f"Erreur recuperation planning {e}")
+            return None
+
+    async def getPlanningDetails(self,
+                                 planningId: str,
+                                 fields: Optional[List[str]] = None,
+                                 include: Optional[List[str]] = None) -> Optional[dict]:
+        """Planning + matchs + poules en une requête embarquée (voir DatabaseService)"""
+        query = self.supabase.table("ai_tournament_planning")\
+            .select(self._planningDetailsSelect(fields, include))\
+            .eq("id", planningId)
+        if include is None or "matches" in include:
+            query = query.order("debut_horaire", foreign_table="matches")\
+                .order("terrain", foreign_table="matches")
+
+        try:
+            print(f"Recuperation planning detaille {planningId}")
+            result = await query.maybe_single().execute()
+            if not result or not result.data:
+                print("Planning non trouve")
+                return None
+            return self._toPlanningDetails(result.data)
+
+        except Exception as e:
+            print(f"Erreur recuperation planning detaille {e}")
+            return None
+
+    async def getPlanningMatches(self,
+                                 planningId: str,
+                                 terrain: Optional[int] = None,
+                                 startFrom: Optional[datetime] = None,
+                                 startTo: Optional[datetime] = None,
+                                 phase: Optional[str] = None,
+                                 pouleId: Optional[str] = None,
+                                 journee: Optional[int] = None) -> Optional[List[AIGeneratedMatch]]:
+        """Matchs d'un planning filtrés côté base (voir DatabaseService)"""
+        try:
+            result = await self._planningMatchesQuery(planningId, terrain, startFrom, startTo, phase, pouleId, journee).execute()
+            return [AIGeneratedMatch(**data) for data in result.data or []]
+        except Exception as e:
+            print(f"Erreur recuperation matchs du planning {planningId}: {e}")
+            return None
+
+    async def getCourtIndex(self, planningId: str) -> Optional[CourtScheduleIndex]:
+        """Index par terrain des matchs du planning, partagé avec le service sync via le cache"""
+        index = courtIndexCache.get(planningId)
+        if index is not None:
+            return index
+
+        matches = await self.getPlanningMatches(planningId)
+        if matches is None:
+            return None
+        index = CourtScheduleIndex(matches)
+        courtIndexCache.set(planningId, index)
+        return index
+
+    async def getPlaceholderGraph(self, planningId: str) -> Optional[PlaceholderGraph]:
+        """Graphe des placeholders, partagé avec le service sync via le cache (copie par requête)"""
+        graph = bracketGraphCache.get(planningId)
+        if graph is None:
+            matches = await self.getPlanningMatches(planningId)
+            if matches is None:
+                return None
+            graph = PlaceholderGraph(matches)
+            bracketGraphCache.set(planningId, graph)
+        return graph.copy()
+
+    async def recordMatchResult(self,
+                                planningId: str,
+                                matchId: str,
+                                winnerTeamId: str,
+                                loserTeamId: Optional[str] = None) -> Optional[dict]:
+        """Résultat d'un match + résolution des matchs en aval (voir DatabaseService)"""
+        graph = await self.getPlaceholderGraph(planningId)
+        if graph is None:
+            return None
+        updates = graph.resolveMatchResult(matchId, winnerTeamId, loserTeamId)
+        return await self._persistResolutions(planningId, graph, updates, completedMatchId=matchId)
+
+    async def recordPouleRanking(self, planningId: str, pouleId: str, rankedTeamIds: List[str]) -> Optional[dict]:
+        """Classement d'une poule + résolution des matchs en aval (voir DatabaseService)"""
+        graph = await self.getPlaceholderGraph(planningId)
+        if graph is None:
+            return None
+        updates = graph.resolvePouleRanking(pouleId, rankedTeamIds)
+        return await self._persistResolutions(planningId, graph, updates)
+
+    async def _persistResolutions(self,
+                                  planningId: str,
+                                  graph: PlaceholderGraph,
+                                  updates: dict,
+                                  completedMatchId: Optional[str] = None) -> Optional[dict]:
+        rows = self._resolutionRows(graph, updates, completedMatchId)
+        try:
+            if rows:
+                await self.supabase.table("ai_generated_match").upsert(rows, returning=ReturnMethod.minimal).execute()
+        except Exception as e:
+            print(f"❌ Erreur résolution des placeholders du planning {planningId}: {e}")
+            return None
+        return self._resolutionResult(planningId, graph, updates, completedMatchId, len(rows))
+
+    async def iterPlanningMatchRows(self, planningId: str, pageSize: Optional[int] = None) -> AsyncIterator[dict]:
+        """Lignes brutes des matchs, page par page (voir DatabaseService)"""
+        pageSize = pageSize or settings.EXPORT_PAGE_SIZE
+        last = None
+        while True:
+            result = await self._matchesPageQuery(planningId, last, pageSize).execute()
+            rows = result.data or []
+            for row in rows:
+                yield row
+            if len(rows) < pageSize:
+                return
+            last = rows[-1]
+
+    async def getPlanningWithDetailsByTournamentId(self, tournamentId: str) -> Optional[AITournamentPlanning]:
+        """Récupère le planning d'un tournoi"""
+        try:
+            print(f"Recuperation planning par tournoi {tournamentId}")
+
+            planningResult = await self.supabase.table("ai_tournament_planning")\
+                .select("*")\
+                .eq("tournament_id", tournamentId)\
+                .single()\
+                .execute()
+            if not planningResult.data:
+                print("Planning non trouve")
+                return None
+            return AITournamentPlanning(**planningResult.data)
+
+        except Exception as e:
+            print(f"Erreur recuperation planning par tournoi {e}")
+            return None
+
+    async def updatePlanningStatus(self,
+                                   planningId: str,
+                                   newStatus: str) -> bool:
+        """Met à jour le statut d'un planning"""
+        try:
+            print(f"Mise à jour statut planning {planningId} -> {newStatus}")
+            await self.supabase.table("ai_tournament_planning")\
+                .update({
+                    "status": newStatus,
+                    "updated_at": datetime.now().isoformat()
+                })\
+                .eq("id", planningId)\
+                .execute()
+            invalidatePlanning(planningId)
+
+            print("Statut mis à jour")
+            return True
+
+        except Exception as e:
+            print(f"Erreur mise à jour planning: {e}")
+            return False
+
+    async def transitionPlanningStatuses(self,
+                                         planningIds: List[str],
+                                         expectedStatus: str,
+                                         newStatus: str) -> Optional[dict]:
+        """Transition de statut en lot, conditionnée au statut courant (voir DatabaseService)"""
+        try:
+            print(f"Transition de {len(planningIds)} planning(s) {expectedStatus} -> {newStatus}")
+            report = await transitionStatusAsync(self.supabase, "ai_tournament_planning", planningIds, expectedStatus, newStatus)
+            for planningId in report["transitioned"]:
+                invalidatePlanning(planningId)
+            return report
+        except Exception as e:
+            print(f"Erreur transition statut plannings: {e}")
+            return None
+
+    async def getUserById(self, userId: str) -> Optional[Profile]:
+        """Récupère un utilisateur par son ID"""
+        return await self._getProfile("id", userId)
+
+    async def getUserByEmail(self, userEmail: str) -> Optional[Profile]:
+        """Récupère un utilisateur par son email (insensible à la casse)"""
+        return await self._getProfile("email", userEmail)
+
+    async def sendInvitationEmail(self, email: str) -> bool:
+        """
+        Envoie l'invitation via l'API admin Auth (au plus une fois par fenêtre).
+        Le client Auth n'a pas de version async : l'appel part dans un thread.
+        """
+        email = normalizeEmail(email)
+        if not invitationCache.add(email, True):
+            print(f"ℹ️ Invitation déjà envoyée récemment à {email}")
+            return True
+        try:
+            print(f"🔍 Envoi email d'invitation à {email}")
+            await asyncio.to_thread(getSupabase().auth.admin.invite_user_by_email, email)
+            print(f"✅ Email d'invitation envoyé à {email}")
+            return True
+        except Exception as e:
+            invitationCache.invalidate(email)
+            print(f"❌ Erreur envoi email d'invitation: {e}")
+            return False
+
+    async def _getProfile(self, column: str, value: str) -> Optional[Profile]:
+        cached = profileCache.get(profileCacheKey(column, value))
+        if cached is NOT_FOUND:
+            return None
+        if cached is not None:
+            return cached
+
+        try:
+            print(f"🔍 Récupération utilisateur {value}")
+
+            query = self.supabase.table("profile").select("*")
+            result = await self._profileFilter(query, column, value)\
+                .single()\
+                .execute()
+
+            if not result.data:
+                print(f"❌ Aucun utilisateur trouvé ({column}={value})")
+                cacheProfileNotFound(column, value)
+                return None
+
+            user = Profile(**result.data)
+            cacheProfile(user)
+            print(f"✅ Utilisateur {user.email} récupéré avec succès")
+            return user
+
+        except Exception as e:
+            if self._isNotFound(e):
+                cacheProfileNotFound(column, value)
+                return None
+            print(f"❌ Erreur lors de la récupération de l'utilisateur : {e}")
+            return None
+
+asyncDatabaseService = AsyncDatabaseService()
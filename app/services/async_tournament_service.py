@@ -0,0 +1,408 @@
+import asyncio
+from datetime import datetime, date, time
+from typing import List, Optional, Dict, Any, Tuple
+from app.core.database import getAsyncSupabase
+from app.core.etag import computeEtag
+from app.core.pagination import applyKeyset, splitPage
+from app.core.status_transition import transitionStatusAsync
+from app.core.cache import tournamentCache, tournamentTeamsCache, teamCache, invalidateTournament
+from app.models.models import Tournament, Team, TeamMember, TeamWithMembers
+from app.services.tournament_rows import TournamentRowsMixin
+
+
+class AsyncTournamentService(TournamentRowsMixin):
+    """
+    Version asynchrone de TournamentService.
+
+    Les requêtes indépendantes (tournoi + équipes) partent en parallèle
+    avec asyncio.gather au lieu de s'enchaîner.
+    """
+
+    def __init__(self):
+        self.supabase = getAsyncSupabase()
+
+    async def getTournaments(self) -> Optional[List[Tournament]]:
+        try:
+            result = await self.supabase.table("tournament")\
+                .select("*, team(count)")\
+                .execute()
+
+            tournaments = []
+            for tournament_data in result.data or []:
+                try:
+                    tournaments.append(Tournament(**self._withRegisteredTeams(tournament_data)))
+                except Exception as e:
+                    print(f"⚠️ Tournoi invalide ignorée: {e}")
+                    continue
+            return tournaments
+        except Exception as e:
+            print(f"❌ Erreur récupération tournois: {e}")
+            return None
+
+    async def getTournamentsPage(self,
+                                 limit: int,
+                                 cursor: Optional[str] = None,
+                                 status: Optional[str] = None,
+                                 organizerId: Optional[str] = None,
+                                 tournamentType: Optional[str] = None) -> Optional[Tuple[List[Tournament], Optional[str]]]:
+        """Page de tournois (keyset sur created_at, id) ; ValueError si le curseur est invalide"""
+        query = self.supabase.table("tournament").select("*, team(count)")
+        for column, value in (("status", status), ("organizer_id", organizerId), ("tournament_type", tournamentType)):
+            if value:
+                query = query.eq(column, value)
+        query = applyKeyset(query, cursor, limit)
+
+        try:
+            result = await query.execute()
+            rows, nextCursor = splitPage(result.data, limit)
+
+            tournaments = []
+            for tournament_data in rows:
+                try:
+                    tournaments.append(Tournament(**self._withRegisteredTeams(tournament_data)))
+                except Exception as e:
+                    print(f"⚠️ Tournoi invalide ignorée: {e}")
+                    continue
+            return tournaments, nextCursor
+        except Exception as e:
+            print(f"❌ Erreur récupération tournois: {e}")
+            return None
+
+    async def getTournamentById(self, tournamentId: str) -> Optional[Tournament]:
+        """Récupère un tournoi par son ID (cache partagé avec le service sync)"""
+        result = await self.getTournamentByIdWithEtag(tournamentId)
+        return result[0] if result else None
+
+    async def getTournamentByIdWithEtag(self, tournamentId: str) -> Optional[Tuple[Tournament, str]]:
+        """Tournoi et son ETag, mis en cache ensemble (voir TournamentService)"""
+        cached = tournamentCache.getWithEtag(tournamentId)
+        if cached is not None:
+            return cached
+
+        try:
+            print(f"🔍 Récupération tournoi {tournamentId}")
+
+            result = await self.supabase.table("tournament")\
+                .select("*, team(count)")\
+                .eq("id", tournamentId)\
+                .single()\
+                .execute()
+
+            if not result.data:
+                print(f"❌ Tournoi {tournamentId} non trouvé")
+                return None
+
+            tournament = Tournament(**self._withRegisteredTeams(result.data))
+            etag = self._tournamentEtag(tournament)
+            tournamentCache.set(tournamentId, tournament, etag=etag)
+            print(f"✅ Tournoi récupéré: {tournament.name}")
+            return tournament, etag
+
+        except Exception as e:
+            print(f"❌ Erreur récupération tournoi {tournamentId}: {e}")
+            return None
+
+    async def getTournamentTeams(self, tournamentId: str) -> List[Team]:
+        """Récupère toutes les équipes d'un tournoi"""
+        result = await self.getTournamentTeamsWithEtag(tournamentId)
+        return list(result[0]) if result else []
+
+    async def getTournamentTeamsWithEtag(self, tournamentId: str) -> Optional[Tuple[Tuple[Team, ...], str]]:
+        """Équipes d'un tournoi (tuple immuable partagé par le cache) et leur ETag"""
+        cached = tournamentTeamsCache.getWithEtag(tournamentId)
+        if cached is not None:
+            return cached
+
+        try:
+            # Même tri que le service sync : ordre de la route et ETag stables
+            result = await self.supabase.table("team")\
+                .select("*")\
+                .eq("tournament_id", tournamentId)\
+                .order("name")\
+                .execute()
+            teams = tuple(self._toTeams(result.data))
+            etag = self._teamsEtag(teams)
+            tournamentTeamsCache.set(tournamentId, teams, etag=etag)
+            return teams, etag
+
+        except Exception as e:
+            print(f"❌ Erreur récupération équipes: {e}")
+            return None
+
+    async def createTournament(self, tournamentData: dict) -> Optional[Tournament]:
+        """Crée un nouveau tournoi"""
+        try:
+            print(f"🏆 Création nouveau tournoi: {tournamentData.get('name', 'Sans nom')}")
+
+            # Valider avec Pydantic (ID et timestamps temporaires)
+            Tournament(**{
+                **tournamentData,
+                "id": "00000000-0000-0000-0000-000000000000",
+                "created_at": datetime.now(),
+                "updated_at": datetime.now()
+            })
+
+            tournament_data_clean = tournamentData.copy()
+            if isinstance(tournament_data_clean.get("start_date"), date):
+                tournament_data_clean["start_date"] = tournament_data_clean["start_date"].isoformat()
+            if isinstance(tournament_data_clean.get("start_time"), time):
+                tournament_data_clean["start_time"] = tournament_data_clean["start_time"].isoformat()
+
+            result = await self.supabase.table("tournament").insert(tournament_data_clean).execute()
+            if not result.data:
+                print("❌ Erreur lors de l'insertion en DB")
+                return None
+
+            invalidateTournament(result.data[0].get("id"))
+            return Tournament(**result.data[0])
+
+        except Exception as e:
+            print(f"❌ Erreur création tournoi: {e}")
+            return None
+
+    async def getTournamentWithTeams(self, tournamentId: str) -> Optional[Dict[str, Any]]:
+        """Récupère un tournoi avec ses équipes (requêtes en parallèle)"""
+        result = await self.getTournamentWithTeamsAndEtag(tournamentId)
+        return result[0] if result else None
+
+    async def getTournamentWithTeamsAndEtag(self, tournamentId: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Tournoi + équipes en parallèle, avec un ETag combinant ceux des deux entrées de cache"""
+        try:
+            print(f"🔍 Récupération tournoi + équipes {tournamentId}")
+
+            tournamentResult, teamsResult = await asyncio.gather(
+                self.getTournamentByIdWithEtag(tournamentId),
+                self.getTournamentTeamsWithEtag(tournamentId)
+            )
+            if not tournamentResult:
+                return None
+            if not teamsResult or len(teamsResult[0]) < 1:
+                return None
+            tournament, tournamentEtag = tournamentResult
+            teams, teamsEtag = list(teamsResult[0]), teamsResult[1]
+
+            result = {
+                "tournament": tournament,
+                "teams": teams,
+                "teams_count": len(teams),
+                "has_minimum_teams": len(teams) >= 2,
+                "can_start": len(teams) >= 2 and tournament.status == "ready"
+            }
+            return result, computeEtag(tournamentEtag, teamsEtag)
+
+        except Exception as e:
+            print(f"❌ Erreur récupération tournoi avec équipes: {e}")
+            return None
+
+    async def updateTournamentStatus(self, tournamentId: str, newStatus: str) -> bool:
+        """Met à jour le statut d'un tournoi"""
+        try:
+            print(f"🔄 Mise à jour statut tournoi {tournamentId} → {newStatus}")
+
+            await self.supabase.table("tournament")\
+                .update({
+                    "status": newStatus,
+                    "updated_at": datetime.now().isoformat()
+                })\
+                .eq("id", tournamentId)\
+                .execute()
+            invalidateTournament(tournamentId)
+            return True
+
+        except Exception as e:
+            print(f"❌ Erreur mise à jour statut tournoi: {e}")
+            return False
+
+    async def transitionTournamentStatuses(self,
+                                          tournamentIds: List[str],
+                                          expectedStatus: str,
+                                          newStatus: str) -> Optional[dict]:
+        """Transition de statut en lot, conditionnée au statut courant"""
+        try:
+            print(f"🔄 Transition de {len(tournamentIds)} tournoi(s) {expectedStatus} → {newStatus}")
+            report = await transitionStatusAsync(self.supabase, "tournament", tournamentIds, expectedStatus, newStatus)
+            for tournamentId in report["transitioned"]:
+                invalidateTournament(tournamentId)
+            return report
+
+        except Exception as e:
+            print(f"❌ Erreur transition statut tournois: {e}")
+            return None
+
+    async def createTeam(self, teamData: dict) -> Optional[Team]:
+        """Crée une nouvelle équipe (et ajoute le capitaine dans team_member)"""
+        try:
+            print(f"👥 Création nouvelle équipe: {teamData.get('name', 'Sans nom')}")
+
+            Team(**{
+                **teamData,
+                "id": "00000000-0000-0000-0000-000000000000",
+                "created_at": datetime.now(),
+                "updated_at": datetime.now()
+            })
+
+            result = await self.supabase.table("team").insert(teamData.copy()).execute()
+            if not result.data:
+                print("❌ Erreur lors de l'insertion équipe en DB")
+                return None
+
+            created_team = result.data[0]
+            invalidateTournament(created_team.get("tournament_id"))
+            if created_team.get("captain_id"):
+                try:
+                    await self.supabase.table("team_member").insert({
+                        "team_id": created_team["id"],
+                        "user_id": created_team["captain_id"],
+                        "role": "captain",
+                        "status": "active"
+                    }).execute()
+                except Exception as member_error:
+                    print(f"⚠️ Erreur ajout capitaine à team_member (équipe créée): {member_error}")
+
+            return Team(**created_team)
+
+        except Exception as e:
+            print(f"❌ Erreur création équipe: {e}")
+            return None
+
+    async def getTeamById(self, teamId: str) -> Optional[Team]:
+        """Récupère une équipe par son ID"""
+        cached = teamCache.get(teamId)
+        if cached is not None:
+            return cached
+
+        try:
+            result = await self.supabase.table("team")\
+                .select("*")\
+                .eq("id", teamId)\
+                .single()\
+                .execute()
+            if not result.data:
+                print(f"❌ Équipe {teamId} non trouvée")
+                return None
+            team = Team(**result.data)
+            teamCache.set(teamId, team, etag=self._teamsEtag([team]))
+            return team
+
+        except Exception as e:
+            print(f"❌ Erreur récupération équipe {teamId}: {e}")
+            return None
+
+    async def deleteTeamById(self, teamId: str) -> bool:
+        try:
+            team = await self.getTeamById(teamId)
+
+            result = await self.supabase.table("team")\
+                .delete()\
+                .eq("id", team.id)\
+                .execute()
+            teamCache.invalidate(team.id)
+            invalidateTournament(team.tournament_id)
+            return bool(result)
+        except Exception as e:
+            print(f"Erreur lors de la suppression: {e}")
+            return False
+
+    async def getTeams(self, tournamentId: str = None) -> Optional[List[Team]]:
+        try:
+            query = self.supabase.table("team").select("*")
+            if tournamentId:
+                query = query.eq("tournament_id", tournamentId)
+            result = await query.execute()
+            return self._toTeams(result.data)
+        except Exception as e:
+            print(f"❌ Erreur récupération teams : {e}")
+            return None
+
+    async def getTeamsPage(self,
+                           limit: int,
+                           cursor: Optional[str] = None,
+                           tournamentId: Optional[str] = None,
+                           status: Optional[str] = None) -> Optional[Tuple[List[Team], Optional[str]]]:
+        """Page d'équipes (keyset sur created_at, id) ; ValueError si le curseur est invalide"""
+        query = self.supabase.table("team").select("*")
+        for column, value in (("tournament_id", tournamentId), ("status", status)):
+            if value:
+                query = query.eq(column, value)
+        query = applyKeyset(query, cursor, limit)
+
+        try:
+            result = await query.execute()
+            rows, nextCursor = splitPage(result.data, limit)
+            return self._toTeams(rows), nextCursor
+        except Exception as e:
+            print(f"❌ Erreur récupération teams : {e}")
+            return None
+
+    async def _getTeamMembers(self, teamId: str) -> List[TeamMember]:
+        """Récupère les membres d'une équipe"""
+        try:
+            result = await self.supabase.from_("team_member")\
+                .select("*, profile(email)")\
+                .eq("team_id", teamId)\
+                .execute()
+
+            return self._toTeamMembers(result.data)
+
+        except Exception as e:
+            print(f"❌ Erreur récupération membres équipe: {e}")
+            return []
+
+    async def getTeamsWithMembers(self, tournamentId: str = None) -> Optional[List[TeamWithMembers]]:
+        """Récupère toutes les équipes avec leurs membres (une requête embarquée)"""
+        try:
+            query = self.supabase.table("team")\
+                .select("*, team_member(*, profile(email))")
+            if tournamentId:
+                query = query.eq("tournament_id", tournamentId)
+            result = await query.execute()
+
+            teams_with_members = []
+            for team_data in result.data or []:
+                try:
+                    members = self._toTeamMembers(team_data.pop("team_member", None))
+                    teams_with_members.append(TeamWithMembers(**team_data, members=members))
+                except Exception as e:
+                    print(f"⚠️ Erreur lors du traitement de l'équipe {team_data.get('id')}: {e}")
+                    continue
+            return teams_with_members
+
+        except Exception as e:
+            print(f"❌ Erreur récupération teams avec membres: {e}")
+            return None
+
+    async def addTeamMembers(self, teamMembersData: dict) -> Optional[List[TeamMember]]:
+        try:
+            team_members_data = [
+                {
+                    "team_id": teamMembersData.team_id,
+                    "user_id": player.user_id,
+                    "role": player.role or "player",
+                    "position": player.position or "",
+                    "status": player.status or "active",
+                }
+                for player in teamMembersData.players
+            ]
+
+            result = await self.supabase.table("team_member")\
+                .insert(team_members_data)\
+                .execute()
+            teamCache.invalidate(teamMembersData.team_id)
+            if not result.data:
+                print("❌ Aucun joueur ajouté")
+                return None
+
+            added_members = []
+            for member_data in result.data:
+                try:
+                    added_members.append(TeamMember(**member_data))
+                except Exception as e:
+                    print(f"⚠️ Erreur conversion TeamMember: {e}")
+                    continue
+            return added_members
+
+        except Exception as e:
+            print(f"❌ Erreur ajout joueurs: {e}")
+            return None
+
+asyncTournamentService = AsyncTournamentService()
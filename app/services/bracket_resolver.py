@@ -0,0 +1,127 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from app.models.models import AIGeneratedMatch
+
+# Placeholders écrits par l'IA dans equipe_a / equipe_b :
+#   winner_<match> / loser_<match>   -> vainqueur / perdant d'un match
+#   1er_<poule> / 2e_<poule> / 3e_.. -> classement final d'une poule
+_MATCH_PLACEHOLDER = re.compile(r"^(winner|loser)_(.+)$", re.IGNORECASE)
+_RANK_PLACEHOLDER = re.compile(r"^(\d+)(?:er|ere|re|e|eme|ème)_(.+)$", re.IGNORECASE)
+
+SLOT_COLUMNS = {"a": "resolved_equipe_a_id", "b": "resolved_equipe_b_id"}
+
+# (match_id_ai cible, emplacement "a" ou "b")
+Slot = Tuple[str, str]
+
+
+class PlaceholderGraph:
+    """
+    Graphe des dépendances entre matchs d'un planning, construit une fois.
+
+    Chaque placeholder est analysé à la construction et rangé sous sa source :
+    match -> emplacements "winner" / "loser" en aval, poule -> emplacements par rang.
+    Enregistrer un résultat ne touche donc que les emplacements qui en dépendent.
+
+    Les index de dépendances ne changent plus après la construction ; seul `matches`
+    évolue (apply). Un graphe partagé (cache) se manipule via copy().
+    """
+
+    def __init__(self, matches: List[AIGeneratedMatch]):
+        self.matches: Dict[str, AIGeneratedMatch] = {m.match_id_ai: m for m in matches}
+        self.poules = {m.poule_id for m in matches if m.poule_id}
+        self.unresolved: List[Tuple[Slot, str]] = []  # placeholders dont la source est introuvable
+
+        matchRefs = self._aliases(self.matches)
+        pouleRefs = self._aliases(self.poules)
+
+        self._byMatch: Dict[str, Dict[str, List[Slot]]] = defaultdict(lambda: defaultdict(list))
+        self._byPoule: Dict[str, Dict[int, List[Slot]]] = defaultdict(lambda: defaultdict(list))
+        for match in matches:
+            for slot, value in (("a", match.equipe_a), ("b", match.equipe_b)):
+                self._register((match.match_id_ai, slot), value.strip(), matchRefs, pouleRefs)
+
+    def copy(self) -> "PlaceholderGraph":
+        """Copie indépendante pour apply() : index partagés (lecture seule), matchs copiés"""
+        graph = PlaceholderGraph.__new__(PlaceholderGraph)
+        graph.matches = dict(self.matches)  # les matchs sont remplacés par apply, jamais modifiés
+        graph.poules = set(self.poules)
+        graph.unresolved = list(self.unresolved)
+        graph._byMatch = self._byMatch
+        graph._byPoule = self._byPoule
+        return graph
+
+    def dependents(self, matchId: str) -> Dict[str, List[Slot]]:
+        """Emplacements alimentés par un match : {"winner": [...], "loser": [...]}"""
+        return {kind: list(slots) for kind, slots in self._byMatch.get(matchId, {}).items()}
+
+    def pouleDependents(self, pouleId: str) -> Dict[int, List[Slot]]:
+        """Emplacements alimentés par le classement d'une poule : {rang: [...]}"""
+        return {rank: list(slots) for rank, slots in self._byPoule.get(pouleId, {}).items()}
+
+    def resolveMatchResult(self, matchId: str, winnerTeamId: str, loserTeamId: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+        """Emplacements à renseigner après un résultat : {match_id_ai: {colonne: team_id}}"""
+        if matchId not in self.matches:
+            raise KeyError(f"Match inconnu: {matchId}")
+        teams = {"winner": winnerTeamId, "loser": loserTeamId}
+        return self._assign(
+            (slot, teams[kind])
+            for kind, slots in self._byMatch.get(matchId, {}).items() if teams[kind]
+            for slot in slots
+        )
+
+    def resolvePouleRanking(self, pouleId: str, rankedTeamIds: List[str]) -> Dict[str, Dict[str, str]]:
+        """Emplacements à renseigner après le classement d'une poule (1er en premier)"""
+        if pouleId not in self.poules:
+            raise KeyError(f"Poule inconnue: {pouleId}")
+        ranks = self._byPoule.get(pouleId, {})
+        return self._assign(
+            (slot, rankedTeamIds[rank - 1])
+            for rank, slots in ranks.items() if rank <= len(rankedTeamIds)
+            for slot in slots
+        )
+
+    def apply(self, updates: Dict[str, Dict[str, str]]) -> None:
+        """Reporte dans le graphe des mises à jour persistées"""
+        for matchId, columns in updates.items():
+            self.matches[matchId] = self.matches[matchId].model_copy(update=columns)
+
+    def _assign(self, assignments) -> Dict[str, Dict[str, str]]:
+        updates: Dict[str, Dict[str, str]] = defaultdict(dict)
+        for (matchId, slot), teamId in assignments:
+            column = SLOT_COLUMNS[slot]
+            if getattr(self.matches[matchId], column) != teamId:
+                updates[matchId][column] = teamId
+        return dict(updates)
+
+    def _register(self, slot: Slot, value: str, matchRefs: Dict[str, str], pouleRefs: Dict[str, str]) -> None:
+        found = _MATCH_PLACEHOLDER.match(value)
+        if found:
+            source = matchRefs.get(found.group(2).lower())
+            if source:
+                self._byMatch[source][found.group(1).lower()].append(slot)
+            else:
+                self.unresolved.append((slot, value))
+            return
+
+        found = _RANK_PLACEHOLDER.match(value)
+        if found:
+            source = pouleRefs.get(found.group(2).lower())
+            if source:
+                self._byPoule[source][int(found.group(1))].append(slot)
+            else:
+                self.unresolved.append((slot, value))
+
+    def _aliases(self, ids) -> Dict[str, str]:
+        """
+        Références acceptées pour un id : l'id lui-même et l'id sans son premier
+        segment ("elim_quart_1" <- "quart_1", "poule_a" <- "a"). Alias ambigus ignorés.
+        """
+        shortened: Dict[str, set] = defaultdict(set)
+        for sourceId in ids:
+            if "_" in sourceId:
+                shortened[sourceId.split("_", 1)[1].lower()].add(sourceId)
+
+        aliases = {alias: next(iter(sources)) for alias, sources in shortened.items() if len(sources) == 1}
+        aliases.update({sourceId.lower(): sourceId for sourceId in ids})  # l'id exact prime
+        return aliases
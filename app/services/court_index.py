@@ -0,0 +1,57 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.models.models import AIGeneratedMatch
+
+
+class CourtScheduleIndex:
+    """
+    Index mémoire des matchs d'un planning, par terrain, trié par debut_horaire.
+
+    Les recherches "en cours / suivant" et par créneau se font par bisection
+    (O(log n) par terrain) au lieu d'un parcours de tous les matchs.
+    """
+
+    def __init__(self, matches: List[AIGeneratedMatch]):
+        byCourt: Dict[int, List[AIGeneratedMatch]] = defaultdict(list)
+        for match in matches:
+            byCourt[match.terrain].append(match)
+
+        self._starts: Dict[int, List[datetime]] = {}
+        self._matches: Dict[int, List[AIGeneratedMatch]] = {}
+        for terrain, courtMatches in byCourt.items():
+            courtMatches.sort(key=lambda m: (m.debut_horaire, m.match_id_ai))
+            self._matches[terrain] = courtMatches
+            self._starts[terrain] = [m.debut_horaire for m in courtMatches]
+
+    def courts(self) -> List[int]:
+        return sorted(self._matches)
+
+    def nowAndNext(self, terrain: int, at: datetime) -> Tuple[Optional[AIGeneratedMatch], Optional[AIGeneratedMatch]]:
+        """(match en cours à `at`, match suivant) sur un terrain"""
+        starts = self._starts.get(terrain, [])
+        matches = self._matches.get(terrain, [])
+        at = self._alignTz(at, starts)
+
+        index = bisect_right(starts, at)  # premier match qui commence après `at`
+        current = matches[index - 1] if index > 0 and matches[index - 1].fin_horaire > at else None
+        upcoming = matches[index] if index < len(matches) else None
+        return current, upcoming
+
+    def window(self, terrain: int, start: datetime, end: datetime) -> List[AIGeneratedMatch]:
+        """Matchs d'un terrain qui commencent dans [start, end["""
+        starts = self._starts.get(terrain, [])
+        start, end = self._alignTz(start, starts), self._alignTz(end, starts)
+        return self._matches.get(terrain, [])[bisect_left(starts, start):bisect_left(starts, end)]
+
+    def _alignTz(self, value: datetime, starts: List[datetime]) -> datetime:
+        """Aligne `value` sur les horaires indexés (avec ou sans fuseau) pour pouvoir comparer"""
+        if not starts:
+            return value
+        reference = starts[0].tzinfo
+        if reference is None and value.tzinfo is not None:
+            return value.replace(tzinfo=None)
+        if reference is not None and value.tzinfo is None:
+            return value.replace(tzinfo=reference)
+        return value
@@ -1,15 +1,35 @@
 import uuid
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from postgrest import APIError
+from postgrest.types import ReturnMethod
+from app.core.config import settings
 from app.core.database import getSupabase
+from app.core.timing import StageTimer
+from app.core.status_transition import transitionStatus
+from app.services.court_index import CourtScheduleIndex
+from app.services.bracket_resolver import PlaceholderGraph, SLOT_COLUMNS
+from app.services.planning_rows import PlanningRowsMixin
+from app.core.cache import (
+    planningCache, courtIndexCache, bracketGraphCache, invalidatePlanning, profileCache, invitationCache, NOT_FOUND,
+    normalizeEmail, profileCacheKey, cacheProfile, cacheProfileNotFound
+)
 from app.models.models import (
     AITournamentPlanning, 
     AIPlanningData, AIGeneratedMatch, AIGeneratedPoule,
-    Match,
     Profile
 )
 
-class DatabaseService():
+# Colonnes comparées lors d'une régénération incrémentale (clé : match_id_ai / poule_id)
+MATCH_DIFF_COLUMNS = ("equipe_a", "equipe_b", "terrain", "debut_horaire", "fin_horaire", "phase", "poule_id", "journee")
+POULE_DIFF_COLUMNS = ("nom_poule", "equipes", "nb_equipes", "nb_matches")
+# Équipe résolue d'un slot : périmée dès que le slot (équipe ou placeholder) change
+MATCH_RESOLVED_COLUMNS = {"equipe_a": "resolved_equipe_a_id", "equipe_b": "resolved_equipe_b_id"}
+# Résultat d'un match, effacé quand ses équipes changent : la rencontre jouée n'est plus celle-ci
+MATCH_RESULT_RESET = {"status": "scheduled"}
+
+class DatabaseService(PlanningRowsMixin):
 
     def __init__(self):
         self.supabase = getSupabase()
@@ -32,35 +52,12 @@ class DatabaseService():
         try: 
             print(f"💾 Sauvegarde planning pour tournoi {tournamentId}")
             
-            # Générer ID unique
-            planning_id = str(uuid.uuid4())
-            
-            # Valider les données avec Pydantic
-            ai_planning_data = AIPlanningData(**planningData)
-            total_matches = ai_planning_data.calculate_total_matches()
-            
-            # Créer l'objet Planning
-            planning_obj = AITournamentPlanning(
-                id=planning_id,
-                tournament_id=tournamentId,
-                type_tournoi=typeTournoi,
-                status="generated",
-                planning_data=planningData,
-                total_matches=total_matches,
-                ai_comments=ai_planning_data.commentaires,
-                created_at=datetime.now(),
-                updated_at=datetime.now()
-            )
-            
-            # Convertir en dict pour Supabase
-            planning_dict = planning_obj.model_dump()
-            planning_dict["created_at"] = planning_dict["created_at"].isoformat()
-            planning_dict["updated_at"] = planning_dict["updated_at"].isoformat()
+            planning_dict = self._buildPlanningDict(tournamentId, planningData, typeTournoi)
             
             # Sauvegarder
             result = self.supabase.table("ai_tournament_planning").insert(planning_dict).execute()
             
-            print(f"✅ Planning {planning_id} sauvegardé ({total_matches} matchs)")
+            print(f"✅ Planning {planning_dict['id']} sauvegardé ({planning_dict['total_matches']} matchs)")
             
             # Retourner l'objet Planning créé
             return AITournamentPlanning(**result.data[0])
@@ -70,13 +67,16 @@ class DatabaseService():
         
     def saveMatches(self, 
                     planningId: str, 
-                    planningData: dict) -> Optional[List[AIGeneratedMatch]]:
+                    planningData: dict,
+                    minimal: bool = False) -> Optional[List[AIGeneratedMatch]]:
         """
-        Sauvegarde tous les matchs en lot
+        Sauvegarde tous les matchs, par paquets envoyés en parallèle
         
         Args:
             planning_id: ID du planning
             planning_data: Données JSON de l'IA
+            minimal: returning=minimal, la base ne renvoie pas les lignes
+                     (les matchs retournés sont alors ceux construits localement)
             
         Returns:
             List[AIGeneratedMatch]: Matchs sauvegardés ou None si erreur
@@ -85,40 +85,57 @@ class DatabaseService():
         try:
             print(f"Extraction et sauvegarde des matchs pour planning {planningId}")
 
-            allMatches = []
-            aiPlanningData = AIPlanningData(**planningData)
+            matchesDicts = self._buildMatchesDicts(planningId, planningData)
 
-            roundRobinMatches = self._extractRoundRobinMatches(planningId, aiPlanningData)
-            allMatches.extend(roundRobinMatches)
+            if not matchesDicts:
+                print("Aucun match à sauvegarder")
+                return []
 
-            poulesMatches = self._extractPoulesMatches(planningId, aiPlanningData)
-            allMatches.extend(poulesMatches)
+            report = self._insertInChunks("ai_generated_match", matchesDicts, minimal)
+            if report["errors"]:
+                return None
+
+            print(f"{report['inserted']} matchs sauvegardes en {report['chunks']} paquet(s)")
+            return [AIGeneratedMatch(**data) for data in (matchesDicts if minimal else report["rows"])]
+
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde des matchs: {e}")
+            return None
 
-            eliminationMatches = self._extractEliminationMatches(planningId, aiPlanningData)
-            allMatches.extend(eliminationMatches)
+    def _insertInChunks(self, table: str, rows: List[dict], minimal: bool = True) -> dict:
+        """
+        Insère les lignes par paquets de MATCH_INSERT_CHUNK_SIZE, au plus
+        MATCH_INSERT_CONCURRENCY paquets en vol à la fois.
 
-            if allMatches:
-                matchesDicts = []
-                for match in allMatches:
-                    matchDict = match.model_dump()
-                    matchDict["created_at"] = matchDict["created_at"].isoformat()
-                    matchDict["debut_horaire"] = matchDict["debut_horaire"].isoformat()
-                    matchDict["fin_horaire"] = matchDict["fin_horaire"].isoformat()
+        Si un paquet échoue, les lignes des paquets déjà insérés sont supprimées
+        (par id : les lignes existantes de la table ne sont pas touchées).
 
-                    matchesDicts.append(matchDict)
+        Returns:
+            dict: {
+            "inserted": int, "chunks": int,
+            "rows": lignes renvoyées dans l'ordre des paquets (vide si minimal),
+            "errors": [{"chunk", "offset", "size", "error"}] triées par paquet,
+            "rolled_back": lignes supprimées après un échec
+            }
+        """
+        chunks = self._chunks(rows)
+        returning = ReturnMethod.minimal if minimal else ReturnMethod.representation
 
-                result = self.supabase.table("ai_generated_match").insert(matchesDicts).execute()
-                print(f"{len(allMatches)} matchs sauvegardes en lot")
-                print(f"result : {result.data}")
-                return [AIGeneratedMatch(**data) for data in result.data]
+        def insertChunk(chunk: List[dict]) -> List[dict]:
+            return self.supabase.table(table).insert(chunk, returning=returning).execute().data or []
 
-            else:
-                print("Aucun match à sauvegarder")
-                return []
+        workers = max(1, min(settings.MATCH_INSERT_CONCURRENCY, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(insertChunk, chunk) for chunk in chunks]
 
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde des matchs: {e}")
-            return None
+        report = self._chunkReport(table, chunks, futures)
+        for chunk in self._insertedIdChunks(chunks, report):
+            try:
+                self.supabase.table(table).delete(returning=ReturnMethod.minimal).in_("id", chunk).execute()
+                report["rolled_back"] += len(chunk)
+            except Exception as e:
+                print(f"❌ {table} : suppression des paquets insérés en échec : {e}")
+        return report
 
     def savePoules(self, 
                     planningId: str, 
@@ -135,60 +152,378 @@ class DatabaseService():
         """
 
         try:    
-            aiPlanningData = AIPlanningData(**planningData)
+            poulesDicts = self._buildPoulesDicts(planningId, planningData)
 
-            if not aiPlanningData.poules:
+            if not poulesDicts:
                 print("Pas de poules à sauvegarder")
                 return []
             
-            print(f"Sauvegarde de {len(aiPlanningData.poules)} poules")
-
-            allPoules = []
-
-            for poule in aiPlanningData.poules:
-                pouleObj = AIGeneratedPoule(
-                    id=str(uuid.uuid4()),
-                    planning_id=planningId,
-                    poule_id=poule.poule_id,
-                    nom_poule=poule.nom_poule,
-                    equipes=poule.equipes,
-                    nb_equipes=len(poule.equipes),
-                    nb_matches=len(poule.matchs),
-                    created_at=datetime.now()
-                )
-                allPoules.append(pouleObj)
-
-            if allPoules:
-                poulesDicts = []
-                for poule in allPoules:
-                    pouleDict = poule.model_dump()
-                    pouleDict["created_at"] = pouleDict["created_at"].isoformat()
-                    poulesDicts.append(pouleDict)
-                
-                result = self.supabase.table("ai_generated_poule").insert(poulesDicts).execute()
-                print(f"{len(allPoules)} poules sauvegardees")
-
-                return [AIGeneratedPoule(**data) for data in result.data]
-            else:
-                return []
+            print(f"Sauvegarde de {len(poulesDicts)} poules")
+
+            result = self.supabase.table("ai_generated_poule").insert(poulesDicts).execute()
+            print(f"{len(poulesDicts)} poules sauvegardees")
+
+            return [AIGeneratedPoule(**data) for data in result.data]
 
         except Exception as e:
             print(f"Erreur lors de la sauvegarde des poules {e}")
 
+    def persistPlanning(self,
+                        tournamentId: str,
+                        planningData: dict,
+                        typeTournoi: str) -> Optional[dict]:
+        """
+        Pipeline de sauvegarde d'un planning IA : le JSON est validé une seule fois,
+        puis les lignes planning, matchs et poules sont dérivées du même objet.
+
+        Avec PLANNING_SAVE_RPC, les trois tables sont écrites par la fonction Postgres
+        save_planning_atomic (une transaction, un aller-retour). Si la fonction n'est
+        pas déployée, repli sur trois insertions successives.
+
+        Args:
+            tournamentId: ID du tournoi
+            planningData: JSON complet de l'IA
+            typeTournoi: Type de tournoi
+
+        Returns:
+            dict: {
+            "planning": AITournamentPlanning,
+            "matches_count": int,
+            "poules_count": int,
+            "failed_stage": None ou étape en échec (planning déjà inséré, à supprimer),
+            "timings_ms": {étape: durée}
+            } ou None si rien n'a été sauvegardé
+        """
+        timer = StageTimer()
+        try:
+            print(f"💾 Pipeline de sauvegarde planning pour tournoi {tournamentId}")
+
+            with timer.stage("validate"):
+                aiPlanningData = AIPlanningData(**planningData)
+
+            with timer.stage("build_rows"):
+                planningDict = self._buildPlanningDict(tournamentId, planningData, typeTournoi, aiPlanningData)
+                matchesDicts = self._buildMatchesDicts(planningDict["id"], aiPlanningData)
+                poulesDicts = self._buildPoulesDicts(planningDict["id"], aiPlanningData)
+
+            if settings.PLANNING_SAVE_RPC:
+                saved = self._savePlanningAtomic(planningDict, matchesDicts, poulesDicts, timer)
+                if saved is not None:
+                    return saved
+
+            with timer.stage("insert_planning"):
+                result = self.supabase.table("ai_tournament_planning").insert(planningDict).execute()
+            planning = AITournamentPlanning(**result.data[0])
+
+        except Exception as e:
+            print(f"❌ Erreur pipeline planning ({timer.summary()}): {e}")
+            return None
+
+        failedStage = None
+        for stage, table, rows in (("insert_matches", "ai_generated_match", matchesDicts),
+                                   ("insert_poules", "ai_generated_poule", poulesDicts)):
+            if not rows:
+                continue
+            try:
+                with timer.stage(stage):
+                    report = self._insertInChunks(table, rows, minimal=True)
+            except Exception as e:
+                report = {"errors": [{"error": str(e)}]}
+            if report["errors"]:
+                print(f"❌ Erreur pipeline planning, étape {stage}: {report['errors']}")
+                failedStage = stage
+                break
+
+        return self._persistResult(planning, matchesDicts, poulesDicts, failedStage, timer)
+
+    def createPendingPlanning(self, tournamentId: str, typeTournoi: str) -> Optional[AITournamentPlanning]:
+        """Crée un planning vide en statut "generating" (rempli ensuite par syncPlanning)"""
+        try:
+            now = datetime.now()
+            planning = AITournamentPlanning(
+                id=str(uuid.uuid4()),
+                tournament_id=tournamentId,
+                type_tournoi=typeTournoi,
+                status="generating",
+                created_at=now,
+                updated_at=now
+            )
+            self.supabase.table("ai_tournament_planning")\
+                .insert(planning.model_dump(mode="json"), returning=ReturnMethod.minimal)\
+                .execute()
+            return planning
+        except Exception as e:
+            print(f"❌ Erreur création planning en attente: {e}")
+            return None
+
+    def _savePlanningAtomic(self,
+                            planningDict: dict,
+                            matchesDicts: List[dict],
+                            poulesDicts: List[dict],
+                            timer: StageTimer) -> Optional[dict]:
+        """
+        Appel RPC save_planning_atomic (ids seulement en retour).
+        None si la fonction n'existe pas (repli), lève l'erreur sinon : rien n'a été écrit.
+        """
+        try:
+            with timer.stage("rpc_save_planning"):
+                self.supabase.rpc("save_planning_atomic", {
+                    "p_planning": planningDict,
+                    "p_matches": matchesDicts,
+                    "p_poules": poulesDicts
+                }).execute()
+        except APIError as e:
+            if e.code != "PGRST202":
+                raise
+            print("⚠️ Fonction save_planning_atomic absente : insertions séparées")
+            return None
+
+        # Le planning renvoyé est celui construit localement : pas de relecture des lignes
+        planning = AITournamentPlanning(**planningDict)
+        return self._persistResult(planning, matchesDicts, poulesDicts, None, timer)
+
+    def _persistResult(self,
+                       planning: AITournamentPlanning,
+                       matchesDicts: List[dict],
+                       poulesDicts: List[dict],
+                       failedStage: Optional[str],
+                       timer: StageTimer) -> dict:
+        print(f"✅ Planning {planning.id} : {len(matchesDicts)} matchs, {len(poulesDicts)} poules "
+              f"({timer.summary()}, total {timer.total():.1f}ms)")
+        return {
+            "planning": planning,
+            "matches_count": len(matchesDicts),
+            "poules_count": len(poulesDicts),
+            "failed_stage": failedStage,
+            "timings_ms": timer.timings
+        }
+
+    def syncPlanning(self, planningId: str, planningData: dict) -> Optional[dict]:
+        """
+        Régénération incrémentale : compare le nouveau JSON de l'IA aux lignes stockées
+        (matchs par match_id_ai, poules par poule_id) et n'écrit que la différence.
+        Lignes modifiées : upsert de la ligne complète sur son id existant (statut conservé
+        si seuls l'horaire ou le terrain changent). Si les équipes d'un match changent, son
+        équipe résolue est remise à zéro et son résultat effacé (statut "scheduled"), ainsi
+        que les équipes qu'il avait qualifiées en aval (winner_/loser_). Nouvelles lignes :
+        insertion ; lignes disparues : suppression ; le reste n'est pas touché.
+
+        Args:
+            planningId: ID du planning existant
+            planningData: nouveau JSON complet de l'IA
+
+        Returns:
+            dict: {
+            "planning": AITournamentPlanning,
+            "matches" / "poules": {"inserted", "updated", "deleted", "unchanged"},
+            "rows_written": lignes réellement écrites (planning compris),
+            "timings_ms": {étape: durée}
+            } ou None si erreur (les écritures déjà faites ne sont pas annulées)
+        """
+        timer = StageTimer()
+        try:
+            print(f"🔄 Synchronisation incrémentale du planning {planningId}")
+
+            with timer.stage("validate"):
+                aiPlanningData = AIPlanningData(**planningData)
+
+            with timer.stage("load_rows"):
+                # lignes complètes : un upsert partiel remettrait les colonnes absentes à leur défaut
+                storedMatches = self.supabase.table("ai_generated_match")\
+                    .select("*")\
+                    .eq("planning_id", planningId)\
+                    .execute().data or []
+                storedPoules = self.supabase.table("ai_generated_poule")\
+                    .select("*")\
+                    .eq("planning_id", planningId)\
+                    .execute().data or []
+
+            with timer.stage("diff"):
+                matchesDiff = self._diffRows(storedMatches, self._buildMatchesDicts(planningId, aiPlanningData),
+                                             "match_id_ai", MATCH_DIFF_COLUMNS, MATCH_RESOLVED_COLUMNS,
+                                             MATCH_RESULT_RESET)
+                self._clearDependentResults(storedMatches, matchesDiff)
+                poulesDiff = self._diffRows(storedPoules, self._buildPoulesDicts(planningId, aiPlanningData),
+                                            "poule_id", POULE_DIFF_COLUMNS)
+
+            with timer.stage("write_matches"):
+                self._applyDiff("ai_generated_match", matchesDiff)
+            with timer.stage("write_poules"):
+                self._applyDiff("ai_generated_poule", poulesDiff)
+
+            with timer.stage("update_planning"):
+                result = self.supabase.table("ai_tournament_planning")\
+                    .update({
+                        "planning_data": planningData,
+                        "total_matches": aiPlanningData.calculate_total_matches(),
+                        "ai_comments": aiPlanningData.commentaires,
+                        "status": "generated",
+                        "updated_at": datetime.now().isoformat()
+                    })\
+                    .eq("id", planningId)\
+                    .execute()
+            if not result.data:
+                print("❌ Planning non trouvé")
+                return None
+            planning = AITournamentPlanning(**result.data[0])
+
+        except Exception as e:
+            print(f"❌ Erreur synchronisation planning ({timer.summary()}): {e}")
+            return None
+        finally:
+            invalidatePlanning(planningId)
+
+        counts = {"matches": self._diffCounts(matchesDiff), "poules": self._diffCounts(poulesDiff)}
+        rowsWritten = 1 + sum(c["inserted"] + c["updated"] + c["deleted"] for c in counts.values())
+        print(f"✅ Planning {planningId} synchronisé : {rowsWritten} ligne(s) écrite(s) "
+              f"({timer.summary()}, total {timer.total():.1f}ms)")
+        return {
+            "planning": planning,
+            **counts,
+            "rows_written": rowsWritten,
+            "timings_ms": timer.timings
+        }
+
+    def _diffRows(self,
+                  storedRows: List[dict],
+                  newRows: List[dict],
+                  key: str,
+                  columns: Tuple[str, ...],
+                  resetOnChange: Optional[dict] = None,
+                  resetRow: Optional[dict] = None) -> dict:
+        """
+        Différence entre lignes stockées et nouvelles lignes, par clé métier.
+
+        Args:
+            resetOnChange: colonne comparée -> colonne remise à None quand elle change
+            resetRow: valeurs réécrites dès qu'une colonne de resetOnChange change
+
+        Returns:
+            dict: {"inserted": [lignes complètes], "updated": [lignes stockées complètes,
+            colonnes comparées mises à jour], "deleted": [ids], "unchanged": int,
+            "reset": [clés dont resetRow a modifié la ligne]}
+        """
+        resetOnChange = resetOnChange or {}
+        resetRow = resetRow or {}
+        newKeys = [row[key] for row in newRows]
+        if len(set(newKeys)) != len(newKeys):
+            raise ValueError(f"{key} en double dans le nouveau planning")
+
+        stored = {}
+        deleted = []
+        for row in storedRows:
+            if row[key] in stored:
+                deleted.append(row["id"])  # doublon historique
+            else:
+                stored[row[key]] = row
+
+        inserted, updated, reset, unchanged = [], [], [], 0
+        for row in newRows:
+            current = stored.pop(row[key], None)
+            if current is None:
+                inserted.append(row)
+            else:
+                changed = [column for column in columns if not self._sameValue(current.get(column), row[column])]
+                if not changed:
+                    unchanged += 1
+                    continue
+                fullRow = {**current, **{column: row[column] for column in columns}}
+                fullRow.update({resetOnChange[column]: None for column in changed if column in resetOnChange})
+                if any(column in resetOnChange for column in changed):
+                    if any(current.get(column) != value for column, value in resetRow.items()):
+                        reset.append(row[key])
+                    fullRow.update(resetRow)
+                updated.append(fullRow)
+        deleted.extend(row["id"] for row in stored.values())
+        return {"inserted": inserted, "updated": updated, "deleted": deleted, "unchanged": unchanged,
+                "reset": reset}
+
+    def _clearDependentResults(self, storedMatches: List[dict], diff: dict) -> None:
+        """
+        Efface en aval les résultats des matchs remis à zéro par _diffRows : équipes résolues
+        alimentées par leur winner_/loser_, et en cascade le résultat des matchs concernés.
+        Les lignes touchées passent dans diff["updated"].
+        """
+        if not diff["reset"]:
+            return
+        updated = {row["match_id_ai"]: row for row in diff["updated"]}
+        deleted = set(diff["deleted"])
+        final = {row["match_id_ai"]: row for row in storedMatches if row["id"] not in deleted}
+        final.update({row["match_id_ai"]: row for row in diff["inserted"]})
+        final.update(updated)
+        graph = PlaceholderGraph([AIGeneratedMatch(**row) for row in final.values()])
+
+        pending = list(diff["reset"])
+        while pending:
+            for slots in graph.dependents(pending.pop()).values():
+                for matchId, slot in slots:
+                    column = SLOT_COLUMNS[slot]
+                    if final[matchId].get(column) is None:
+                        continue
+                    if matchId not in updated:
+                        updated[matchId] = final[matchId] = dict(final[matchId])
+                        diff["updated"].append(updated[matchId])
+                        diff["unchanged"] -= 1
+                    row = updated[matchId]
+                    row[column] = None
+                    if any(row.get(key) != value for key, value in MATCH_RESULT_RESET.items()):
+                        row.update(MATCH_RESULT_RESET)
+                        pending.append(matchId)
+
+    def _diffCounts(self, diff: dict) -> dict:
+        return {
+            "inserted": len(diff["inserted"]),
+            "updated": len(diff["updated"]),
+            "deleted": len(diff["deleted"]),
+            "unchanged": diff["unchanged"]
+        }
+
+    def _sameValue(self, stored, new) -> bool:
+        """Égalité tolérante au format renvoyé par PostgREST (horaires avec fuseau UTC)"""
+        if isinstance(stored, str) and isinstance(new, str) and stored != new:
+            try:
+                return self._asUtc(stored) == self._asUtc(new)
+            except ValueError:
+                return False
+        return stored == new
+
+    def _asUtc(self, text: str) -> datetime:
+        value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+    def _applyDiff(self, table: str, diff: dict) -> None:
+        """Écrit une différence calculée par _diffRows (lève l'erreur au premier échec)"""
+        if diff["inserted"]:
+            report = self._insertInChunks(table, diff["inserted"], minimal=True)
+            if report["errors"]:
+                raise RuntimeError(f"Insertion {table}: {report['errors']}")
+        for chunk in self._chunks(diff["updated"]):
+            self.supabase.table(table).upsert(chunk, returning=ReturnMethod.minimal).execute()
+        for chunk in self._chunks(diff["deleted"]):
+            self.supabase.table(table).delete(returning=ReturnMethod.minimal).in_("id", chunk).execute()
+
     def getPlanningWithDetailsByPlanningId(self, planningId: str) -> Optional[dict]:
         """
-        Récupère un planning avec tous ses détails
+        Récupère la ligne planning (matchs et poules : voir getPlanningDetails)
         
         Args:
             planningId: ID du planning
             
         Returns:
-            dict: {
-            "planning": AITournamentPlanning, 
-            "matches": List[AIGeneratedMatch], 
-            "poules": List[AIGeneratedPoule]
-            } ou None si erreur
+            AITournamentPlanning ou None si erreur
+        """
+        result = self.getPlanningByIdWithEtag(planningId)
+        return result[0] if result else None
+
+    def getPlanningByIdWithEtag(self, planningId: str) -> Optional[Tuple[AITournamentPlanning, str]]:
+        """
+        Récupère un planning et son ETag, mis en cache ensemble : une revalidation
+        ne relit pas la base et ne resérialise pas planning_data
         """
+        cached = planningCache.getWithEtag(planningId)
+        if cached is not None:
+            return cached
+
         try:
             print(f"Recuperation planning {planningId}")
 
@@ -202,25 +537,168 @@ class DatabaseService():
                 return None
             planningObj = AITournamentPlanning(**planningResult.data)
 
-            # matchesResult = self.supabase.table("ai_generated_match")\
-            #     .select("*")\
-            #     .eq("planning_id", planningId)\
-            #     .order("debut_horaire")\
-            #     .execute()
-            # matchesObj = [AIGeneratedMatch(**matchData) for matchData in matchesResult.data or []]
+            etag = self._planningEtag(planningObj)
+            planningCache.set(planningId, planningObj, etag=etag)
+            return planningObj, etag
+        
+        except Exception as e:
+            print(f"Erreur recuperation planning {e}")
+            return None
 
-            # poulesResult = self.supabase.table("ai_generated_poule")\
-            #     .select("*")\
-            #     .eq("planning_id", planningId)\
-            #     .execute()
-            # poulesObj = [AIGeneratedPoule(**pouleData) for pouleData in poulesResult.data or []]
+    def getPlanningDetails(self,
+                           planningId: str,
+                           fields: Optional[List[str]] = None,
+                           include: Optional[List[str]] = None) -> Optional[dict]:
+        """
+        Récupère un planning avec ses matchs (triés par debut_horaire) et ses poules
+        en une seule requête (relations embarquées)
 
+        Args:
+            planningId: ID du planning
+            fields: colonnes du planning à renvoyer (toutes par défaut) ;
+                    sans "planning_data", le JSON complet de l'IA n'est pas transféré
+            include: relations à embarquer, parmi "matches" et "poules" (les deux par défaut)
+
+        Returns:
+            dict: {
+            "planning": dict (colonnes demandées),
+            "matches": List[AIGeneratedMatch],
+            "poules": List[AIGeneratedPoule]
+            } ou None si non trouvé / erreur. Lève ValueError si un champ est inconnu.
+        """
+        query = self.supabase.table("ai_tournament_planning")\
+            .select(self._planningDetailsSelect(fields, include))\
+            .eq("id", planningId)
+        if include is None or "matches" in include:
+            query = query.order("debut_horaire", foreign_table="matches")\
+                .order("terrain", foreign_table="matches")
+
+        try:
+            print(f"Recuperation planning detaille {planningId}")
+            result = query.maybe_single().execute()
+            if not result or not result.data:
+                print("Planning non trouve")
+                return None
+            return self._toPlanningDetails(result.data)
 
-            return planningObj
-        
         except Exception as e:
-            print(f"Erreur recuperation planning {e}")
+            print(f"Erreur recuperation planning detaille {e}")
+            return None
+
+    def getPlanningMatches(self,
+                           planningId: str,
+                           terrain: Optional[int] = None,
+                           startFrom: Optional[datetime] = None,
+                           startTo: Optional[datetime] = None,
+                           phase: Optional[str] = None,
+                           pouleId: Optional[str] = None,
+                           journee: Optional[int] = None) -> Optional[List[AIGeneratedMatch]]:
+        """
+        Matchs d'un planning filtrés côté base, triés par debut_horaire puis terrain
+        (index composites : supabase/migrations/20250702000000_ai_generated_match_indexes.sql)
+
+        Args:
+            terrain, phase, pouleId, journee: filtres d'égalité optionnels
+            startFrom, startTo: debut_horaire dans [startFrom, startTo[
+
+        Returns:
+            List[AIGeneratedMatch] ou None si erreur
+        """
+        try:
+            result = self._planningMatchesQuery(planningId, terrain, startFrom, startTo, phase, pouleId, journee).execute()
+            return [AIGeneratedMatch(**data) for data in result.data or []]
+        except Exception as e:
+            print(f"Erreur recuperation matchs du planning {planningId}: {e}")
+            return None
+
+    def getCourtIndex(self, planningId: str) -> Optional[CourtScheduleIndex]:
+        """Index par terrain des matchs du planning (construit une fois, puis servi par le cache)"""
+        index = courtIndexCache.get(planningId)
+        if index is not None:
+            return index
+
+        matches = self.getPlanningMatches(planningId)
+        if matches is None:
+            return None
+        index = CourtScheduleIndex(matches)
+        courtIndexCache.set(planningId, index)
+        return index
+
+    def getPlaceholderGraph(self, planningId: str) -> Optional[PlaceholderGraph]:
+        """
+        Graphe des placeholders du planning (construit une fois, puis servi par le cache).
+        Renvoie une copie propre à la requête : le graphe en cache est partagé entre
+        requêtes et threads, il n'est jamais modifié sur place.
+        """
+        graph = bracketGraphCache.get(planningId)
+        if graph is None:
+            matches = self.getPlanningMatches(planningId)
+            if matches is None:
+                return None
+            graph = PlaceholderGraph(matches)
+            bracketGraphCache.set(planningId, graph)
+        return graph.copy()
+
+    def recordMatchResult(self,
+                          planningId: str,
+                          matchId: str,
+                          winnerTeamId: str,
+                          loserTeamId: Optional[str] = None) -> Optional[dict]:
+        """
+        Enregistre le résultat d'un match (statut completed) et renseigne les équipes
+        des matchs qui en dépendent (winner_/loser_), en une seule écriture.
+
+        Returns:
+            dict: {"resolved": {match_id_ai: {colonne: team_id}}, "rows_written": int}
+            ou None si erreur ; KeyError si le match n'existe pas dans le planning
+        """
+        graph = self.getPlaceholderGraph(planningId)
+        if graph is None:
+            return None
+        updates = graph.resolveMatchResult(matchId, winnerTeamId, loserTeamId)
+        return self._persistResolutions(planningId, graph, updates, completedMatchId=matchId)
+
+    def recordPouleRanking(self, planningId: str, pouleId: str, rankedTeamIds: List[str]) -> Optional[dict]:
+        """
+        Enregistre le classement final d'une poule (1er en premier) et renseigne
+        les matchs qui en dépendent (1er_, 2e_...), en une seule écriture.
+
+        Returns:
+            Même rapport que recordMatchResult ; KeyError si la poule n'existe pas
+        """
+        graph = self.getPlaceholderGraph(planningId)
+        if graph is None:
+            return None
+        updates = graph.resolvePouleRanking(pouleId, rankedTeamIds)
+        return self._persistResolutions(planningId, graph, updates)
+
+    def _persistResolutions(self,
+                            planningId: str,
+                            graph: PlaceholderGraph,
+                            updates: dict,
+                            completedMatchId: Optional[str] = None) -> Optional[dict]:
+        rows = self._resolutionRows(graph, updates, completedMatchId)
+        try:
+            if rows:
+                self.supabase.table("ai_generated_match").upsert(rows, returning=ReturnMethod.minimal).execute()
+        except Exception as e:
+            print(f"❌ Erreur résolution des placeholders du planning {planningId}: {e}")
             return None
+        return self._resolutionResult(planningId, graph, updates, completedMatchId, len(rows))
+
+    def iterPlanningMatchRows(self, planningId: str, pageSize: Optional[int] = None) -> Iterator[dict]:
+        """
+        Lignes brutes des matchs d'un planning, page par page (keyset sur debut_horaire, id).
+        Une seule page en mémoire à la fois, pas de modèle Pydantic par ligne.
+        """
+        pageSize = pageSize or settings.EXPORT_PAGE_SIZE
+        last = None
+        while True:
+            rows = self._matchesPageQuery(planningId, last, pageSize).execute().data or []
+            yield from rows
+            if len(rows) < pageSize:
+                return
+            last = rows[-1]
 
     def getPlanningWithDetailsByTournamentId(self, tournamentId: str) -> Optional[dict]:
         """
@@ -269,6 +747,7 @@ class DatabaseService():
             })\
             .eq("id", planningId)\
             .execute()
+            invalidatePlanning(planningId)
 
             print("Statut mis à jour")
             return True
@@ -277,147 +756,27 @@ class DatabaseService():
             print(f"Erreur mise à jour planning: {e}")
             return False
 
-    def _extractRoundRobinMatches(self, 
-                                  planningId: str, 
-                                  aiPlanningData: AIPlanningData) -> List[AIGeneratedMatch]:
+    def transitionPlanningStatuses(self,
+                                   planningIds: List[str],
+                                   expectedStatus: str,
+                                   newStatus: str) -> Optional[dict]:
         """
-        Extrait les matchs round robin
-        """
-        matches = []
+        Passe en lot des plannings de expectedStatus à newStatus, en un aller-retour.
+        Les plannings qui ne sont plus dans expectedStatus (écrivain concurrent) sont ignorés.
 
-        for match in aiPlanningData.matchs_round_robin:
-            try:
-                matchObj = AIGeneratedMatch(
-                    id=str(uuid.uuid4()),
-                    planning_id=planningId,
-                    match_id_ai=match.match_id,
-                    equipe_a=match.equipe_a,
-                    equipe_b=match.equipe_b,
-                    terrain=match.terrain,
-                    debut_horaire=match.debut_horaire,
-                    fin_horaire=match.fin_horaire,
-                    phase="round_robin",
-                    journee=match.journee,
-                    status="scheduled",
-                    created_at=datetime.now()
-                )
-                matches.append(matchObj)
-            except Exception as e:
-                print(f"Match round robin invalide ignore: {e}")
-                continue
-        
-        return matches
-
-    def _extractPoulesMatches(self, 
-                              planningId: str, 
-                              aiPlanningData: AIPlanningData) -> List[AIGeneratedPoule]:
-        """
-        Extrait les matchs de poules
-        """
-        matches = []
-
-        for poule in aiPlanningData.poules:
-            for match in poule.matchs:
-                try:
-                    matchObj = AIGeneratedMatch(
-                        id=str(uuid.uuid4()),
-                        planning_id=planningId,
-                        match_id_ai=match.match_id,
-                        equipe_a=match.equipe_a,
-                        equipe_b=match.equipe_b,
-                        terrain=match.terrain,
-                        debut_horaire=match.debut_horaire,
-                        fin_horaire=match.fin_horaire,
-                        phase="poules",
-                        poule_id=poule.poule_id,
-                        status="scheduled",
-                        created_at=datetime.now()
-                    )
-                    matches.append(matchObj)
-                except Exception as e:
-                    print(f"Match de poules invalide ignore: {e}")
-                    continue
-        return matches
-    
-    def _extractEliminationMatches(self,
-                                   planningId: str, 
-                                   aiPlanningData: AIPlanningData) -> List[AIGeneratedMatch]:
-        """
-        Extrait les matchs d'élimination apres les poules
+        Returns:
+            dict: {"expected_status", "new_status", "transitioned", "skipped"} ou None si erreur
         """
-
-        matches = []
-
-        if not aiPlanningData.phase_elimination_apres_poules:
-            return matches
-        
-        elimination = aiPlanningData.phase_elimination_apres_poules
-
-        # Quarts de finale
-        for match in elimination.quarts:
-            matchObj = self._createEliminationMatchObject(
-                planningId,
-                match, 
-                "elimination"
-            )
-            if matchObj:
-                matches.append(matchObj)
-
-        # demi-finales
-        for match in elimination.demi_finales:
-            match_obj = self._createEliminationMatchObject(
-                planningId, 
-                match, 
-                "elimination"
-            )
-            if match_obj:
-                matches.append(match_obj)
-
-        # Finale
-        if elimination.finale:
-            match_obj = self._createEliminationMatchObject(
-                planningId, 
-                elimination.finale, 
-                "finale"
-            )
-            if match_obj:
-                matches.append(match_obj)
-
-        # Match 3e place
-        if elimination.match_troisieme_place:
-            match_obj = self._createEliminationMatchObject(
-                planningId, 
-                elimination.match_troisieme_place, 
-                "elimination"
-            )
-            if match_obj:
-                matches.append(match_obj)
-
-        return matches
-    
-    def _createEliminationMatchObject(self, 
-                                         planningId: str, 
-                                         match: Match, 
-                                         phase: str) -> Optional[AIGeneratedMatch]:
-        """Crée un objet AIGeneratedMatch pour un match d'élimination"""
         try:
-            return AIGeneratedMatch(
-                id=str(uuid.uuid4()),
-                planning_id=planningId,
-                match_id_ai=match.match_id,
-                equipe_a=match.equipe_a,
-                equipe_b=match.equipe_b,
-                terrain=match.terrain,
-                debut_horaire=match.debut_horaire,
-                fin_horaire=match.fin_horaire,
-                phase=phase,
-                status="scheduled",
-                created_at=datetime.now()
-            )
+            print(f"Transition de {len(planningIds)} planning(s) {expectedStatus} -> {newStatus}")
+            report = transitionStatus(self.supabase, "ai_tournament_planning", planningIds, expectedStatus, newStatus)
+            for planningId in report["transitioned"]:
+                invalidatePlanning(planningId)
+            return report
         except Exception as e:
-            print(f"⚠️ Match élimination invalide ignore: {e}")
+            print(f"Erreur transition statut plannings: {e}")
             return None
-    
+
     def getUserById(self, userId: str) -> Optional[Profile]:
         """
         Récupère un utilisateur par son ID
@@ -428,66 +787,70 @@ class DatabaseService():
         Returns:
             Profile: Utilisateur trouvé ou None si erreur/non trouvé
         """
-        try:
-            print(f"🔍 Récupération utilisateur {userId}")
-            
-            # Récupérer l'utilisateur depuis la table profile
-            result = self.supabase.table("profile")\
-                .select("*")\
-                .eq("id", userId)\
-                .single()\
-                .execute()
-            
-            if not result.data:
-                print(f"❌ Aucun utilisateur trouvé avec l'ID {userId}")
-                return None
-            
-            # Créer l'objet Profile
-            user = Profile(**result.data)
-            
-            print(f"✅ Utilisateur {user.email} récupéré avec succès")
-            return user
-            
-        except Exception as e:
-            print(f"❌ Erreur lors de la récupération de l'utilisateur : {e}")
-            return None
+        return self._getProfile("id", userId)
 
     def getUserByEmail(self, userEmail: str) -> Optional[Profile]:
         """
-        Récupère un utilisateur par son email
+        Récupère un utilisateur par son email (insensible à la casse)
         """
+        return self._getProfile("email", userEmail)
+
+    def sendInvitationEmail(self, email: str) -> bool:
+        """
+        Envoie l'invitation, au plus une fois par email pendant
+        CACHE_PROFILE_NEGATIVE_TTL (les rafales de recherches n'invitent qu'une fois)
+        """
+        email = normalizeEmail(email)
+        if not invitationCache.add(email, True):
+            print(f"ℹ️ Invitation déjà envoyée récemment à {email}")
+            return True
         try:
-            print(f"🔍 Récupération utilisateur {userEmail}")
+            print(f"🔍 Envoi email d'invitation à {email}")
+            result = self.supabase.auth.admin.invite_user_by_email(email)
+            print(f"✅ Email d'invitation envoyé à {email}")
+            return True
+        except Exception as e:
+            # Échec : autoriser un nouvel essai
+            invitationCache.invalidate(email)
+            print(f"❌ Erreur envoi email d'invitation: {e}")
+            return False
+
+    def _getProfile(self, column: str, value: str) -> Optional[Profile]:
+        """Lecture d'un profil via le cache (entrées positives et négatives)"""
+        cached = profileCache.get(profileCacheKey(column, value))
+        if cached is NOT_FOUND:
+            print(f"❌ Aucun utilisateur trouvé ({column}={value}) [cache]")
+            return None
+        if cached is not None:
+            return cached
+
+        try:
+            print(f"🔍 Récupération utilisateur {value}")
             
             # Récupérer l'utilisateur depuis la table profile
-            result = self.supabase.table("profile")\
-                .select("*")\
-                .eq("email", userEmail)\
+            query = self.supabase.table("profile").select("*")
+            result = self._profileFilter(query, column, value)\
                 .single()\
                 .execute()
             
             if not result.data:
-                print(f"❌ Aucun utilisateur trouvé avec l'email {userEmail}")
+                print(f"❌ Aucun utilisateur trouvé ({column}={value})")
+                cacheProfileNotFound(column, value)
                 return None
             
             # Créer l'objet Profile
             user = Profile(**result.data)
+            cacheProfile(user)
             
             print(f"✅ Utilisateur {user.email} récupéré avec succès")
             return user
             
         except Exception as e:
+            if self._isNotFound(e):
+                print(f"❌ Aucun utilisateur trouvé ({column}={value})")
+                cacheProfileNotFound(column, value)
+                return None
             print(f"❌ Erreur lors de la récupération de l'utilisateur : {e}")
             return None
 
-    def sendInvitationEmail(self, email: str) -> bool:
-        try:
-            print(f"🔍 Envoi email d'invitation à {email}")
-            result = self.supabase.auth.admin.invite_user_by_email(email)
-            print(f"✅ Email d'invitation envoyé à {email}")
-            return True
-        except Exception as e:
-            print(f"❌ Erreur envoi email d'invitation: {e}")
-            return False
-    
 databaseService = DatabaseService()
\ No newline at end of file
@@ -0,0 +1,271 @@
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+from app.models.models import Team, Tournament
+
+# Moteur de planification local et déterministe, alternative à l'assistant :
+# mêmes entrées, même JSON (compatible AIPlanningData), en quelques millisecondes.
+#   round_robin          -> méthode du cercle (chaque équipe joue une fois par journée)
+#   poules_elimination   -> poules équilibrées (serpentin) puis tableau croisé
+#   elimination_directe  -> tableau avec têtes de série et exempts (byes)
+# Les matchs sont ensuite placés de façon gloutonne sur le premier terrain libre,
+# en respectant durée, pause (terrain et équipe), dépendances du tableau, pause déjeuner
+# et fin de journée (la suite du planning reprend le lendemain à l'heure de début).
+
+LOCAL_TOURNAMENT_TYPES = ("round_robin", "poules_elimination", "elimination_directe")
+
+LUNCH_BREAK = (time(12, 0), time(13, 30))  # aucun match ne chevauche ce créneau
+DEFAULT_START_TIME = time(9, 0)
+DAY_END = time(22, 0)  # aucun match ne finit après : le suivant passe au lendemain
+
+# Têtes de série : niveau le plus élevé d'abord, puis ordre d'inscription
+SKILL_RANKS = {"professionnel": 0, "expert": 1, "confirme": 2, "amateur": 3, "debutant": 4}
+
+MAX_POULES = 8  # la phase finale après poules va au plus des quarts (8 qualifiés)
+MIN_POULE_SIZE = 3
+
+# Noms des tours selon le nombre d'équipes restantes : (clé du tour, préfixe des match_id)
+ROUND_NAMES = {
+    2: ("finale", "finale"),
+    4: ("demi_finales", "demi"),
+    8: ("quarts", "quart"),
+    16: ("huitiemes", "huitieme"),
+    32: ("seiziemes", "seizieme"),
+    64: ("trente_deuxiemes", "trente_deuxieme"),
+}
+
+# (match_id, equipe_a, equipe_b) ; placeholders winner_<id>, loser_<id>, 1er_<poule>...
+Pairing = Tuple[str, str, str]
+
+
+def generateLocalPlanning(tournament: Tournament, teams: List[Team]) -> dict:
+    """
+    JSON de planning (même format que la réponse de l'assistant, dates ISO).
+
+    Raises:
+        ValueError: type de tournoi non géré ou moins de 2 équipes
+    """
+    if tournament.tournament_type not in LOCAL_TOURNAMENT_TYPES:
+        raise ValueError(f"Type de tournoi non géré par le moteur local: {tournament.tournament_type}")
+    if len(teams) < 2:
+        raise ValueError("Pas assez d'équipes (minimum 2)")
+
+    slots = SlotAllocator(
+        datetime.combine(tournament.start_date, tournament.start_time or DEFAULT_START_TIME),
+        tournament.courts_available,
+        tournament.match_duration_minutes,
+        tournament.break_duration_minutes
+    )
+    seeds = seedTeams(teams)
+    planning = {
+        "type_tournoi": tournament.tournament_type,
+        "final_ranking": [],
+        "commentaires": "Planning généré par le moteur local"
+    }
+
+    if tournament.tournament_type == "round_robin":
+        planning["matchs_round_robin"] = [
+            {**slots.place(matchId, teamA, teamB), "journee": journee}
+            for journee, pairings in enumerate(roundRobinRounds([team.name for team in teams], "rr"), start=1)
+            for matchId, teamA, teamB in pairings
+        ]
+
+    elif tournament.tournament_type == "poules_elimination":
+        poules = balancedPoules(seeds)
+        planning["poules"] = [
+            {"poule_id": f"poule_{chr(ord('a') + index)}", "nom_poule": f"Poule {chr(ord('A') + index)}",
+             "equipes": equipes, "matchs": []}
+            for index, equipes in enumerate(poules)
+        ]
+        # journées des poules entrelacées : toutes les poules avancent en parallèle sur les terrains
+        pouleRounds = [roundRobinRounds(poule["equipes"], poule["poule_id"]) for poule in planning["poules"]]
+        for journee in range(max(len(rounds) for rounds in pouleRounds)):
+            for poule, rounds in zip(planning["poules"], pouleRounds):
+                if journee < len(rounds):
+                    poule["matchs"] += [slots.place(*pairing) for pairing in rounds[journee]]
+        for poule in planning["poules"]:
+            slots.finishGroup([f"{rank}_{poule['poule_id']}" for rank in ("1er", "2e")], poule["matchs"])
+
+        rounds = eliminationRounds(pouleQualifiers(len(poules)), "elim")
+        placed = {key: [slots.place(*pairing) for pairing in pairings] for key, pairings in rounds}
+        planning["phase_elimination_apres_poules"] = {
+            "quarts": placed.get("quarts", []),
+            "demi_finales": placed.get("demi_finales", []),
+            "finale": placed["finale"][0],
+            "match_troisieme_place": placed.get("petite_finale", [None])[0]
+        }
+
+    else:
+        rounds = eliminationRounds([team.name for team in seeds], "elim")
+        planning["rounds_elimination"] = {
+            key: [slots.place(*pairing) for pairing in pairings] for key, pairings in rounds
+        }
+
+    return planning
+
+
+def seedTeams(teams: List[Team]) -> List[Team]:
+    """Ordre des têtes de série (tri stable : l'ordre d'inscription départage)"""
+    return sorted(teams, key=lambda team: SKILL_RANKS.get((team.skill_level or "").lower(), len(SKILL_RANKS)))
+
+
+def roundRobinRounds(names: List[str], prefix: str) -> List[List[Pairing]]:
+    """
+    Méthode du cercle : la première équipe est fixe, les autres tournent d'un cran
+    par journée ; avec un nombre impair, une équipe fictive donne un repos.
+    Les côtés alternent pour équilibrer equipe_a / equipe_b.
+    """
+    circle: List[Optional[str]] = list(names) + ([None] if len(names) % 2 else [])
+    size = len(circle)
+    rounds, number = [], 0
+    for journee in range(size - 1):
+        pairings = []
+        for i in range(size // 2):
+            teamA, teamB = circle[i], circle[size - 1 - i]
+            if teamA is None or teamB is None:
+                continue
+            if (journee + i) % 2:
+                teamA, teamB = teamB, teamA
+            number += 1
+            pairings.append((f"{prefix}_m{number}", teamA, teamB))
+        rounds.append(pairings)
+        circle = [circle[0], circle[-1]] + circle[1:-1]
+    return rounds
+
+
+def balancedPoules(seeds: List[Team]) -> List[List[str]]:
+    """
+    Poules en nombre puissance de 2 (au plus MAX_POULES), tailles à une équipe près,
+    têtes de série réparties en serpentin (A B C D D C B A ...).
+    """
+    count = 1
+    while count * 2 <= min(MAX_POULES, len(seeds) // MIN_POULE_SIZE):
+        count *= 2
+
+    poules: List[List[str]] = [[] for _ in range(count)]
+    for index, team in enumerate(seeds):
+        lap, position = divmod(index, count)
+        poules[position if lap % 2 == 0 else count - 1 - position].append(team.name)
+    return poules
+
+
+def pouleQualifiers(pouleCount: int) -> List[str]:
+    """
+    Qualifiés dans l'ordre des têtes de série : les 1ers puis les 2es (au plus 8).
+    Avec le tableau standard (1 contre 8, ...), deux équipes d'une même poule
+    ne se croisent pas avant la finale.
+    """
+    letters = [chr(ord("a") + index) for index in range(pouleCount)]
+    qualifiers = [f"1er_poule_{letter}" for letter in letters]
+    if pouleCount * 2 <= MAX_POULES:
+        qualifiers += [f"2e_poule_{letter}" for letter in letters]
+    return qualifiers
+
+
+def bracketOrder(size: int) -> List[int]:
+    """Positions des têtes de série dans un tableau de `size` (puissance de 2) : 1, 8, 4, 5, 2, 7, 3, 6"""
+    order = [1]
+    while len(order) < size:
+        order = [seed for current in order for seed in (current, 2 * len(order) + 1 - current)]
+    return order
+
+
+def eliminationRounds(entrants: List[str], prefix: str) -> List[Tuple[str, List[Pairing]]]:
+    """
+    Tours du tableau, du premier à la finale (+ petite finale dès 4 entrants).
+    Les meilleures têtes de série sont exemptes du premier tour si le nombre
+    d'entrants n'est pas une puissance de 2 : elles entrent directement au tour suivant.
+    """
+    size = 1
+    while size < len(entrants):
+        size *= 2
+
+    slots: List[Optional[str]] = [entrants[seed - 1] if seed <= len(entrants) else None for seed in bracketOrder(size)]
+    rounds: List[Tuple[str, List[Pairing]]] = []
+    semiFinals: List[str] = []
+    while len(slots) > 1:
+        key, matchPrefix = ROUND_NAMES.get(len(slots), (f"tour_de_{len(slots)}", f"tour{len(slots)}"))
+        pairings, winners = [], []
+        for i in range(0, len(slots), 2):
+            teamA, teamB = slots[i], slots[i + 1]
+            if teamB is None or teamA is None:  # exempt
+                winners.append(teamA or teamB)
+                continue
+            matchId = f"{prefix}_{matchPrefix}" if key == "finale" else f"{prefix}_{matchPrefix}_{len(pairings) + 1}"
+            pairings.append((matchId, teamA, teamB))
+            winners.append(f"winner_{matchId}")
+        if key == "demi_finales":
+            semiFinals = [matchId for matchId, _, _ in pairings]
+        rounds.append((key, pairings))
+        slots = winners
+
+    if len(semiFinals) == 2:
+        rounds.append(("petite_finale", [(f"{prefix}_petite_finale", f"loser_{semiFinals[0]}", f"loser_{semiFinals[1]}")]))
+    return rounds
+
+
+class SlotAllocator:
+    """
+    Placement glouton : chaque match, dans l'ordre, prend le terrain où il peut
+    commencer au plus tôt, une fois le terrain libéré (+ pause), ses deux équipes
+    reposées (+ pause), hors pause déjeuner et avant la fin de journée.
+    Égalité : le terrain le moins utilisé, puis le plus petit numéro.
+    """
+
+    def __init__(self, start: datetime, courts: int, durationMinutes: int, breakMinutes: int):
+        self.start = start
+        self.dayStart = start.time()
+        self.duration = timedelta(minutes=durationMinutes)
+        self.pause = timedelta(minutes=breakMinutes)
+        self.courtFree = [start] * max(1, courts)
+        self.courtUse = [0] * max(1, courts)
+        self.readyAt: Dict[str, datetime] = {}  # équipe ou placeholder -> disponible à partir de
+
+    def place(self, matchId: str, teamA: str, teamB: str) -> dict:
+        earliest = max(self.readyAt.get(teamA, self.start), self.readyAt.get(teamB, self.start))
+        begin, _, court = min(
+            (self._nextSlot(max(free, earliest)), self.courtUse[index], index)
+            for index, free in enumerate(self.courtFree)
+        )
+        end = begin + self.duration
+        self.courtFree[court] = end + self.pause
+        self.courtUse[court] += 1
+        for label in (teamA, teamB, f"winner_{matchId}", f"loser_{matchId}"):
+            self.readyAt[label] = end + self.pause
+        return {
+            "match_id": matchId,
+            "equipe_a": teamA,
+            "equipe_b": teamB,
+            "debut_horaire": begin.isoformat(),
+            "fin_horaire": end.isoformat(),
+            "terrain": court + 1
+        }
+
+    def finishGroup(self, labels: List[str], matchs: List[dict]) -> None:
+        """Les placeholders de classement d'une poule attendent la fin de tous ses matchs"""
+        end = max((datetime.fromisoformat(match["fin_horaire"]) for match in matchs), default=self.start)
+        for label in labels:
+            self.readyAt[label] = end + self.pause
+
+    def _nextSlot(self, begin: datetime) -> datetime:
+        """
+        Premier début possible à partir de begin : pas avant l'heure de début du jour,
+        après la pause déjeuner, sinon le lendemain.
+
+        Raises:
+            ValueError: aucun match ne tient dans une journée (durée trop longue)
+        """
+        newDays = 0
+        while True:
+            dayStart = datetime.combine(begin.date(), self.dayStart)
+            lunchStart, lunchEnd = (datetime.combine(begin.date(), bound) for bound in LUNCH_BREAK)
+            if begin < dayStart:
+                begin = dayStart
+            elif begin < lunchEnd and begin + self.duration > lunchStart:
+                begin = lunchEnd
+            elif begin + self.duration > datetime.combine(begin.date(), DAY_END):
+                newDays += 1
+                if newDays > 1:
+                    raise ValueError(f"Durée de match incompatible avec la journée ({self.dayStart:%H:%M}-{DAY_END:%H:%M})")
+                begin = datetime.combine(begin.date() + timedelta(days=1), self.dayStart)
+            else:
+                return begin
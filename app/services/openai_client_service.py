@@ -2,6 +2,15 @@ from openai import OpenAI
 from app.core.config import settings
 import time
 import json
+from typing import Callable, Optional
+
+RUN_FAILED_STATUSES = ("failed", "cancelled", "expired", "incomplete")
+RUN_FAILED_EVENTS = tuple(f"thread.run.{status}" for status in RUN_FAILED_STATUSES)
+
+
+class AssistantRunError(Exception):
+    """Run terminé sans réponse exploitable (échec, annulation, expiration)"""
+
 
 class OpenAIClientService:
 
@@ -9,12 +18,17 @@ class OpenAIClientService:
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
         self.assistant_id = settings.OPENAI_ASSISTANT_ID
 
-    def generate_planning(self, prompt:str) -> dict:
+    def generate_planning(self,
+                          prompt:str,
+                          timeout: Optional[float] = None,
+                          on_usage: Optional[Callable[[dict], None]] = None) -> dict:
         """
         Génère un planning en appelant ton assistant
         
         Args:
             prompt: Le prompt avec les données du tournoi
+            timeout: délai maximum en secondes (plafonné par OPENAI_RUN_TIMEOUT)
+            on_usage: appelé avec {"prompt_tokens", "completion_tokens", "total_tokens"} du run
             
         Returns:
             dict: Planning généré par l'IA
@@ -26,11 +40,7 @@ class OpenAIClientService:
                 role="user",
                 content=prompt
             )
-            run = self.client.beta.threads.runs.create(
-                thread_id=thread.id,
-                assistant_id=self.assistant_id
-            )
-            planning_response = self._wait_for_completion(thread.id, run.id)
+            planning_response = self._run_assistant(thread.id, timeout, on_usage)
             
             # 5. Parser la réponse JSON
             planning_data = self._parse_response(planning_response)
@@ -40,22 +50,86 @@ class OpenAIClientService:
         except Exception as e:
             print(f"Erreur generation {e}")
 
-    def _wait_for_completion(self, thread_id: str, run_id: str) -> str:
-        """Attend que l'assistant termine et récupère la réponse"""
-        
-        max_wait = 120  # 2 minutes max
-        waited = 0
-        
-        while waited < max_wait:
+    def _run_assistant(self,
+                       thread_id: str,
+                       timeout: Optional[float] = None,
+                       on_usage: Optional[Callable[[dict], None]] = None) -> str:
+        """Lance le run (streamé ou interrogé selon OPENAI_RUN_MODE) et renvoie le texte de la réponse"""
+        run_timeout = settings.OPENAI_RUN_TIMEOUT if timeout is None else min(timeout, settings.OPENAI_RUN_TIMEOUT)
+        deadline = time.monotonic() + run_timeout
+
+        if settings.OPENAI_RUN_MODE == "stream":
+            return self._stream_run(thread_id, deadline, on_usage)
+
+        run = self.client.beta.threads.runs.create(
+            thread_id=thread_id,
+            assistant_id=self.assistant_id
+        )
+        return self._wait_for_completion(thread_id, run.id, deadline, on_usage)
+
+    def _stream_run(self, thread_id: str, deadline: float, on_usage: Optional[Callable[[dict], None]] = None) -> str:
+        """
+        Consomme les événements du run : la fin est connue dès l'événement
+        thread.run.completed, sans attente entre deux vérifications.
+        Si le flux est coupé après la création du run, repli sur l'interrogation.
+        """
+        run_id = None
+        try:
+            with self.client.beta.threads.runs.stream(
+                thread_id=thread_id,
+                assistant_id=self.assistant_id,
+                timeout=max(deadline - time.monotonic(), 1.0)
+            ) as stream:
+                for event in stream:
+                    if event.event == "thread.run.created":
+                        run_id = event.data.id
+                    elif event.event == "thread.run.completed":
+                        self._report_usage(event.data, on_usage)
+                    elif event.event in RUN_FAILED_EVENTS:
+                        raise AssistantRunError(f"Assistant échoué: {event.data.status}")
+                    elif event.event == "error":
+                        raise AssistantRunError(f"Assistant échoué: {event.data}")
+                    if time.monotonic() > deadline:
+                        raise TimeoutError("Timeout: Assistant trop lent")
+
+                messages = stream.get_final_messages()
+        except (AssistantRunError, TimeoutError):
+            raise
+        except Exception as e:
+            if run_id is None:
+                raise
+            print(f"⚠️ Flux du run interrompu ({e}) : interrogation du run {run_id}")
+            return self._wait_for_completion(thread_id, run_id, deadline, on_usage)
+
+        text = self._message_text(messages[-1]) if messages else None
+        if not text:
+            raise AssistantRunError("Aucune réponse de l'assistant")
+        return text
+
+    def _wait_for_completion(self,
+                             thread_id: str,
+                             run_id: str,
+                             deadline: float,
+                             on_usage: Optional[Callable[[dict], None]] = None) -> str:
+        """
+        Interroge le run jusqu'à sa fin : intervalle court au départ puis croissant
+        (OPENAI_POLL_*), ou celui suggéré par l'en-tête openai-poll-after-ms,
+        sans jamais dormir au-delà de l'échéance.
+        """
+        interval = settings.OPENAI_POLL_INITIAL_INTERVAL
+
+        while True:
             # Vérifier le statut
-            run = self.client.beta.threads.runs.retrieve(
+            response = self.client.beta.threads.runs.with_raw_response.retrieve(
                 thread_id=thread_id,
                 run_id=run_id
             )
+            run = response.parse()
             
             print(f"⏳ Statut assistant: {run.status}")
             
             if run.status == "completed":
+                self._report_usage(run, on_usage)
                 # Récupérer la réponse
                 messages = self.client.beta.threads.messages.list(
                     thread_id=thread_id,
@@ -64,18 +138,35 @@ class OpenAIClientService:
                 )
                 
                 if messages.data:
-                    return messages.data[0].content[0].text.value
+                    return self._message_text(messages.data[0])
                 else:
-                    raise Exception("Aucune réponse de l'assistant")
-            
-            elif run.status in ["failed", "cancelled", "expired"]:
-                raise Exception(f"Assistant échoué: {run.status}")
+                    raise AssistantRunError("Aucune réponse de l'assistant")
             
-            # Attendre un peu
-            time.sleep(3)
-            waited += 3
-        
-        raise Exception("Timeout: Assistant trop lent")
+            elif run.status in RUN_FAILED_STATUSES:
+                raise AssistantRunError(f"Assistant échoué: {run.status}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Timeout: Assistant trop lent")
+
+            suggested = response.headers.get("openai-poll-after-ms")
+            wait = int(suggested) / 1000 if suggested else interval
+            time.sleep(min(wait, remaining))
+            interval = min(interval * settings.OPENAI_POLL_BACKOFF, settings.OPENAI_POLL_MAX_INTERVAL)
+
+    def _report_usage(self, run, on_usage: Optional[Callable[[dict], None]]) -> None:
+        """Tokens du run terminé (run.usage), transmis à on_usage s'ils sont connus"""
+        usage = getattr(run, "usage", None)
+        if on_usage is None or usage is None:
+            return
+        on_usage({
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens
+        })
+
+    def _message_text(self, message) -> str:
+        return "".join(block.text.value for block in message.content if block.type == "text")
     
     def _parse_response(self, response_text: str) -> dict:
         """Parse la réponse texte en JSON"""
@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, List
+from app.models.models import AIGeneratedMatch
+
+# Export en flux : chaque ligne lue en base est sérialisée puis envoyée aussitôt,
+# sans construire de modèle ni de document complet en mémoire.
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+MATCH_EXPORT_COLUMNS: List[str] = list(AIGeneratedMatch.model_fields)
+
+
+async def streamNdjson(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """Un objet JSON par ligne"""
+    async for row in rows:
+        yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+async def streamCsv(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """En-tête puis une ligne CSV par match (colonnes de AIGeneratedMatch)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=MATCH_EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    yield _drain(buffer)
+    async for row in rows:
+        writer.writerow(row)
+        yield _drain(buffer)
+
+
+def streamMatches(rows: AsyncIterator[dict], exportFormat: str) -> AsyncIterator[str]:
+    """Sérialiseur associé au format ; ValueError si le format est inconnu"""
+    if exportFormat == "ndjson":
+        return streamNdjson(rows)
+    if exportFormat == "csv":
+        return streamCsv(rows)
+    raise ValueError(f"Format d'export inconnu: {exportFormat} (attendus : {', '.join(EXPORT_FORMATS)})")
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return text
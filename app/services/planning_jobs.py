@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+
+# Génération de planning en tâche de fond : la requête HTTP crée le planning
+# (statut "generating") et rend la main ; un pool borné de workers fait l'appel
+# OpenAI et la sauvegarde. L'étape courante de chaque tâche est suivie en mémoire
+# (par process) ; le statut en base reste la référence.
+
+JOB_STAGES = ("queued", "loading_tournament", "calling_ai", "scheduling", "validating", "repairing", "saving", "done", "failed")
+
+# runner(onStage, deadline) -> succès ; onStage(étape, erreur=None) ; deadline en time.monotonic()
+JobRunner = Callable[[Callable[..., None], float], bool]
+
+
+class QueueFullError(Exception):
+    """Trop de tâches en attente ou en cours (PLANNING_JOB_QUEUE_SIZE)"""
+
+
+class PlanningJobQueue:
+    """File de génération bornée : au plus maxDepth tâches en attente ou en cours"""
+
+    def __init__(self, workers: int, maxDepth: int, timeoutSeconds: float, retentionSeconds: float):
+        self.workers = max(1, workers)
+        self.maxDepth = max(1, maxDepth)
+        self.timeoutSeconds = timeoutSeconds
+        self.retentionSeconds = retentionSeconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, dict] = {}
+        self._active = 0
+
+    def isFull(self) -> bool:
+        with self._lock:
+            return self._active >= self.maxDepth
+
+    def submit(self, planningId: str, runner: JobRunner) -> None:
+        """Met la tâche en file ; QueueFullError si la file est pleine"""
+        with self._lock:
+            self._prune()
+            if self._active >= self.maxDepth:
+                raise QueueFullError(f"File de génération pleine ({self.maxDepth} tâches)")
+            self._active += 1
+            now = datetime.now()
+            self._jobs[planningId] = {"stage": "queued", "error": None, "created_at": now, "updated_at": now}
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="planning-job")
+            executor = self._executor
+        executor.submit(self._run, planningId, runner)
+
+    def getJob(self, planningId: str) -> Optional[dict]:
+        """État de la tâche (copie), None si inconnue de ce process"""
+        with self._lock:
+            job = self._jobs.get(planningId)
+            return dict(job) if job else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_depth": self.maxDepth,
+                "active": self._active,
+                "tracked": len(self._jobs)
+            }
+
+    def shutdown(self, wait: bool = True) -> List[str]:
+        """
+        Arrête le pool : les tâches non démarrées sont annulées, celles en cours
+        sont attendues (wait=True) jusqu'à leur fin ou leur délai.
+
+        Returns:
+            Plannings des tâches annulées (passées en "failed")
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+        with self._lock:
+            cancelled = [planningId for planningId, job in self._jobs.items() if job["stage"] == "queued"]
+            for planningId in cancelled:
+                self._jobs[planningId].update(stage="failed", error="Service arrêté avant la génération",
+                                              updated_at=datetime.now())
+            self._active -= len(cancelled)
+        return cancelled
+
+    def _run(self, planningId: str, runner: JobRunner) -> None:
+        deadline = time.monotonic() + self.timeoutSeconds
+        try:
+            succeeded = runner(lambda stage, error=None: self._setStage(planningId, stage, error), deadline)
+            if succeeded:
+                self._setStage(planningId, "done")
+            else:
+                self._setStage(planningId, "failed", "Échec de la génération")
+        except Exception as e:
+            print(f"❌ Tâche de génération {planningId} en échec: {e}")
+            self._setStage(planningId, "failed", str(e))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _setStage(self, planningId: str, stage: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            job = self._jobs.get(planningId)
+            if job is not None:
+                job.update(stage=stage, updated_at=datetime.now())
+                if error and not job["error"]:  # la première cause est conservée
+                    job["error"] = error
+
+    def _prune(self) -> None:
+        """Oublie les tâches terminées depuis plus de retentionSeconds"""
+        now = datetime.now()
+        for planningId, job in list(self._jobs.items()):
+            if job["stage"] in ("done", "failed") and (now - job["updated_at"]).total_seconds() > self.retentionSeconds:
+                del self._jobs[planningId]
+
+
+planningJobQueue = PlanningJobQueue(
+    settings.PLANNING_JOB_WORKERS,
+    settings.PLANNING_JOB_QUEUE_SIZE,
+    settings.PLANNING_JOB_TIMEOUT,
+    settings.PLANNING_JOB_RETENTION
+)
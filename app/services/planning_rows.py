@@ -0,0 +1,377 @@
+import re
+import uuid
+from datetime import datetime
+from typing import List, Optional
+from postgrest import APIError
+from app.core.config import settings
+from app.core.etag import computeEtag
+from app.core.pagination import keysetAfter
+from app.core.cache import courtIndexCache, bracketGraphCache, normalizeEmail
+from app.services.bracket_resolver import PlaceholderGraph
+from app.models.models import AITournamentPlanning, AIPlanningData, AIGeneratedMatch, AIGeneratedPoule, Match
+
+# Relations embarquables dans le détail d'un planning : alias -> table
+PLANNING_DETAIL_RELATIONS = {
+    "matches": "ai_generated_match",
+    "poules": "ai_generated_poule",
+}
+
+
+class PlanningRowsMixin:
+    """
+    Partie commune à DatabaseService et AsyncDatabaseService, sans aller-retour réseau :
+    construction des lignes planning / matchs / poules, rapports d'insertion par paquets,
+    requêtes PostgREST construites (pas exécutées) sur self.supabase, ETag et résolutions.
+    Chaque service n'expose ensuite que les méthodes qu'il implémente (sync ou async).
+    """
+
+    def _chunks(self, rows: List[dict]) -> List[List[dict]]:
+        size = max(1, settings.MATCH_INSERT_CHUNK_SIZE)
+        return [rows[start:start + size] for start in range(0, len(rows), size)]
+
+    def _insertedIdChunks(self, chunks: List[List[dict]], report: dict) -> List[List[str]]:
+        """Ids des paquets insérés à supprimer (aucun si tous les paquets ont réussi)"""
+        if not report["errors"]:
+            return []
+        failed = {error["chunk"] for error in report["errors"]}
+        ids = [row["id"] for index, chunk in enumerate(chunks) if index not in failed for row in chunk]
+        return self._chunks(ids)
+
+    def _chunkReport(self, table: str, chunks: List[List[dict]], outcomes) -> dict:
+        """Rapport d'insertion, erreurs dans l'ordre des paquets (outcomes : futures ou résultats/exceptions)"""
+        report = {"inserted": 0, "chunks": len(chunks), "rows": [], "errors": [], "rolled_back": 0}
+        offset = 0
+        for index, (chunk, outcome) in enumerate(zip(chunks, outcomes)):
+            try:
+                data = outcome.result() if hasattr(outcome, "result") else outcome
+                if isinstance(data, BaseException):
+                    raise data
+                report["inserted"] += len(chunk)
+                report["rows"].extend(data)
+            except Exception as e:
+                print(f"❌ {table} : paquet {index} (lignes {offset}-{offset + len(chunk) - 1}) en échec : {e}")
+                report["errors"].append({"chunk": index, "offset": offset, "size": len(chunk), "error": str(e)})
+            offset += len(chunk)
+        return report
+
+    def _planningDetailsSelect(self,
+                               fields: Optional[List[str]],
+                               include: Optional[List[str]]) -> str:
+        """Construit le select embarqué ; n'accepte que des colonnes connues"""
+        columns = ["*"]
+        if fields:
+            unknown = [field for field in fields if field not in AITournamentPlanning.model_fields]
+            if unknown:
+                raise ValueError(f"Champs inconnus: {', '.join(unknown)}")
+            columns = list(dict.fromkeys(["id", *fields]))
+
+        relations = PLANNING_DETAIL_RELATIONS.keys() if include is None else include
+        unknown = [relation for relation in relations if relation not in PLANNING_DETAIL_RELATIONS]
+        if unknown:
+            raise ValueError(f"Relations inconnues: {', '.join(unknown)}")
+        embeds = [f"{relation}:{PLANNING_DETAIL_RELATIONS[relation]}(*)" for relation in relations]
+        return ", ".join(columns + embeds)
+
+    def _toPlanningDetails(self, row: dict) -> dict:
+        matchesData = row.pop("matches", None) or []
+        poulesData = row.pop("poules", None) or []
+        return {
+            "planning": row,
+            "matches": [AIGeneratedMatch(**data) for data in matchesData],
+            "poules": [AIGeneratedPoule(**data) for data in poulesData]
+        }
+
+    def _planningMatchesQuery(self, planningId, terrain, startFrom, startTo, phase, pouleId, journee):
+        query = self.supabase.table("ai_generated_match").select("*").eq("planning_id", planningId)
+        for column, value in (("terrain", terrain), ("phase", phase), ("poule_id", pouleId), ("journee", journee)):
+            if value is not None:
+                query = query.eq(column, value)
+        if startFrom is not None:
+            query = query.gte("debut_horaire", startFrom.isoformat())
+        if startTo is not None:
+            query = query.lt("debut_horaire", startTo.isoformat())
+        return query.order("debut_horaire").order("terrain")
+
+    def _matchesPageQuery(self, planningId: str, last: Optional[dict], pageSize: int):
+        query = self.supabase.table("ai_generated_match").select("*").eq("planning_id", planningId)
+        if last is not None:
+            query = keysetAfter(query, "debut_horaire", last["debut_horaire"], last["id"])
+        return query.order("debut_horaire").order("id").limit(pageSize)
+
+    def _resolutionRows(self, graph: PlaceholderGraph, updates: dict, completedMatchId: Optional[str]) -> List[dict]:
+        """
+        Lignes complètes à upserter (un seul aller-retour, quel que soit le nombre de
+        matchs touchés) : un upsert partiel échouerait sur les colonnes NOT NULL.
+        """
+        changes = {matchId: dict(columns) for matchId, columns in updates.items()}
+        if completedMatchId and graph.matches[completedMatchId].status != "completed":
+            changes.setdefault(completedMatchId, {})["status"] = "completed"
+        return [graph.matches[matchId].model_copy(update=columns).model_dump(mode="json")
+                for matchId, columns in changes.items()]
+
+    def _resolutionResult(self,
+                          planningId: str,
+                          graph: PlaceholderGraph,
+                          updates: dict,
+                          completedMatchId: Optional[str],
+                          rowsWritten: int) -> dict:
+        graph.apply(updates)
+        if completedMatchId:
+            graph.apply({completedMatchId: {"status": "completed"}})
+        bracketGraphCache.set(planningId, graph.copy())  # remplace l'entrée partagée, sans la modifier
+        courtIndexCache.invalidate(planningId)
+        print(f"✅ {len(updates)} match(s) résolu(s) dans le planning {planningId}")
+        return {"resolved": updates, "rows_written": rowsWritten}
+
+    def _planningEtag(self, planning: AITournamentPlanning) -> str:
+        return computeEtag("planning", planning.id, planning.updated_at, planning.status, planning.total_matches)
+
+    def _buildPlanningDict(self,
+                           tournamentId: str,
+                           planningData: dict,
+                           typeTournoi: str,
+                           aiPlanningData: Optional[AIPlanningData] = None) -> dict:
+        """
+        Construit la ligne ai_tournament_planning (sérialisée pour Supabase).
+        Le JSON de l'IA n'est validé ici que si aiPlanningData n'est pas fourni.
+        """
+        # Générer ID unique
+        planning_id = str(uuid.uuid4())
+
+        # Valider les données avec Pydantic
+        ai_planning_data = aiPlanningData or AIPlanningData(**planningData)
+        total_matches = ai_planning_data.calculate_total_matches()
+
+        # Créer l'objet Planning
+        planning_obj = AITournamentPlanning(
+            id=planning_id,
+            tournament_id=tournamentId,
+            type_tournoi=typeTournoi,
+            status="generated",
+            planning_data=planningData,
+            total_matches=total_matches,
+            ai_comments=ai_planning_data.commentaires,
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+
+        # Convertir en dict pour Supabase
+        planning_dict = planning_obj.model_dump()
+        planning_dict["created_at"] = planning_dict["created_at"].isoformat()
+        planning_dict["updated_at"] = planning_dict["updated_at"].isoformat()
+        return planning_dict
+
+    def _buildMatchesDicts(self, planningId: str, planningData) -> List[dict]:
+        """
+        Extrait tous les matchs du JSON de l'IA, sérialisés pour Supabase.
+
+        Les matchs sont déjà validés par AIPlanningData : les lignes sont construites
+        directement (sans repasser par AIGeneratedMatch + model_dump pour chacune).
+        """
+        aiPlanningData = self._asPlanningData(planningData)
+        createdAt = datetime.now().isoformat()
+
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "planning_id": planningId,
+                "match_id_ai": match.match_id,
+                "equipe_a": match.equipe_a,
+                "equipe_b": match.equipe_b,
+                "terrain": match.terrain,
+                "debut_horaire": match.debut_horaire.isoformat(),
+                "fin_horaire": match.fin_horaire.isoformat(),
+                "phase": phase,
+                "poule_id": pouleId,
+                "journee": getattr(match, "journee", None),
+                "status": "scheduled",
+                "resolved_equipe_a_id": None,
+                "resolved_equipe_b_id": None,
+                "created_at": createdAt
+            }
+            for match, phase, pouleId in aiPlanningData.iter_matches()
+        ]
+
+    def _buildPoulesDicts(self, planningId: str, planningData) -> List[dict]:
+        """Extrait les poules du JSON de l'IA, sérialisées pour Supabase"""
+        aiPlanningData = self._asPlanningData(planningData)
+        createdAt = datetime.now().isoformat()
+
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "planning_id": planningId,
+                "poule_id": poule.poule_id,
+                "nom_poule": poule.nom_poule,
+                "equipes": poule.equipes,
+                "nb_equipes": len(poule.equipes),
+                "nb_matches": len(poule.matchs),
+                "created_at": createdAt
+            }
+            for poule in aiPlanningData.poules
+        ]
+
+    def _asPlanningData(self, planningData) -> AIPlanningData:
+        """Accepte le JSON brut de l'IA ou un AIPlanningData déjà validé"""
+        if isinstance(planningData, AIPlanningData):
+            return planningData
+        return AIPlanningData(**planningData)
+
+    def _extractRoundRobinMatches(self, 
+                                  planningId: str, 
+                                  aiPlanningData: AIPlanningData) -> List[AIGeneratedMatch]:
+        """
+        Extrait les matchs round robin
+        """
+        matches = []
+
+        for match in aiPlanningData.matchs_round_robin:
+            try:
+                matchObj = AIGeneratedMatch(
+                    id=str(uuid.uuid4()),
+                    planning_id=planningId,
+                    match_id_ai=match.match_id,
+                    equipe_a=match.equipe_a,
+                    equipe_b=match.equipe_b,
+                    terrain=match.terrain,
+                    debut_horaire=match.debut_horaire,
+                    fin_horaire=match.fin_horaire,
+                    phase="round_robin",
+                    journee=match.journee,
+                    status="scheduled",
+                    created_at=datetime.now()
+                )
+                matches.append(matchObj)
+            except Exception as e:
+                print(f"Match round robin invalide ignore: {e}")
+                continue
+        
+        return matches
+
+    def _extractPoulesMatches(self, 
+                              planningId: str, 
+                              aiPlanningData: AIPlanningData) -> List[AIGeneratedPoule]:
+        """
+        Extrait les matchs de poules
+        """
+        matches = []
+
+        for poule in aiPlanningData.poules:
+            for match in poule.matchs:
+                try:
+                    matchObj = AIGeneratedMatch(
+                        id=str(uuid.uuid4()),
+                        planning_id=planningId,
+                        match_id_ai=match.match_id,
+                        equipe_a=match.equipe_a,
+                        equipe_b=match.equipe_b,
+                        terrain=match.terrain,
+                        debut_horaire=match.debut_horaire,
+                        fin_horaire=match.fin_horaire,
+                        phase="poules",
+                        poule_id=poule.poule_id,
+                        status="scheduled",
+                        created_at=datetime.now()
+                    )
+                    matches.append(matchObj)
+                except Exception as e:
+                    print(f"Match de poules invalide ignore: {e}")
+                    continue
+        return matches
+
+    def _extractEliminationMatches(self,
+                                   planningId: str, 
+                                   aiPlanningData: AIPlanningData) -> List[AIGeneratedMatch]:
+        """
+        Extrait les matchs d'élimination apres les poules
+        """
+
+        matches = []
+
+        if not aiPlanningData.phase_elimination_apres_poules:
+            return matches
+        
+        elimination = aiPlanningData.phase_elimination_apres_poules
+
+        # Quarts de finale
+        for match in elimination.quarts:
+            matchObj = self._createEliminationMatchObject(
+                planningId,
+                match, 
+                "elimination"
+            )
+            if matchObj:
+                matches.append(matchObj)
+
+        # demi-finales
+        for match in elimination.demi_finales:
+            match_obj = self._createEliminationMatchObject(
+                planningId, 
+                match, 
+                "elimination"
+            )
+            if match_obj:
+                matches.append(match_obj)
+
+        # Finale
+        if elimination.finale:
+            match_obj = self._createEliminationMatchObject(
+                planningId, 
+                elimination.finale, 
+                "finale"
+            )
+            if match_obj:
+                matches.append(match_obj)
+
+        # Match 3e place
+        if elimination.match_troisieme_place:
+            match_obj = self._createEliminationMatchObject(
+                planningId, 
+                elimination.match_troisieme_place, 
+                "elimination"
+            )
+            if match_obj:
+                matches.append(match_obj)
+
+        return matches
+
+    def _createEliminationMatchObject(self, 
+                                         planningId: str, 
+                                         match: Match, 
+                                         phase: str) -> Optional[AIGeneratedMatch]:
+        """Crée un objet AIGeneratedMatch pour un match d'élimination"""
+        try:
+            return AIGeneratedMatch(
+                id=str(uuid.uuid4()),
+                planning_id=planningId,
+                match_id_ai=match.match_id,
+                equipe_a=match.equipe_a,
+                equipe_b=match.equipe_b,
+                terrain=match.terrain,
+                debut_horaire=match.debut_horaire,
+                fin_horaire=match.fin_horaire,
+                phase=phase,
+                status="scheduled",
+                created_at=datetime.now()
+            )
+        except Exception as e:
+            print(f"⚠️ Match élimination invalide ignore: {e}")
+            return None
+
+    def _profileFilter(self, query, column: str, value: str):
+        """
+        Email : égalité insensible à la casse (ilike sans joker), comme la clé de cache ;
+        limit(1) car single() rend aussi PGRST116 pour plusieurs lignes.
+        """
+        if column == "email":
+            return query.ilike("email", _likeLiteral(normalizeEmail(value))).limit(1)
+        return query.eq(column, value)
+
+    def _isNotFound(self, error: Exception) -> bool:
+        """single() sans ligne -> APIError PGRST116 (seul cas mis en cache négatif)"""
+        return isinstance(error, APIError) and error.code == "PGRST116"
+
+
+def _likeLiteral(value: str) -> str:
+    """Échappe les jokers LIKE (% _ \\) : le motif ne correspond qu'à la valeur elle-même"""
+    return re.sub(r"([\\%_])", r"\\\1", value)
@@ -0,0 +1,377 @@
+import json
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.models.models import AIGeneratedMatch, AIPlanningData, Tournament
+from app.services.bracket_resolver import PlaceholderGraph
+from app.services.local_scheduler import LUNCH_BREAK, DEFAULT_START_TIME, DAY_END
+from app.services.schedule_validator import DAY_SECONDS, validateColumns, validateSchedule
+
+# Réparation locale d'un planning non conforme, au lieu d'un nouvel appel à l'assistant :
+#   1. parmi les matchs en conflit (rapport de schedule_validator), choisir peu de matchs
+#      à déplacer : ceux qui enfreignent seuls une règle, puis une couverture gloutonne
+#      des paires en conflit (le match impliqué dans le plus de conflits d'abord) ;
+#   2. replacer chacun au plus tôt, sur le terrain où il peut commencer le plus tôt,
+#      sans casser le tableau (après ses matchs sources, avant ses matchs dépendants) ;
+#      sans créneau libre dans les jours déjà utilisés, il prend la place d'un match de
+#      même durée, replacé à son tour (échange), sinon il passe au jour suivant ;
+#   3. compacter : avancer les derniers matchs de la journée tant que c'est possible.
+# Le tout est borné (tours de réparation, matchs déplacés) et revalidé à chaque tour.
+
+PAIR_VIOLATIONS = ("court_overlap", "break_gap", "team_overlap")
+SINGLE_VIOLATIONS = ("lunch_window", "day_bounds", "invalid_court")
+
+MAX_REPAIR_ROUNDS = 5
+SWAP_CANDIDATES = 30
+
+# (début, fin, index du match) en secondes depuis minuit du jour du tournoi
+Interval = Tuple[float, float, int]
+
+
+def repairSchedule(planningData: dict,
+                   tournament: Tournament,
+                   report: Optional[Dict[str, Any]] = None,
+                   maxMoves: int = 200,
+                   compact: bool = True) -> Dict[str, Any]:
+    """
+    Répare un planning (JSON de l'IA) en déplaçant le moins de matchs possible.
+
+    Args:
+        report: rapport de validateSchedule déjà calculé (recalculé sinon)
+        maxMoves: nombre maximum de matchs déplacés
+        compact: avancer ensuite les derniers matchs pour raccourcir la journée
+
+    Returns:
+        dict: {"planning" (JSON corrigé), "valid", "moves": [{"match_id", "kind", "from", "to"}],
+               "violations_before", "violations_after", "span_minutes_before", "span_minutes_after",
+               "error" (raison d'un refus de réparer, sinon None)}
+    """
+    report = report or validateSchedule(planningData, tournament)
+    countsBefore = report["counts"]
+    parsed = AIPlanningData(**planningData)
+
+    # les matchs sont désignés par match_id (violations, dépendances, JSON) : un id en double est ambigu
+    ids = Counter(match.match_id for match, _, _ in parsed.iter_matches())
+    duplicates = sorted(matchId for matchId, count in ids.items() if count > 1)
+    if duplicates:
+        return {
+            "planning": planningData,
+            "valid": False,
+            "moves": [],
+            "violations_before": countsBefore,
+            "violations_after": {**countsBefore, "duplicate_match_id": len(duplicates)},
+            "span_minutes_before": None,
+            "span_minutes_after": None,
+            "error": f"match_id en double, réparation impossible: {duplicates}"
+        }
+
+    repairer = _Repairer(parsed, tournament, maxMoves)
+    spanBefore = repairer.span()
+
+    for _ in range(MAX_REPAIR_ROUNDS):
+        if report["valid"] or not repairer.budget():
+            break
+        toMove = repairer.selectMatches(report["violations"])
+        if not toMove:
+            break
+        repairer.relocate(toMove)
+        report = repairer.validate(tournament)
+
+    if compact and report["valid"]:
+        repairer.compact()
+        report = repairer.validate(tournament)
+
+    return {
+        "planning": repairer.planningData(planningData),
+        "valid": report["valid"],
+        "moves": repairer.moveList(),
+        "violations_before": countsBefore,
+        "violations_after": report["counts"],
+        "span_minutes_before": spanBefore,
+        "span_minutes_after": repairer.span(),
+        "error": None
+    }
+
+
+class _Repairer:
+    """Matchs en colonnes + occupation des terrains et des équipes (intervalles triés)"""
+
+    def __init__(self, planning: AIPlanningData, tournament: Tournament, maxMoves: int):
+        self.origin = datetime.combine(tournament.start_date, time())
+        self.dayStart = self._seconds(datetime.combine(tournament.start_date, tournament.start_time or DEFAULT_START_TIME))
+        self.pause = tournament.break_duration_minutes * 60
+        self.courtCount = tournament.courts_available
+        self.lunch = tuple(bound.hour * 3600 + bound.minute * 60 for bound in LUNCH_BREAK)
+        self.dayEnd = DAY_END.hour * 3600 + DAY_END.minute * 60
+        self.maxMoves = maxMoves
+
+        self.matches = [match for match, _, _ in planning.iter_matches()]
+        self.ids = [match.match_id for match in self.matches]
+        self.index = {matchId: i for i, matchId in enumerate(self.ids)}
+        self.courts = [match.terrain for match in self.matches]
+        self.starts = [self._seconds(match.debut_horaire) for match in self.matches]
+        self.durations = [self._seconds(match.fin_horaire) - start for match, start in zip(self.matches, self.starts)]
+        self.longest = max(self.durations, default=0)
+        self.lastDay = max([0] + [int(start // DAY_SECONDS) for start in self.starts])  # dernier jour utilisé
+        self.teamsA = [match.equipe_a for match in self.matches]
+        self.teamsB = [match.equipe_b for match in self.matches]
+        self.teams = [tuple({teamA, teamB}) for teamA, teamB in zip(self.teamsA, self.teamsB)]
+        self.upstream, self.downstream = self._dependencies(planning)
+
+        self.original = {i: (self.courts[i], self.starts[i]) for i in range(len(self.ids))}
+        self.moves: Dict[int, str] = {}  # index -> type du premier déplacement
+        self.byCourt: Dict[int, List[Interval]] = defaultdict(list)
+        self.byTeam: Dict[str, List[Interval]] = defaultdict(list)
+        for i in range(len(self.ids)):
+            self._add(i)
+
+    # --- sélection ---------------------------------------------------------------------
+
+    def selectMatches(self, violations: List[dict]) -> List[int]:
+        """Matchs à déplacer : chaque règle enfreinte est levée par au moins l'un d'eux"""
+        selected: Set[int] = set()
+        edges = []
+        for violation in violations:
+            indexes = [self.index[matchId] for matchId in violation["match_ids"] if matchId in self.index]
+            if violation["type"] in SINGLE_VIOLATIONS:
+                selected.update(indexes)
+            elif violation["type"] in PAIR_VIOLATIONS and len(indexes) == 2:
+                edges.append(tuple(indexes))
+
+        edges = [edge for edge in edges if not selected.intersection(edge)]
+        while edges:
+            degree = defaultdict(int)
+            for a, b in edges:
+                degree[a] += 1
+                degree[b] += 1
+            # le plus de conflits d'abord, puis le plus tardif (moins de dépendants à bousculer)
+            chosen = max(degree, key=lambda i: (degree[i], self.starts[i], i))
+            selected.add(chosen)
+            edges = [edge for edge in edges if chosen not in edge]
+
+        return sorted(selected, key=lambda i: (self.starts[i], i))[:self.budget()]
+
+    def budget(self) -> int:
+        return max(self.maxMoves - len(self.moves), 0)
+
+    def validate(self, tournament: Tournament) -> Dict[str, Any]:
+        """Rapport de validation sur l'état courant (sans reconstruire le JSON)"""
+        ends = [start + duration for start, duration in zip(self.starts, self.durations)]
+        return validateColumns(self.ids, self.courts, self.starts, ends, self.teamsA, self.teamsB, tournament)
+
+    # --- déplacements ------------------------------------------------------------------
+
+    def relocate(self, indexes: List[int]) -> None:
+        """Retire les matchs choisis puis les replace un à un, dans l'ordre chronologique"""
+        for i in indexes:
+            self._remove(i)
+        for i in indexes:
+            slot = self._bestSlot(i, withinDay=True)
+            if slot:
+                self._place(i, slot, "move")
+            elif not self._swap(i):
+                self._place(i, self._bestSlot(i, withinDay=False) or (self.courts[i], self.starts[i]), "move")
+
+    def compact(self) -> None:
+        """Avance le match qui finit le plus tard tant qu'un créneau plus tôt existe"""
+        for _ in range(len(self.ids)):
+            last = max(range(len(self.ids)), key=lambda i: (self.starts[i] + self.durations[i], i))
+            if last not in self.moves and not self.budget():
+                return
+            self._remove(last)
+            slot = self._bestSlot(last, withinDay=True)
+            if slot and slot[1] < self.starts[last]:
+                self._place(last, slot, "compaction")
+            else:
+                self._add(last)
+                return
+
+    def _swap(self, i: int) -> bool:
+        """Prend la place d'un match de même durée, lui-même replacé ailleurs dans la journée"""
+        candidates = sorted(
+            (j for j in range(len(self.ids)) if j != i and self.durations[j] == self.durations[i] and j not in self.moves),
+            key=lambda j: abs(self.starts[j] - self.starts[i])
+        )[:SWAP_CANDIDATES]
+        for j in candidates:
+            slot = (self.courts[j], self.starts[j])
+            self._remove(j)
+            if self._fits(i, *slot, withinDay=True):
+                self._place(i, slot, "swap")
+                other = self._bestSlot(j, withinDay=True)
+                if other:
+                    self._place(j, other, "swap")
+                    return True
+                self._remove(i)
+                self.moves.pop(i, None)
+            self._add(j)
+        return False
+
+    def _bestSlot(self, i: int, withinDay: bool) -> Optional[Tuple[int, float]]:
+        """
+        (terrain, début) au plus tôt. Les débuts possibles sont parcourus dans l'ordre ;
+        les règles indépendantes du terrain (bornes, déjeuner, équipes) sont vérifiées une
+        fois par début, puis les terrains : celui d'origine, puis par numéro.
+        """
+        lower, upper = self._lowerBound(i), self._upperBound(i)
+        lastDay = self.lastDay if withinDay else self.lastDay + 1
+        courts = sorted(range(1, self.courtCount + 1), key=lambda court: (court != self.original[i][0], court))
+        for start in self._candidateStarts(i, lower):
+            end = start + self.durations[i]
+            if end > upper or start // DAY_SECONDS > lastDay:
+                return None  # les débuts suivants sont plus tardifs
+            if not self._dayFits(start, end, lastDay) or not self._timeFits(i, start, end):
+                continue
+            for court in courts:
+                if self._free(self.byCourt[court], start, end, self.pause):
+                    return court, start
+        return None
+
+    def _candidateStarts(self, i: int, lower: float) -> List[float]:
+        """
+        Débuts possibles : borne basse, fins de matchs (terrains + pause, équipes),
+        début de journée et fin de pause déjeuner des jours suivants
+        """
+        candidates = {lower}
+        for intervals in self.byCourt.values():
+            first = bisect_left(intervals, (lower - self.longest - self.pause,))
+            candidates.update(end + self.pause for _, end, _ in intervals[first:] if end + self.pause > lower)
+        for team in self.teams[i]:
+            candidates.update(end for _, end, _ in self.byTeam[team] if end > lower)
+        firstDay = int(lower // DAY_SECONDS)
+        for day in range(firstDay, max(self.lastDay, firstDay) + 2):
+            candidates.update(moment for moment in (day * DAY_SECONDS + self.dayStart, day * DAY_SECONDS + self.lunch[1])
+                              if moment > lower)
+        return sorted(candidates)
+
+    def _fits(self, i: int, court: int, start: float, withinDay: bool) -> bool:
+        end = start + self.durations[i]
+        if start < self._lowerBound(i) or end > self._upperBound(i):
+            return False
+        if not self._dayFits(start, end, self.lastDay if withinDay else self.lastDay + 1):
+            return False
+        return self._timeFits(i, start, end) and self._free(self.byCourt[court], start, end, self.pause)
+
+    def _dayFits(self, start: float, end: float, lastDay: int) -> bool:
+        """Entre l'heure de début et DAY_END d'un jour du tournoi (au plus lastDay)"""
+        day = start // DAY_SECONDS
+        return 0 <= day <= lastDay and day * DAY_SECONDS + self.dayStart <= start and end <= day * DAY_SECONDS + self.dayEnd
+
+    def _timeFits(self, i: int, start: float, end: float) -> bool:
+        """Hors pause déjeuner et équipes libres"""
+        day = (start // DAY_SECONDS) * DAY_SECONDS
+        if start < day + self.lunch[1] and end > day + self.lunch[0]:
+            return False
+        return all(self._free(self.byTeam[team], start, end, 0) for team in self.teams[i])
+
+    def _lowerBound(self, i: int) -> float:
+        """Après l'heure de début et la fin (+ pause) des matchs dont il dépend"""
+        return max([self.dayStart] + [self.starts[u] + self.durations[u] + self.pause for u in self.upstream[i]])
+
+    def _upperBound(self, i: int) -> float:
+        """Fin au plus tard : avant le début (- pause) des matchs qui dépendent de lui"""
+        return min([float("inf")] + [self.starts[d] - self.pause for d in self.downstream[i]])
+
+    def _free(self, intervals: List[Interval], start: float, end: float, gap: float) -> bool:
+        """Aucun intervalle à moins de `gap` de [start, end) ; seuls ceux qui commencent
+        moins d'une durée de match (la plus longue) avant `start` peuvent déborder"""
+        first = bisect_left(intervals, (start - self.longest - gap,))
+        last = bisect_left(intervals, (end + gap,))
+        return all(other[1] + gap <= start for other in intervals[first:last])
+
+    def _place(self, i: int, slot: Tuple[int, float], kind: str) -> None:
+        self.courts[i], self.starts[i] = slot
+        self._add(i)
+        if (self.courts[i], self.starts[i]) != self.original[i]:
+            self.moves.setdefault(i, kind)
+        else:
+            self.moves.pop(i, None)
+
+    def _add(self, i: int) -> None:
+        interval = (self.starts[i], self.starts[i] + self.durations[i], i)
+        insort(self.byCourt[self.courts[i]], interval)
+        for team in self.teams[i]:
+            insort(self.byTeam[team], interval)
+
+    def _remove(self, i: int) -> None:
+        interval = (self.starts[i], self.starts[i] + self.durations[i], i)
+        for intervals in [self.byCourt[self.courts[i]]] + [self.byTeam[team] for team in self.teams[i]]:
+            del intervals[bisect_left(intervals, interval)]
+
+    # --- résultat ----------------------------------------------------------------------
+
+    def planningData(self, source: dict) -> dict:
+        """Copie du JSON source (aller-retour JSON) avec les horaires et terrains courants"""
+        planning = json.loads(json.dumps(source, default=str))
+        for matchDict in _iterMatchDicts(planning):
+            i = self.index.get(matchDict.get("match_id"))
+            if i is None or i not in self.moves:
+                continue
+            shift = timedelta(seconds=self.starts[i] - self.original[i][1])
+            matchDict["terrain"] = self.courts[i]
+            matchDict["debut_horaire"] = (self.matches[i].debut_horaire + shift).isoformat()
+            matchDict["fin_horaire"] = (self.matches[i].fin_horaire + shift).isoformat()
+        return planning
+
+    def moveList(self) -> List[dict]:
+        return [
+            {
+                "match_id": self.ids[i],
+                "kind": kind,
+                "from": {"terrain": self.original[i][0], "debut_horaire": self._datetime(self.original[i][1]).isoformat()},
+                "to": {"terrain": self.courts[i], "debut_horaire": self._datetime(self.starts[i]).isoformat()}
+            }
+            for i, kind in sorted(self.moves.items(), key=lambda item: self.original[item[0]][1])
+        ]
+
+    def span(self) -> float:
+        if not self.ids:
+            return 0.0
+        return (max(s + d for s, d in zip(self.starts, self.durations)) - min(self.starts)) / 60
+
+    def _dependencies(self, planning: AIPlanningData) -> Tuple[Dict[int, Set[int]], Dict[int, Set[int]]]:
+        """Liens du tableau (winner_/loser_, classement de poule) entre index de matchs"""
+        rows, pouleMatches = [], defaultdict(list)
+        for match, phase, pouleId in planning.iter_matches():
+            rows.append(AIGeneratedMatch(planning_id="repair", match_id_ai=match.match_id, equipe_a=match.equipe_a,
+                                         equipe_b=match.equipe_b, terrain=match.terrain, phase=phase,
+                                         debut_horaire=match.debut_horaire, fin_horaire=match.fin_horaire,
+                                         poule_id=pouleId))
+            if pouleId:
+                pouleMatches[pouleId].append(self.index[match.match_id])
+        graph = PlaceholderGraph(rows)
+
+        upstream: Dict[int, Set[int]] = defaultdict(set)
+        downstream: Dict[int, Set[int]] = defaultdict(set)
+        links = [(self.index[source], target) for source in self.ids
+                 for slots in graph.dependents(source).values() for target, _ in slots]
+        links += [(source, target) for pouleId, sources in pouleMatches.items()
+                  for slots in graph.pouleDependents(pouleId).values() for target, _ in slots
+                  for source in sources]
+        for source, target in links:
+            upstream[self.index[target]].add(source)
+            downstream[source].add(self.index[target])
+        return upstream, downstream
+
+    def _seconds(self, moment: datetime) -> float:
+        if moment.tzinfo is not None:
+            moment = moment.replace(tzinfo=None)
+        return (moment - self.origin).total_seconds()
+
+    def _datetime(self, seconds: float) -> datetime:
+        return self.origin + timedelta(seconds=seconds)
+
+
+def _iterMatchDicts(planning: dict):
+    """Matchs du JSON brut (mêmes emplacements que AIPlanningData.iter_matches)"""
+    yield from planning.get("matchs_round_robin") or []
+    for poule in planning.get("poules") or []:
+        yield from poule.get("matchs") or []
+    for roundMatches in (planning.get("rounds_elimination") or {}).values():
+        yield from roundMatches if isinstance(roundMatches, list) else [roundMatches]
+    elimination = planning.get("phase_elimination_apres_poules") or {}
+    yield from elimination.get("quarts") or []
+    yield from elimination.get("demi_finales") or []
+    for key in ("finale", "match_troisieme_place"):
+        if elimination.get(key):
+            yield elimination[key]
@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import datetime, time
+from typing import Any, Dict, List, Union
+from app.models.models import AIPlanningData, Tournament
+from app.services.local_scheduler import LUNCH_BREAK, DEFAULT_START_TIME, DAY_END
+
+# Vérification des contraintes horaires du prompt sur le JSON rendu, avant sauvegarde :
+# pause entre deux matchs d'un même terrain, pas de chevauchement (terrain ou équipe),
+# pas de match entre 12h et 13h30, tous les terrains utilisés, chaque match entre l'heure
+# de début et DAY_END de son jour (un planning peut s'étaler sur plusieurs jours).
+#
+# Les matchs sont mis en colonnes (terrain, début, fin, équipes ; horaires en secondes
+# depuis minuit du jour du tournoi) puis chaque règle est un balayage trié : O(n log n).
+
+VIOLATION_TYPES = (
+    "court_overlap",   # deux matchs se chevauchent sur un terrain
+    "break_gap",       # pause insuffisante entre deux matchs consécutifs d'un terrain
+    "team_overlap",    # une équipe joue deux matchs en même temps
+    "lunch_window",    # match pendant la pause déjeuner
+    "day_bounds",      # match avant l'heure de début ou après DAY_END de son jour (ou avant le tournoi)
+    "invalid_court",   # numéro de terrain hors de 1..courts_available
+    "unused_court",    # terrain disponible sans aucun match (alors qu'il y a assez de matchs pour tous)
+)
+
+DAY_SECONDS = 24 * 3600
+
+
+def validateSchedule(planningData: Union[AIPlanningData, dict], tournament: Tournament) -> Dict[str, Any]:
+    """
+    Rapport de conformité d'un planning (JSON de l'IA ou AIPlanningData).
+
+    Returns:
+        dict: {"valid", "matches", "counts": {type: nombre}, "violations": [{"type", "match_ids", ...}]}
+    """
+    if not isinstance(planningData, AIPlanningData):
+        planningData = AIPlanningData(**planningData)
+
+    origin = datetime.combine(tournament.start_date, time())
+    matchIds, courts, starts, ends, teamsA, teamsB = [], [], [], [], [], []
+    for match, _, _ in planningData.iter_matches():
+        matchIds.append(match.match_id)
+        courts.append(match.terrain)
+        starts.append(_seconds(match.debut_horaire, origin))
+        ends.append(_seconds(match.fin_horaire, origin))
+        teamsA.append(match.equipe_a)
+        teamsB.append(match.equipe_b)
+
+    return validateColumns(matchIds, courts, starts, ends, teamsA, teamsB, tournament)
+
+
+def validateColumns(matchIds: List[str],
+                    courts: List[int],
+                    starts: List[float],
+                    ends: List[float],
+                    teamsA: List[str],
+                    teamsB: List[str],
+                    tournament: Tournament) -> Dict[str, Any]:
+    """Même rapport, depuis des colonnes déjà construites (horaires en secondes depuis minuit du jour du tournoi)"""
+    origin = datetime.combine(tournament.start_date, time())
+    breakSeconds = tournament.break_duration_minutes * 60
+    dayStart = _seconds(datetime.combine(tournament.start_date, tournament.start_time or DEFAULT_START_TIME), origin)
+
+    violations: List[dict] = []
+    violations += _courtSweep(matchIds, courts, starts, ends, breakSeconds)
+    violations += _teamSweep(matchIds, starts, ends, teamsA, teamsB)
+    violations += _timeBounds(matchIds, starts, ends, dayStart)
+    violations += _courtUsage(matchIds, courts, tournament.courts_available)
+
+    return {
+        "valid": not violations,
+        "matches": len(matchIds),
+        "counts": dict(Counter(violation["type"] for violation in violations)),
+        "violations": violations
+    }
+
+
+def _seconds(moment: datetime, origin: datetime) -> float:
+    # Heure murale : un fuseau éventuel est ignoré (les contraintes sont en heure locale)
+    if moment.tzinfo is not None:
+        moment = moment.replace(tzinfo=None)
+    return (moment - origin).total_seconds()
+
+
+def _courtSweep(matchIds, courts, starts, ends, breakSeconds) -> List[dict]:
+    """Matchs triés par (terrain, début) : chaque match est comparé au match qui finit le plus tard avant lui"""
+    violations = []
+    previous = None
+    for i in sorted(range(len(matchIds)), key=lambda index: (courts[index], starts[index])):
+        if previous is not None and courts[previous] == courts[i]:
+            gap = starts[i] - ends[previous]
+            if gap < 0:
+                violations.append({"type": "court_overlap", "match_ids": [matchIds[previous], matchIds[i]],
+                                   "terrain": courts[i]})
+            elif gap < breakSeconds:
+                violations.append({"type": "break_gap", "match_ids": [matchIds[previous], matchIds[i]],
+                                   "terrain": courts[i], "gap_minutes": gap / 60})
+            if ends[i] > ends[previous]:
+                previous = i
+        else:
+            previous = i
+    return violations
+
+
+def _teamSweep(matchIds, starts, ends, teamsA, teamsB) -> List[dict]:
+    """Créneaux triés par (équipe, début) : une équipe ne commence pas avant la fin de son match précédent"""
+    slots = sorted(
+        (team, starts[i], i)
+        for i in range(len(matchIds))
+        for team in {teamsA[i], teamsB[i]}
+    )
+    violations = []
+    previous = None  # (équipe, match de cette équipe qui finit le plus tard)
+    for team, start, i in slots:
+        if previous is not None and previous[0] == team:
+            latest = previous[1]
+            if start < ends[latest]:
+                violations.append({"type": "team_overlap", "match_ids": [matchIds[latest], matchIds[i]],
+                                   "team": team})
+            if ends[i] <= ends[latest]:
+                continue
+        previous = (team, i)
+    return violations
+
+
+def _timeBounds(matchIds, starts, ends, dayStart) -> List[dict]:
+    """dayStart : heure de début en secondes, la même chaque jour du tournoi"""
+    lunchStart, lunchEnd = (bound.hour * 3600 + bound.minute * 60 for bound in LUNCH_BREAK)
+    dayEnd = DAY_END.hour * 3600 + DAY_END.minute * 60
+    violations = []
+    for i, matchId in enumerate(matchIds):
+        day = (starts[i] // DAY_SECONDS) * DAY_SECONDS  # bornes et pause déjeuner du jour du match
+        if day < 0 or starts[i] < day + dayStart or ends[i] > day + dayEnd:
+            violations.append({"type": "day_bounds", "match_ids": [matchId]})
+        if starts[i] < day + lunchEnd and ends[i] > day + lunchStart:
+            violations.append({"type": "lunch_window", "match_ids": [matchId]})
+    return violations
+
+
+def _courtUsage(matchIds, courts, courtsAvailable: int) -> List[dict]:
+    violations = [
+        {"type": "invalid_court", "match_ids": [matchId], "terrain": court}
+        for matchId, court in zip(matchIds, courts)
+        if not 1 <= court <= courtsAvailable
+    ]
+    if len(matchIds) < courtsAvailable:
+        return violations  # moins de matchs que de terrains : des terrains restent forcément vides
+    used = set(courts)
+    violations += [
+        {"type": "unused_court", "match_ids": [], "terrain": court}
+        for court in range(1, courtsAvailable + 1)
+        if court not in used
+    ]
+    return violations
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List
+from app.models.models import Team
+
+# Codes courts des équipes dans le prompt (PLANNING_PROMPT_TEAMS="codes") : l'assistant
+# recopie chaque équipe dans chaque match, un code de 3 caractères (T01…T64) coûte bien
+# moins de tokens qu'un nom complet. Les codes sont ré-associés aux équipes à la lecture
+# de la réponse, qui est ensuite traitée (validation, cache, sauvegarde) comme avec les noms.
+
+# Champs d'équipe de la réponse : décodés en nom (format stocké des matchs et poules)...
+TEAM_NAME_FIELDS = ("equipe_a", "equipe_b", "equipes", "nom_equipe")
+# ... ou en Team.id (final_ranking)
+TEAM_ID_FIELDS = ("equipe_id",)
+
+
+def teamCodes(teams: List[Team]) -> Dict[str, Team]:
+    """
+    Code -> équipe. Attribués dans l'ordre des noms : les mêmes équipes
+    ont toujours les mêmes codes, quel que soit l'ordre de la base.
+    """
+    width = max(2, len(str(len(teams))))
+    ordered = sorted(teams, key=lambda team: team.name)
+    return {f"T{index:0{width}d}": team for index, team in enumerate(ordered, start=1)}
+
+
+def teamIdsByCode(codes: Dict[str, Team]) -> Dict[str, str]:
+    """Code -> Team.id"""
+    return {code: team.id for code, team in codes.items()}
+
+
+def decodeTeams(planning: Any, codes: Dict[str, Team]) -> Any:
+    """
+    Copie du JSON de l'assistant où les codes des champs d'équipe sont remplacés
+    (TEAM_NAME_FIELDS -> nom, TEAM_ID_FIELDS -> Team.id). Les autres champs
+    (match_id, commentaires...) et les placeholders winner_… / 1er_… sont conservés ;
+    un code inconnu est conservé et journalisé.
+    """
+    unknown = set()
+
+    def decodeValue(value, attribute: str):
+        if isinstance(value, list):
+            return [decodeValue(item, attribute) for item in value]
+        if isinstance(value, str) and value in codes:
+            return getattr(codes[value], attribute)
+        if isinstance(value, str) and value[:1] == "T" and value[1:].isdigit():
+            unknown.add(value)
+        return value
+
+    def decode(value):
+        if isinstance(value, list):
+            return [decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        decoded = {}
+        for key, item in value.items():
+            if key in TEAM_NAME_FIELDS:
+                decoded[key] = decodeValue(item, "name")
+            elif key in TEAM_ID_FIELDS:
+                decoded[key] = decodeValue(item, "id")
+            else:
+                decoded[key] = decode(item)
+        return decoded
+
+    decoded = decode(planning)
+    if unknown:
+        print(f"⚠️ Codes d'équipe inconnus dans la réponse: {sorted(unknown)}")
+    return decoded
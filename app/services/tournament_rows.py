@@ -0,0 +1,82 @@
+from typing import List, Optional, Dict, Any
+from app.core.etag import computeEtag
+from app.models.models import Tournament, Team, TeamMember
+
+
+class TournamentRowsMixin:
+    """
+    Partie commune à TournamentService et AsyncTournamentService, sans aller-retour réseau :
+    conversion des lignes tournoi / équipes / membres, ETag et validation avant génération.
+    """
+
+    def _tournamentEtag(self, tournament: Tournament) -> str:
+        # registered_teams change sans que updated_at du tournoi ne bouge
+        return computeEtag("tournament", tournament.id, tournament.updated_at, tournament.status, tournament.registered_teams)
+
+    def _teamsEtag(self, teams) -> str:
+        return computeEtag("teams", *(f"{team.id}:{team.updated_at}" for team in teams))
+
+    def _withRegisteredTeams(self, tournamentData: Dict[str, Any]) -> Dict[str, Any]:
+        """Remplace le count embarqué `team(count)` par le champ registered_teams"""
+        embedded = tournamentData.pop("team", None) or [{}]
+        tournamentData["registered_teams"] = embedded[0].get("count", 0)
+        return tournamentData
+
+    def _validateTournamentData(self, tournamentData: Dict[str, Any]) -> bool:
+        """Valide si le tournoi peut avoir un planning généré"""
+        try:
+            tournament = tournamentData["tournament"]
+            teams = tournamentData["teams"]
+            
+            print(f"🔍 Validation: {len(teams)} équipes, {tournament.courts_available} terrains")
+            
+            # Vérifier nombre minimum d'équipes
+            if len(teams) < 2:
+                print("❌ Pas assez d'équipes (minimum 2)")
+                return False
+            
+            # Vérifier nombre maximum d'équipes
+            if len(teams) > tournament.max_teams:
+                print(f"❌ Trop d'équipes ({len(teams)} > {tournament.max_teams})")
+                return False
+            
+            # Vérifier terrains
+            if tournament.courts_available <= 0:
+                print("❌ Nombre de terrains invalide")
+                return False
+            
+            # Vérifier type de tournoi
+            if not tournament.tournament_type:
+                print("❌ Type de tournoi manquant")
+                return False
+            
+            print("✅ Validation réussie")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erreur validation: {e}")
+            return False
+
+    def _toTeamMembers(self, membersData: Optional[List[dict]]) -> List[TeamMember]:
+        """Convertit des lignes team_member (+ profile(email) embarqué) en objets TeamMember"""
+        members = []
+        for member_data in membersData or []:
+            try:
+                # Créer l'objet TeamMember avec validation Pydantic
+                email = member_data.pop("profile")["email"]
+                team_member = TeamMember(**member_data, email=email)
+                members.append(team_member)
+            except Exception as e:
+                print(f"⚠️ Membre d'équipe invalide ignoré: {e}")
+                continue
+        return members
+
+    def _toTeams(self, rows: Optional[List[dict]]) -> List[Team]:
+        teams = []
+        for team_data in rows or []:
+            try:
+                teams.append(Team(**team_data))
+            except Exception as e:
+                print(f"⚠️ Équipe invalide ignorée: {e}")
+                continue
+        return teams
@@ -1,11 +1,16 @@
 import uuid
 from datetime import datetime, date, time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.core.database import getSupabase
+from app.core.cache import tournamentCache, tournamentTeamsCache, teamCache, invalidateTournament
+from app.core.etag import computeEtag
+from app.core.pagination import applyKeyset, splitPage
+from app.core.status_transition import transitionStatus
 from app.models.models import Tournament, Team, TeamMember, TeamWithMembers
+from app.services.tournament_rows import TournamentRowsMixin
 
 
-class TournamentService():
+class TournamentService(TournamentRowsMixin):
     """
     Service pour gerer les tournois et equipes
     """
@@ -16,17 +21,15 @@ class TournamentService():
     def getTournaments(self) -> list[Tournament]:
         try:
 
+            # Une seule requête : le nombre d'équipes vient d'un count embarqué
             result = self.supabase.table("tournament")\
-                .select("*")\
+                .select("*, team(count)")\
                 .execute()
 
             tournaments = []
             for tournament_data in result.data or []:
                 try:
-                    teams = self.getTournamentTeams(tournament_data["id"])
-                    tournament_data["registered_teams"] = len(teams)
-
-                    tournament = Tournament(**tournament_data)
+                    tournament = Tournament(**self._withRegisteredTeams(tournament_data))
                     tournaments.append(tournament)
                 except Exception as e:
                     print(f"⚠️ Tournoi invalide ignorée: {e}")
@@ -36,6 +39,45 @@ class TournamentService():
             print(f"❌ Erreur récupération tournois: {e}")
             return None 
 
+    def getTournamentsPage(self,
+                           limit: int,
+                           cursor: Optional[str] = None,
+                           status: Optional[str] = None,
+                           organizerId: Optional[str] = None,
+                           tournamentType: Optional[str] = None) -> Optional[Tuple[List[Tournament], Optional[str]]]:
+        """
+        Récupère une page de tournois (keyset sur created_at, id), filtrée côté serveur
+
+        Args:
+            limit: Taille de la page
+            cursor: next_cursor de la page précédente (None pour la première)
+            status, organizerId, tournamentType: filtres optionnels
+
+        Returns:
+            (tournois, next_cursor) ou None si erreur. Lève ValueError si le curseur est invalide.
+        """
+        query = self.supabase.table("tournament").select("*, team(count)")
+        for column, value in (("status", status), ("organizer_id", organizerId), ("tournament_type", tournamentType)):
+            if value:
+                query = query.eq(column, value)
+        query = applyKeyset(query, cursor, limit)
+
+        try:
+            result = query.execute()
+            rows, nextCursor = splitPage(result.data, limit)
+
+            tournaments = []
+            for tournament_data in rows:
+                try:
+                    tournaments.append(Tournament(**self._withRegisteredTeams(tournament_data)))
+                except Exception as e:
+                    print(f"⚠️ Tournoi invalide ignorée: {e}")
+                    continue
+            return tournaments, nextCursor
+        except Exception as e:
+            print(f"❌ Erreur récupération tournois: {e}")
+            return None
+
     def getTournamentById(self, tournamentId: str) -> Optional[Tournament]:
         """
         Récupère un tournoi par son ID
@@ -46,25 +88,36 @@ class TournamentService():
         Returns:
             Tournament: Objet Tournament ou None si pas trouvé
         """
+        result = self.getTournamentByIdWithEtag(tournamentId)
+        return result[0] if result else None
+
+    def getTournamentByIdWithEtag(self, tournamentId: str) -> Optional[Tuple[Tournament, str]]:
+        """
+        Récupère un tournoi et son ETag, mis en cache ensemble :
+        une revalidation (If-None-Match) servie par le cache ne coûte aucune requête.
+        """
+        cached = tournamentCache.getWithEtag(tournamentId)
+        if cached is not None:
+            return cached
+
         try:
             print(f"🔍 Récupération tournoi {tournamentId}")
             
             result = self.supabase.table("tournament")\
-                .select("*")\
+                .select("*, team(count)")\
                 .eq("id", tournamentId)\
                 .single()\
                 .execute()
-            print(f"result : {result}")
             if not result.data:
                 print(f"❌ Tournoi {tournamentId} non trouvé")
                 return None
-            teams = self.getTournamentTeams(tournamentId)
-            result.data["registered_teams"] = len(teams)
                 
             # Convertir en objet Pydantic
-            tournament = Tournament(**result.data)
+            tournament = Tournament(**self._withRegisteredTeams(result.data))
+            etag = self._tournamentEtag(tournament)
+            tournamentCache.set(tournamentId, tournament, etag=etag)
             print(f"✅ Tournoi récupéré: {tournament.name}")
-            return tournament
+            return tournament, etag
             
         except Exception as e:
             print(f"❌ Erreur récupération tournoi {tournamentId}: {e}")
@@ -80,9 +133,20 @@ class TournamentService():
         Returns:
             List[Team]: Liste des équipes (vide si aucune)
         """
+        result = self.getTournamentTeamsWithEtag(tournamentId)
+        return list(result[0]) if result else []
+
+    def getTournamentTeamsWithEtag(self, tournamentId: str) -> Optional[Tuple[Tuple[Team, ...], str]]:
+        """Équipes d'un tournoi (tuple immuable partagé par le cache) et leur ETag"""
+        cached = tournamentTeamsCache.getWithEtag(tournamentId)
+        if cached is not None:
+            return cached
+
         try:
             print(f"👥 Récupération équipes du tournoi {tournamentId}")
             
+            # Tri par nom (ordre historique de la route) : l'ETag dépend de l'ordre des
+            # équipes, sans tri il changerait au gré de l'ordre de lecture de la base
             result = self.supabase.table("team")\
                 .select("*")\
                 .eq("tournament_id", tournamentId)\
@@ -98,12 +162,15 @@ class TournamentService():
                     print(f"⚠️ Équipe invalide ignorée: {e}")
                     continue
             
+            teams = tuple(teams)
+            etag = self._teamsEtag(teams)
+            tournamentTeamsCache.set(tournamentId, teams, etag=etag)
             print(f"✅ {len(teams)} équipes récupérées")
-            return teams
+            return teams, etag
             
         except Exception as e:
             print(f"❌ Erreur récupération équipes: {e}")
-            return []
+            return None
 
     def createTournament(self, tournamentData: dict) -> Optional[Tournament]:
         """
@@ -145,6 +212,7 @@ class TournamentService():
                 print("❌ Erreur lors de l'insertion en DB")
                 return None
             
+            invalidateTournament(result.data[0].get("id"))
             print(f"✅ Tournoi créé avec ID: {tournament_data_clean}")
             return Tournament(**result.data[0])
             
@@ -162,15 +230,22 @@ class TournamentService():
         Returns:
             dict: {"tournament": Tournament, "teams": List[Team]} ou None si erreur
         """
+        result = self.getTournamentWithTeamsAndEtag(tournamentId)
+        return result[0] if result else None
+
+    def getTournamentWithTeamsAndEtag(self, tournamentId: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Tournoi + équipes, avec un ETag combinant ceux des deux entrées de cache"""
         try:
             print(f"🔍 Récupération tournoi + équipes {tournamentId}")
             
-            tournament = self.getTournamentById(tournamentId)
-            if not tournament:
+            tournamentResult = self.getTournamentByIdWithEtag(tournamentId)
+            if not tournamentResult:
                 return None
-            teams = self.getTournamentTeams(tournamentId)
-            if len(teams) < 1:
+            tournament, tournamentEtag = tournamentResult
+            teamsResult = self.getTournamentTeamsWithEtag(tournamentId)
+            if not teamsResult or len(teamsResult[0]) < 1:
                 return None
+            teams, teamsEtag = list(teamsResult[0]), teamsResult[1]
             result = {
                 "tournament": tournament,
                 "teams": teams,
@@ -180,7 +255,7 @@ class TournamentService():
             }
             
             print(f"✅ Tournoi + {len(teams)} équipes récupérés")
-            return result
+            return result, computeEtag(tournamentEtag, teamsEtag)
             
         except Exception as e:
             print(f"❌ Erreur récupération tournoi avec équipes: {e}")
@@ -207,6 +282,7 @@ class TournamentService():
                 })\
                 .eq("id", tournamentId)\
                 .execute()
+            invalidateTournament(tournamentId)
             
             print(f"✅ Statut tournoi mis à jour")
             return True
@@ -215,6 +291,32 @@ class TournamentService():
             print(f"❌ Erreur mise à jour statut tournoi: {e}")
             return False
 
+    def transitionTournamentStatuses(self,
+                                    tournamentIds: List[str],
+                                    expectedStatus: str,
+                                    newStatus: str) -> Optional[dict]:
+        """
+        Passe en lot des tournois de expectedStatus à newStatus (un seul UPDATE conditionnel)
+        
+        Args:
+            tournamentIds: IDs des tournois
+            expectedStatus: Statut courant attendu (les autres tournois sont ignorés)
+            newStatus: Nouveau statut
+            
+        Returns:
+            dict: {"expected_status", "new_status", "transitioned", "skipped"} ou None si erreur
+        """
+        try:
+            print(f"🔄 Transition de {len(tournamentIds)} tournoi(s) {expectedStatus} → {newStatus}")
+            report = transitionStatus(self.supabase, "tournament", tournamentIds, expectedStatus, newStatus)
+            for tournamentId in report["transitioned"]:
+                invalidateTournament(tournamentId)
+            return report
+            
+        except Exception as e:
+            print(f"❌ Erreur transition statut tournois: {e}")
+            return None
+
     def createTeam(self, teamData: dict) -> Optional[Team]:
         """
         Crée une nouvelle équipe
@@ -254,6 +356,8 @@ class TournamentService():
             
             # Ajouter automatiquement le captain dans team_member si captain_id existe
             created_team = result.data[0]
+            # Le nombre d'équipes inscrites et la liste des équipes du tournoi changent
+            invalidateTournament(created_team.get("tournament_id"))
             if created_team.get("captain_id"):
                 try:
                     print(f"👑 Ajout du capitaine à team_member: {created_team['captain_id']}")
@@ -286,6 +390,10 @@ class TournamentService():
         Returns:
             Team: Objet Team ou None si pas trouvé
         """
+        cached = teamCache.get(teamId)
+        if cached is not None:
+            return cached
+
         try:
             print(f"🔍 Récupération équipe {teamId}")
             
@@ -301,6 +409,7 @@ class TournamentService():
             
             # Convertir en objet Pydantic
             team = Team(**result.data)
+            teamCache.set(teamId, team, etag=self._teamsEtag([team]))
             print(f"✅ Équipe récupérée: {team.name}")
             return team
             
@@ -316,47 +425,14 @@ class TournamentService():
                 .delete()\
                 .eq("id", team.id)\
                 .execute()
+            teamCache.invalidate(team.id)
+            invalidateTournament(team.tournament_id)
             if result:
                 return True
         except Exception as e:
             print(f"Erreur lors de la suppression: {e}")
             return False
 
-    def _validateTournamentData(self, tournamentData: Dict[str, Any]) -> bool:
-        """Valide si le tournoi peut avoir un planning généré"""
-        try:
-            tournament = tournamentData["tournament"]
-            teams = tournamentData["teams"]
-            
-            print(f"🔍 Validation: {len(teams)} équipes, {tournament.courts_available} terrains")
-            
-            # Vérifier nombre minimum d'équipes
-            if len(teams) < 2:
-                print("❌ Pas assez d'équipes (minimum 2)")
-                return False
-            
-            # Vérifier nombre maximum d'équipes
-            if len(teams) > tournament.max_teams:
-                print(f"❌ Trop d'équipes ({len(teams)} > {tournament.max_teams})")
-                return False
-            
-            # Vérifier terrains
-            if tournament.courts_available <= 0:
-                print("❌ Nombre de terrains invalide")
-                return False
-            
-            # Vérifier type de tournoi
-            if not tournament.tournament_type:
-                print("❌ Type de tournoi manquant")
-                return False
-            
-            print("✅ Validation réussie")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erreur validation: {e}")
-            return False
-
     def getTeams(self, tournamentId: str = None) -> list[Team]:
         try:
             if not tournamentId:
@@ -382,6 +458,39 @@ class TournamentService():
             print(f"❌ Erreur récupération teams : {e}")
             return None 
     
+    def getTeamsPage(self,
+                     limit: int,
+                     cursor: Optional[str] = None,
+                     tournamentId: Optional[str] = None,
+                     status: Optional[str] = None) -> Optional[Tuple[List[Team], Optional[str]]]:
+        """
+        Récupère une page d'équipes (keyset sur created_at, id)
+
+        Returns:
+            (équipes, next_cursor) ou None si erreur. Lève ValueError si le curseur est invalide.
+        """
+        query = self.supabase.table("team").select("*")
+        for column, value in (("tournament_id", tournamentId), ("status", status)):
+            if value:
+                query = query.eq(column, value)
+        query = applyKeyset(query, cursor, limit)
+
+        try:
+            result = query.execute()
+            rows, nextCursor = splitPage(result.data, limit)
+
+            teams = []
+            for team_data in rows:
+                try:
+                    teams.append(Team(**team_data))
+                except Exception as e:
+                    print(f"⚠️ Team invalide ignorée: {e}")
+                    continue
+            return teams, nextCursor
+        except Exception as e:
+            print(f"❌ Erreur récupération teams : {e}")
+            return None
+
     def _getTeamMembers(self, teamId: str) -> List[TeamMember]:
         """Récupère les membres d'une équipe et les convertit en objets TeamMember"""
         try:
@@ -390,42 +499,41 @@ class TournamentService():
                 .eq("team_id", teamId)\
                 .execute()
             
-            members = []
-            for member_data in result.data or []:
-                try:
-                    # Créer l'objet TeamMember avec validation Pydantic
-                    email = member_data.pop("profile")["email"]
-                    team_member = TeamMember(**member_data, email=email)
-                    members.append(team_member)
-                except Exception as e:
-                    print(f"⚠️ Membre d'équipe invalide ignoré: {e}")
-                    continue
-            
-            return members
+            return self._toTeamMembers(result.data)
             
         except Exception as e:
             print(f"❌ Erreur récupération membres équipe: {e}")
             return []
-        
+
     def getTeamsWithMembers(self, tournamentId: str = None) -> Optional[List[TeamWithMembers]]:
-        """Récupère toutes les équipes avec leurs membres"""
+        """
+        Récupère toutes les équipes avec leurs membres
+
+        Une seule requête : équipes, membres et email des profils sont embarqués
+        (team -> team_member -> profile), puis regroupés en mémoire.
+        """
         try:
-            teams = self.getTeams(tournamentId)
-            if not teams:
+            query = self.supabase.table("team")\
+                .select("*, team_member(*, profile(email))")
+            if tournamentId:
+                query = query.eq("tournament_id", tournamentId)
+            result = query.execute()
+
+            if not result.data:
                 print("❌ Aucune équipe trouvée")
                 return []
                 
             teams_with_members = []
-            for team in teams:
+            for team_data in result.data:
                 try:
-                    team_members = self._getTeamMembers(team.id)
+                    team_members = self._toTeamMembers(team_data.pop("team_member", None))
                     team_with_members = TeamWithMembers(
-                        **team.model_dump(), 
+                        **team_data, 
                         members=team_members
                     )
                     teams_with_members.append(team_with_members)
                 except Exception as e:
-                    print(f"⚠️ Erreur lors du traitement de l'équipe {team.id}: {e}")
+                    print(f"⚠️ Erreur lors du traitement de l'équipe {team_data.get('id')}: {e}")
                     continue
                     
             print(f"✅ {len(teams_with_members)} équipe(s) avec membres récupérée(s)")
@@ -455,6 +563,7 @@ class TournamentService():
                 .insert(team_members_data)\
                 .execute()
             
+            teamCache.invalidate(teamMembersData.team_id)
             if not result.data:
                 print("❌ Aucun joueur ajouté")
                 return None
@@ -1,18 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.database import initSupabase, closeSupabase, closeAsyncSupabase
+from app.services.ai_planning_service import aiPlanningService
 
 # Import des routes
 from app.api.routes.health import router as health_router
+from app.api.routes.planning import router as planning_router
 from app.api.routes.tournament import router as tournament_router
 from app.api.routes.team import router as team_router
 from app.api.routes.user import router as user_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ouvre le client Supabase partagé au démarrage ; à l'arrêt, termine les tâches
+    de génération (avant de fermer le client qu'elles utilisent) puis ferme son pool
+    """
+    initSupabase()
+    yield
+    await run_in_threadpool(aiPlanningService.shutdownPlanningJobs)
+    closeSupabase()
+    await closeAsyncSupabase()
+
 # Création de l'app FastAPI
 app = FastAPI(
     title="AI Planning Service API",
     description="API pour la génération automatique de plannings de tournois de volley-ball",
     version="1.0.0",
-    docs_url="/docs"
+    docs_url="/docs",
+    lifespan=lifespan
 )
 
 # Middleware CORS
@@ -25,7 +43,7 @@ app.add_middleware(
 )
 
 # Inclusion des routes avec préfixes
-# app.include_router(planning_router)
+app.include_router(planning_router)
 app.include_router(health_router)
 app.include_router(tournament_router)
 app.include_router(team_router)
@@ -0,0 +1,50 @@
+-- Sauvegarde atomique d'un planning IA : planning + matchs + poules
+-- en une seule transaction et un seul aller-retour (appel RPC PostgREST).
+--
+-- Les lignes arrivent déjà validées et complètes (construites par
+-- DatabaseService.persistPlanning) ; la fonction ne renvoie que les ids.
+--
+--   select save_planning_atomic('{"id": ...}'::jsonb, '[...]'::jsonb, '[...]'::jsonb);
+
+create or replace function public.save_planning_atomic(
+    p_planning jsonb,
+    p_matches jsonb default '[]'::jsonb,
+    p_poules jsonb default '[]'::jsonb
+)
+returns jsonb
+language plpgsql
+security invoker
+as $$
+declare
+    v_planning_id uuid;
+    v_match_ids uuid[];
+    v_poule_ids uuid[];
+begin
+    insert into public.ai_tournament_planning
+    select * from jsonb_populate_record(null::public.ai_tournament_planning, p_planning)
+    returning id into v_planning_id;
+
+    with inserted as (
+        insert into public.ai_generated_match
+        select * from jsonb_populate_recordset(null::public.ai_generated_match, coalesce(p_matches, '[]'::jsonb))
+        returning id
+    )
+    select coalesce(array_agg(id), '{}') into v_match_ids from inserted;
+
+    with inserted as (
+        insert into public.ai_generated_poule
+        select * from jsonb_populate_recordset(null::public.ai_generated_poule, coalesce(p_poules, '[]'::jsonb))
+        returning id
+    )
+    select coalesce(array_agg(id), '{}') into v_poule_ids from inserted;
+
+    -- Toute erreur ci-dessus annule l'ensemble (corps de fonction = une transaction)
+    return jsonb_build_object(
+        'planning_id', v_planning_id,
+        'match_ids', to_jsonb(v_match_ids),
+        'poule_ids', to_jsonb(v_poule_ids)
+    );
+end;
+$$;
+
+grant execute on function public.save_planning_atomic(jsonb, jsonb, jsonb) to service_role;
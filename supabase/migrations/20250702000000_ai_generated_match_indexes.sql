@@ -0,0 +1,23 @@
+-- Index composites pour GET /api/planning/{id}/matches
+-- (toutes les requêtes filtrent d'abord sur planning_id, puis trient par debut_horaire)
+
+-- Terrain + créneau : "qu'est-ce qui se joue sur le terrain 3 entre 14h et 15h"
+create index if not exists ai_generated_match_planning_terrain_debut_idx
+    on public.ai_generated_match (planning_id, terrain, debut_horaire);
+
+-- Créneau seul (tous terrains) et tri par défaut
+create index if not exists ai_generated_match_planning_debut_idx
+    on public.ai_generated_match (planning_id, debut_horaire);
+
+-- Phase (poules, elimination, finale...)
+create index if not exists ai_generated_match_planning_phase_debut_idx
+    on public.ai_generated_match (planning_id, phase, debut_horaire);
+
+-- Poule et journée : colonnes vides pour une partie des matchs, index partiels
+create index if not exists ai_generated_match_planning_poule_idx
+    on public.ai_generated_match (planning_id, poule_id, debut_horaire)
+    where poule_id is not null;
+
+create index if not exists ai_generated_match_planning_journee_idx
+    on public.ai_generated_match (planning_id, journee, debut_horaire)
+    where journee is not null;
@@ -0,0 +1,31 @@
+-- Transition de statut en lot avec contrôle de concurrence optimiste :
+-- seules les lignes encore dans le statut attendu changent, en un seul
+-- UPDATE ... WHERE status = p_expected (un aller-retour RPC PostgREST).
+--
+-- Renvoie uniquement les ids effectivement passés au nouveau statut
+-- (pas de planning_data en retour).
+--
+--   select * from transition_status('ai_tournament_planning', array[...]::uuid[], 'generated', 'published');
+
+create or replace function public.transition_status(
+    p_table text,
+    p_ids uuid[],
+    p_expected text,
+    p_status text
+)
+returns setof uuid
+language plpgsql
+security invoker
+as $$
+begin
+    if p_table not in ('ai_tournament_planning', 'tournament') then
+        raise exception 'transition_status: table non autorisée %', p_table;
+    end if;
+
+    return query execute format(
+        'update public.%I set status = $1, updated_at = now() '
+        'where id = any($2) and status = $3 returning id',
+        p_table
+    ) using p_status, p_ids, p_expected;
+end;
+$$;
@@ -96,6 +96,21 @@ class TestAIPlanningService:
             updated_at=datetime.utcnow()
         )
     
+    @pytest.fixture
+    def ai_engine(self):
+        """Moteur IA sans cache disque ni validation : seul le chemin de sauvegarde est exercé"""
+        with patch('app.services.ai_planning_service.aiResponseCache') as cache, \
+            patch.multiple('app.services.ai_planning_service.settings', PLANNING_ENGINE="ai",
+                           PLANNING_VALIDATION="off", PLANNING_PROMPT_TEAMS="names"):
+            cache.get.return_value = None
+            yield cache
+
+    def _useMocks(self, tournamentService, openAIService, databaseService):
+        """Les @patch du module ne touchent pas les services déjà liés à l'instance"""
+        self.service.tournamentService = tournamentService
+        self.service.openAIService = openAIService
+        self.service.databaseService = databaseService
+
     # TESTS GENERATE_PLANNING
     # 3 @patch = 3 paramètres mock (ordre inversé) + fixtures
     @patch('app.services.ai_planning_service.databaseService')      # 3ème patch
@@ -107,27 +122,30 @@ class TestAIPlanningService:
                                      mock_db_service,          # 3ème patch
                                      mock_tournament_data,     # fixture
                                      mock_ai_response,         # fixture
-                                     mock_planning):           # fixture
+                                     mock_planning,            # fixture
+                                     ai_engine):               # fixture
         """Test génération planning - succès complet"""
         # Setup mocks
+        self._useMocks(mock_tournament_service, mock_openai_service, mock_db_service)
         mock_tournament_service.getTournamentWithTeams.return_value = mock_tournament_data
-        mock_openai_service.generatePlanning.return_value = mock_ai_response
-        mock_db_service.savePlanning.return_value = mock_planning
-        mock_db_service.saveMatches.return_value = []
-        mock_db_service.savePoules.return_value = []
+        mock_openai_service.generate_planning.return_value = mock_ai_response
+        mock_db_service.persistPlanning.return_value = {"planning": mock_planning, "failed_stage": None}
         
         # Appel
         result = self.service.generatePlanning("550e8400-e29b-41d4-a716-446655440000")
         
         # Vérifications
-        assert result is not None
-        assert result.id.id == "550e8400-e29b-41d4-a716-446655440100"
+        assert result is mock_planning
+        assert result.id == "550e8400-e29b-41d4-a716-446655440100"
         assert result.tournament_id == "550e8400-e29b-41d4-a716-446655440000"
         
         # Vérifier les appels
-        mock_tournament_service.getTournamentWithTeams.assert_called_once_with("tournament_123")
-        mock_openai_service.generatePlanning.assert_called_once()
-        mock_db_service.savePlanning.assert_called_once()
+        mock_tournament_service.getTournamentWithTeams.assert_called_once_with("550e8400-e29b-41d4-a716-446655440000")
+        mock_openai_service.generate_planning.assert_called_once()
+        mock_db_service.persistPlanning.assert_called_once_with(
+            "550e8400-e29b-41d4-a716-446655440000", mock_ai_response, "round_robin"
+        )
+        ai_engine.set.assert_called_once()
     
     # 1 @patch = 1 paramètre mock + fixtures
     @patch('app.services.ai_planning_service.tournamentService')
@@ -175,15 +193,25 @@ class TestAIPlanningService:
                                         mock_openai_service,      # 2ème patch
                                         mock_db_service,          # 3ème patch
                                         mock_tournament_data,     # fixture
-                                        mock_ai_response):        # fixture
+                                        mock_ai_response,         # fixture
+                                        mock_planning,            # fixture
+                                        ai_engine):               # fixture
         """Test génération planning - sauvegarde échoue"""
+        self._useMocks(mock_tournament_service, mock_openai_service, mock_db_service)
         mock_tournament_service.getTournamentWithTeams.return_value = mock_tournament_data
-        mock_openai_service.generatePlanning.return_value = mock_ai_response
-        mock_db_service.savePlanning.return_value = None
+        mock_openai_service.generate_planning.return_value = mock_ai_response
+        mock_db_service.persistPlanning.return_value = None
         
         result = self.service.generatePlanning("tournament_123")
         
         assert result is None
+        mock_db_service.persistPlanning.assert_called_once()
+
+        # planning inséré mais matchs en échec : le planning partiel est supprimé
+        mock_db_service.persistPlanning.return_value = {"planning": mock_planning, "failed_stage": "insert_matches"}
+        with patch.object(self.service, '_deletePlanning') as mock_delete:
+            assert self.service.generatePlanning("tournament_123") is None
+        mock_delete.assert_called_once_with(mock_planning.id)
     
     def test_generate_planning_exception(self):
         """Test génération planning - exception"""
@@ -259,4 +287,33 @@ class TestAIPlanningService:
         
         result = self.service.regeneratePlanning("planning_123")
         
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+    def test_regenerate_planning_incremental(self, mock_planning):
+        """Régénération incrémentale : même planning, synchronisé sans suppression"""
+        report = {"planning": mock_planning, "rows_written": 3}
+        self.service.databaseService.syncPlanning.return_value = report
+
+        with patch.object(self.service, '_getPlanningById', return_value=mock_planning), \
+            patch.object(self.service, '_requestAIPlanning', return_value=({}, {"type_tournoi": "round_robin"})), \
+            patch.object(self.service, '_deletePlanning') as mock_delete:
+            result = self.service.regeneratePlanningIncremental("planning_123")
+
+        assert result is report
+        mock_delete.assert_not_called()
+        self.service.databaseService.syncPlanning.assert_called_once_with("planning_123", {"type_tournoi": "round_robin"})
+
+    def test_planning_job_fills_pending_planning(self, mock_planning):
+        """Tâche de fond : sauvegarde dans le planning existant, statut error en cas d'échec"""
+        stages = []
+        onStage = lambda stage, error=None: stages.append(stage)
+        self.service.databaseService.syncPlanning.return_value = {"planning": mock_planning}
+
+        with patch.object(self.service, '_requestAIPlanning', return_value=({}, {"type_tournoi": "round_robin"})):
+            assert self.service._runPlanningJob("planning_123", "tournament_123", onStage, float("inf")) is True
+        self.service.databaseService.syncPlanning.assert_called_once_with("planning_123", {"type_tournoi": "round_robin"})
+        assert stages == ["saving"]
+
+        with patch.object(self.service, '_requestAIPlanning', return_value=None):
+            assert self.service._runPlanningJob("planning_123", "tournament_123", onStage, float("inf")) is False
+        self.service.databaseService.updatePlanningStatus.assert_called_once_with("planning_123", "error")
@@ -0,0 +1,70 @@
+import os
+from unittest.mock import Mock, patch
+from app.services.ai_response_cache import AIResponseCache, canonicalKey
+
+
+class TestAIResponseCache:
+    """Cache disque des réponses IA : clé canonique, éviction par taille"""
+
+    def setup_method(self):
+        self.inputs = {"tournament_type": "round_robin", "teams": ["A", "B"], "courts": 2}
+
+    def test_canonical_key(self):
+        reordered = {"courts": 2, "teams": ["A", "B"], "tournament_type": "round_robin"}
+        assert canonicalKey(self.inputs) == canonicalKey(reordered)
+        assert canonicalKey(self.inputs) != canonicalKey({**self.inputs, "courts": 3})
+
+    def test_roundtrip_and_eviction(self, tmp_path):
+        cache = AIResponseCache(str(tmp_path), maxBytes=250)
+        response = {"type_tournoi": "round_robin", "matchs": "x" * 60}
+
+        assert cache.get("k1") is None
+        assert cache.set("k1", response)
+        assert cache.get("k1") == response
+
+        cache.set("k2", response)
+        os.utime(tmp_path / "k2.json", (0, 0))  # k2 le moins récemment utilisé
+        cache.set("k3", response)
+
+        assert cache.get("k2") is None
+        assert cache.get("k1") == response and cache.get("k3") == response
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 250
+
+    def test_unreadable_entry_is_dropped(self, tmp_path):
+        cache = AIResponseCache(str(tmp_path), maxBytes=1000)
+        (tmp_path / "k1.json").write_text("{tronqué")
+
+        assert cache.get("k1") is None
+        assert not (tmp_path / "k1.json").exists()
+
+
+class TestAIPlanningServiceCache:
+    """Réponse relue du cache pour des entrées identiques, sauf si useCache=False"""
+
+    def setup_method(self):
+        with patch('app.services.ai_planning_service.getSupabase'):
+            from app.services.ai_planning_service import AIPlanningService
+            self.service = AIPlanningService()
+        self.service.tournamentService = Mock()
+        self.service.openAIService = Mock(assistant_id="asst_test")
+        self.service.openAIService.generate_planning.return_value = {"type_tournoi": "round_robin"}
+
+        tournament = Mock(tournament_type="round_robin", courts_available=2, start_date="2025-07-15",
+                          start_time="09:00", match_duration_minutes=15, break_duration_minutes=5, constraints={})
+        self.teams = [Mock(), Mock()]
+        self.teams[0].name, self.teams[1].name = "Équipe A", "Équipe B"
+        self.tournamentData = {"tournament": tournament, "teams": self.teams}
+        self.service.tournamentService.getTournamentWithTeams.return_value = self.tournamentData
+
+    def test_cached_response_skips_assistant(self, tmp_path):
+        cache = AIResponseCache(str(tmp_path), maxBytes=10000)
+        with patch('app.services.ai_planning_service.aiResponseCache', cache):
+            first = self.service._requestAIPlanning("tournament_123")
+            self.tournamentData["teams"] = list(reversed(self.teams))  # ordre sans effet sur la clé
+            second = self.service._requestAIPlanning("tournament_123")
+            assert self.service.openAIService.generate_planning.call_count == 1
+            assert second[1] == first[1]
+
+            self.service._requestAIPlanning("tournament_123", useCache=False)
+            assert self.service.openAIService.generate_planning.call_count == 2
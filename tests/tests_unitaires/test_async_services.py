@@ -0,0 +1,102 @@
+import asyncio
+import time as clock
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from app.services.async_database_service import asyncDatabaseService
+from app.services.async_tournament_service import asyncTournamentService
+from app.services.database_service import DatabaseService
+from app.services.tournament_service import TournamentService
+from app.models.models import AITournamentPlanning
+from app.core.cache import clearCaches
+from app.core.local_backend import LocalDatabase, AsyncLocalSupabaseClient
+
+
+class TestAsyncDatabaseService:
+    """Tests du service Database asynchrone"""
+
+    def setup_method(self):
+        self.service = asyncDatabaseService
+        self.supabasePatch = patch.object(asyncDatabaseService, "supabase", MagicMock())
+        self.supabasePatch.start()
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    @pytest.mark.asyncio
+    async def test_save_planning_success(self):
+        """Sauvegarde d'un planning via le client async"""
+        mock_response = Mock()
+        mock_response.data = [{
+            "id": "planning-123",
+            "tournament_id": "tournament-456",
+            "type_tournoi": "round_robin",
+            "status": "generated",
+            "total_matches": 0
+        }]
+        self.service.supabase.table.return_value.insert.return_value.execute = AsyncMock(return_value=mock_response)
+
+        result = await self.service.savePlanning("tournament-456", {"type_tournoi": "round_robin"}, "round_robin")
+
+        assert isinstance(result, AITournamentPlanning)
+        assert result.id == "planning-123"
+        self.service.supabase.table.assert_called_with("ai_tournament_planning")
+
+    @pytest.mark.asyncio
+    async def test_get_planning_error(self):
+        """Une erreur réseau renvoie None"""
+        chain = self.service.supabase.table.return_value.select.return_value.eq.return_value.single.return_value
+        chain.execute = AsyncMock(side_effect=Exception("DB Error"))
+
+        result = await self.service.getPlanningWithDetailsByPlanningId("planning-123")
+
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_user_by_email_ignores_stored_case(self):
+        """Profil enregistré avec majuscules, recherché en minuscules"""
+        db = LocalDatabase()
+        db.seed({"profile": [{"id": "u1", "email": "Jane.Doe@x.com"}]})
+        self.service.supabase = AsyncLocalSupabaseClient(db)
+        clearCaches()
+
+        assert (await self.service.getUserByEmail("jane.doe@x.com")).id == "u1"
+
+    def test_only_async_methods_exposed(self):
+        """Le service async ne récupère pas les écritures sync : seules ses méthodes existent"""
+        assert not isinstance(self.service, DatabaseService)
+        assert not hasattr(self.service, "syncPlanning")
+        assert not hasattr(self.service, "persistPlanning")
+        assert asyncio.iscoroutinefunction(self.service.savePlanning)
+
+
+class TestAsyncTournamentService:
+    """Tests du service Tournament asynchrone"""
+
+    @pytest.mark.asyncio
+    async def test_tournament_with_teams_runs_queries_concurrently(self):
+        """Tournoi et équipes sont récupérés en parallèle"""
+        tournament = Mock(status="ready")
+
+        async def slowTournament(tournamentId):
+            await asyncio.sleep(0.1)
+            return tournament, "etag-tournoi"
+
+        async def slowTeams(tournamentId):
+            await asyncio.sleep(0.1)
+            return (Mock(), Mock()), "etag-equipes"
+
+        with patch.object(asyncTournamentService, "getTournamentByIdWithEtag", side_effect=slowTournament), \
+                patch.object(asyncTournamentService, "getTournamentTeamsWithEtag", side_effect=slowTeams):
+            start = clock.perf_counter()
+            result = await asyncTournamentService.getTournamentWithTeams("tournament-1")
+            elapsed = clock.perf_counter() - start
+
+        assert result["teams_count"] == 2
+        assert result["can_start"] is True
+        assert elapsed < 0.18
+
+    def test_shares_row_helpers_without_sync_base(self):
+        """Conversion des lignes partagée via le mixin, pas via le service sync"""
+        assert not isinstance(asyncTournamentService, TournamentService)
+        teams = asyncTournamentService._toTeams([{"id": "bad"}])
+        assert teams == []
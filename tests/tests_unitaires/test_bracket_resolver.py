@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime
+from app.models.models import AIGeneratedMatch
+from app.services.bracket_resolver import PlaceholderGraph
+
+
+def _match(matchId: str, equipeA: str, equipeB: str, pouleId: str = None) -> AIGeneratedMatch:
+    return AIGeneratedMatch(
+        planning_id="p1",
+        match_id_ai=matchId,
+        equipe_a=equipeA,
+        equipe_b=equipeB,
+        terrain=1,
+        debut_horaire=datetime(2025, 7, 15, 9),
+        fin_horaire=datetime(2025, 7, 15, 9, 20),
+        phase="poules" if pouleId else "elimination",
+        poule_id=pouleId
+    )
+
+
+class TestPlaceholderGraph:
+    """Graphe des placeholders : analyse unique, résolution des seuls emplacements dépendants"""
+
+    def setup_method(self):
+        self.graph = PlaceholderGraph([
+            _match("poule_a_m1", "Équipe 1", "Équipe 2", "poule_a"),
+            _match("poule_b_m1", "Équipe 3", "Équipe 4", "poule_b"),
+            _match("elim_demi_1", "1er_poule_a", "2e_B"),
+            _match("elim_demi_2", "1er_poule_b", "2e_poule_a"),
+            _match("elim_finale", "winner_demi_1", "winner_elim_demi_2"),
+            _match("elim_troisieme", "loser_demi_1", "loser_demi_2"),
+            _match("elim_bonus", "winner_quart_9", "Équipe 1"),
+        ])
+
+    def test_dependencies_indexed_once(self):
+        assert self.graph.dependents("elim_demi_1") == {
+            "winner": [("elim_finale", "a")],
+            "loser": [("elim_troisieme", "a")]
+        }
+        assert self.graph.dependents("poule_a_m1") == {}
+        assert self.graph.unresolved == [(("elim_bonus", "a"), "winner_quart_9")]
+
+    def test_poule_ranking(self):
+        updates = self.graph.resolvePouleRanking("poule_b", ["t3", "t4"])
+
+        assert updates == {
+            "elim_demi_1": {"resolved_equipe_b_id": "t4"},
+            "elim_demi_2": {"resolved_equipe_a_id": "t3"}
+        }
+        with pytest.raises(KeyError):
+            self.graph.resolvePouleRanking("poule_z", ["t1"])
+
+    def test_match_result_skips_already_resolved(self):
+        updates = self.graph.resolveMatchResult("elim_demi_2", "t3", "t2")
+        assert updates == {
+            "elim_finale": {"resolved_equipe_b_id": "t3"},
+            "elim_troisieme": {"resolved_equipe_b_id": "t2"}
+        }
+
+        self.graph.apply(updates)
+        assert self.graph.resolveMatchResult("elim_demi_2", "t3") == {}
+        with pytest.raises(KeyError):
+            self.graph.resolveMatchResult("inconnu", "t1")
@@ -0,0 +1,37 @@
+import time as clock
+from app.core.cache import TTLCache
+
+
+class TestTTLCache:
+    """Tests du cache TTL + LRU"""
+
+    def test_lru_eviction(self):
+        """Au-delà de maxSize, l'entrée la moins récemment lue est évincée"""
+        cache = TTLCache("test", maxSize=2, ttlSeconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self):
+        """Une entrée expirée compte comme un miss"""
+        cache = TTLCache("test", maxSize=10, ttlSeconds=0.01)
+        cache.set("a", 1)
+        clock.sleep(0.02)
+
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["expirations"] == 1 and stats["misses"] == 1 and stats["size"] == 0
+
+    def test_invalidate(self):
+        """invalidate supprime uniquement les clés présentes"""
+        cache = TTLCache("test", maxSize=10, ttlSeconds=60)
+        cache.set("a", 1)
+        cache.invalidate("a", "absent", None)
+
+        assert cache.get("a") is None
+        assert cache.stats()["invalidations"] == 1
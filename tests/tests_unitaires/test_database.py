@@ -0,0 +1,98 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import app.core.database as database
+from app.core.database import ConnectionStats, PooledPostgrestClient
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """Faux PostgREST HTTP/1.1 qui garde les connexions ouvertes"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps([{"id": "t1"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSharedSupabaseClient:
+    """Tests du client Supabase partagé"""
+
+    def setup_method(self):
+        self._previous = database.supabase
+        database.supabase = None
+
+    def teardown_method(self):
+        database.supabase = self._previous
+
+    def test_get_supabase_builds_client_once(self):
+        """Le client n'est construit qu'une fois, même avec des appels concurrents"""
+        with patch.object(database.PooledSupabaseClient, "create", return_value=object()) as mock_create:
+            threads = [threading.Thread(target=database.getSupabase) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            first = database.getSupabase()
+            assert database.getSupabase() is first
+            mock_create.assert_called_once()
+
+    def test_close_supabase_resets_client(self):
+        """closeSupabase ferme le pool et permet une reconstruction"""
+        client = database.PooledSupabaseClient.create(database.SUPABASE_URL, database.SUPABASE_SERVICE_KEY)
+        database.supabase = client
+        session = client.postgrest.session
+
+        database.closeSupabase()
+
+        assert database.supabase is None
+        assert session.is_closed
+
+
+class TestConnectionStats:
+    """Tests des compteurs de réutilisation du pool"""
+
+    @pytest.fixture
+    def server(self):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+        httpd.shutdown()
+        httpd.server_close()
+
+    def test_trace_counts_new_connections(self):
+        """Seuls les événements de connexion incrémentent le compteur"""
+        stats = ConnectionStats()
+        stats.trace("connection.connect_tcp.complete", {})
+        stats.trace("connection.start_tls.complete", {})
+        stats.trace("http11.send_request_headers.started", {})
+
+        snapshot = stats.snapshot()
+        assert snapshot["new_connections"] == 1
+        assert snapshot["tls_handshakes"] == 1
+
+    def test_keep_alive_connection_is_reused(self, server):
+        """Plusieurs requêtes PostgREST réutilisent la même connexion"""
+        database.connectionStats.reset()
+        client = PooledPostgrestClient(server)
+        try:
+            for _ in range(5):
+                result = client.from_("tournament").select("id").execute()
+                assert result.data == [{"id": "t1"}]
+        finally:
+            client.aclose()
+
+        snapshot = database.getConnectionStats()
+        assert snapshot["requests"] == 5
+        assert snapshot["new_connections"] == 1
+        assert snapshot["reused_connections"] == 4
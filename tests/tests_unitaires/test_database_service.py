@@ -2,7 +2,9 @@ import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
 from app.services.database_service import databaseService
-from app.models.models import AITournamentPlanning, AIGeneratedMatch, AIGeneratedPoule
+from app.models.models import AITournamentPlanning, AIGeneratedMatch, AIGeneratedPoule, AIPlanningData
+from app.core.cache import clearCaches
+from app.core.local_backend import LocalDatabase, LocalSupabaseClient
 
 
 class TestDatabaseService:
@@ -479,4 +481,556 @@ class TestDatabaseServicePrivateMethods:
         assert isinstance(result, AIGeneratedMatch)
         assert result.match_id_ai == "finale_1"
         assert result.phase == "finale"
-        assert result.equipe_a == "winner_demi_1"
\ No newline at end of file
+        assert result.equipe_a == "winner_demi_1"
+
+
+class TestDatabaseServiceProfileCache:
+    """Cache des profils (positif et négatif) et anti-renvoi des invitations"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.db.seed({"profile": [{"id": "u1", "email": "alice@test.com"}]})
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        clearCaches()
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def test_profile_cached_by_id_and_email(self):
+        """Une lecture par id alimente aussi la clé email (normalisée)"""
+        assert self.service.getUserById("u1").email == "alice@test.com"
+        self.db.requestCount = 0
+
+        assert self.service.getUserByEmail("  Alice@Test.com ").id == "u1"
+        assert self.service.getUserById("u1").id == "u1"
+        assert self.db.requestCount == 0
+
+    def test_mixed_case_stored_email(self):
+        """Email enregistré avec majuscules : trouvé quelle que soit la casse, sans invitation"""
+        self.db.seed({"profile": [{"id": "u2", "email": "Jane.Doe@x.com"},
+                                  {"id": "u3", "email": "jane_doe@x.com"}]})
+
+        assert self.service.getUserByEmail("jane.doe@x.com").id == "u2"
+        assert self.service.getUserByEmail("JANE.DOE@X.COM").id == "u2"
+        assert self.service.getUserByEmail("janeXdoe@x.com") is None  # "_" n'est pas un joker
+        assert self.service.getUserByEmail("Jane_Doe@x.com").id == "u3"
+
+    def test_negative_entry_and_single_invitation(self):
+        """Une rafale de recherches d'un email inconnu : 1 lecture, 1 invitation"""
+        for _ in range(5):
+            if self.service.getUserByEmail("inconnu@test.com") is None:
+                self.service.sendInvitationEmail("Inconnu@test.com")
+
+        assert self.db.requestCount == 2  # 1 select profile + 1 invitation
+        assert self.db.invitations == ["inconnu@test.com"]
+
+    def test_errors_are_not_cached(self):
+        """Une erreur transitoire n'est pas mise en cache négatif"""
+        with patch.object(databaseService, "supabase", Mock(table=Mock(side_effect=Exception("Timeout")))):
+            assert self.service.getUserById("u1") is None
+
+        assert self.service.getUserById("u1").id == "u1"
+
+
+def _pouleMatch(pouleId: str, index: int) -> dict:
+    return {
+        "match_id": f"{pouleId}_m{index}",
+        "equipe_a": f"Équipe {index}",
+        "equipe_b": f"Équipe {index + 1}",
+        "terrain": 1 + index % 2,
+        "debut_horaire": f"2025-07-15T09:{index:02d}:00",
+        "fin_horaire": f"2025-07-15T09:{index + 1:02d}:00"
+    }
+
+
+class TestDatabaseServicePersistPlanning:
+    """Pipeline de sauvegarde : validation unique, lignes dérivées en une passe"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        self.planningData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [
+                {"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                 "matchs": [_pouleMatch("poule_a", i) for i in range(3)]}
+            ],
+            "phase_elimination_apres_poules": {
+                "demi_finales": [_pouleMatch("demi", 10)],
+                "finale": _pouleMatch("finale", 20)
+            }
+        }
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def test_persist_planning_validates_once(self):
+        """Planning, matchs et poules sauvegardés ; AIPlanningData construit une seule fois"""
+        with patch.object(AIPlanningData, "__init__", autospec=True, side_effect=AIPlanningData.__init__) as validator:
+            saved = self.service.persistPlanning("t1", self.planningData, "poules_elimination")
+
+        assert validator.call_count == 1
+        assert saved["failed_stage"] is None
+        assert saved["planning"].total_matches == 5
+        assert (saved["matches_count"], saved["poules_count"]) == (5, 1)
+        assert set(saved["timings_ms"]) == {"validate", "build_rows", "rpc_save_planning"}
+        assert self.db.requestCount == 1  # planning + matchs + poules en un aller-retour
+
+        matches = self.db.tables["ai_generated_match"]
+        assert [m["phase"] for m in matches] == ["poules"] * 3 + ["elimination", "finale"]
+        assert matches[0]["poule_id"] == "poule_a"
+        assert matches[0]["debut_horaire"] == "2025-07-15T09:00:00"
+
+    def test_persist_planning_rpc_is_atomic(self):
+        """Une erreur dans la fonction annule tout : aucune ligne orpheline"""
+        self.db.seed({"ai_generated_poule": [{"id": "fixe", "planning_id": "autre", "poule_id": "p", "nom_poule": "P"}]})
+        with patch("app.services.database_service.uuid.uuid4", return_value="fixe"):
+            assert self.service.persistPlanning("t1", self.planningData, "poules_elimination") is None
+
+        assert self.db.tables["ai_tournament_planning"] == []
+        assert self.db.tables["ai_generated_match"] == []
+
+    def test_persist_planning_without_rpc_falls_back(self):
+        """Fonction non déployée (PGRST202) : repli sur les insertions séparées"""
+        self.db.rpcs.pop("save_planning_atomic")
+
+        saved = self.service.persistPlanning("t1", self.planningData, "poules_elimination")
+
+        assert saved["failed_stage"] is None
+        assert "insert_matches" in saved["timings_ms"]
+        assert len(self.db.tables["ai_generated_match"]) == 5
+
+    def test_persist_planning_invalid_json(self):
+        """JSON invalide : rien n'est inséré"""
+        assert self.service.persistPlanning("t1", {"poules": "pas une liste"}, "poules") is None
+        assert self.db.tables["ai_tournament_planning"] == []
+
+
+class TestDatabaseServiceChunkedInsert:
+    """Insertion des matchs par paquets parallèles"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        self.planningData = {
+            "type_tournoi": "round_robin",
+            "matchs_round_robin": [_pouleMatch("rr", i) for i in range(10)]
+        }
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def test_save_matches_in_ordered_chunks(self, monkeypatch):
+        """10 matchs, paquets de 3 : 4 requêtes, ordre conservé"""
+        monkeypatch.setattr("app.services.database_service.settings.MATCH_INSERT_CHUNK_SIZE", 3)
+
+        matches = self.service.saveMatches("p1", self.planningData)
+
+        assert self.db.requestCount == 4
+        assert [m.match_id_ai for m in matches] == [f"rr_m{i}" for i in range(10)]
+
+    def test_save_matches_minimal_skips_echo(self, monkeypatch):
+        """returning=minimal : rien n'est renvoyé par la base, les lignes locales suffisent"""
+        monkeypatch.setattr("app.services.database_service.settings.MATCH_INSERT_CHUNK_SIZE", 4)
+
+        matches = self.service.saveMatches("p1", self.planningData, minimal=True)
+
+        assert len(matches) == 10
+        assert len(self.db.tables["ai_generated_match"]) == 10
+
+    def test_chunk_errors_are_reported_in_order(self, monkeypatch):
+        """Les paquets en échec sont listés dans l'ordre, avec leur position"""
+        monkeypatch.setattr("app.services.database_service.settings.MATCH_INSERT_CHUNK_SIZE", 2)
+        rows = [{"id": f"m{i}", "planning_id": "p1"} for i in range(6)]
+        self.db.seed({"ai_generated_match": [{"id": "m5", "planning_id": "p0"}, {"id": "m2", "planning_id": "p0"}]})
+
+        report = self.service._insertInChunks("ai_generated_match", rows)
+
+        assert [(e["chunk"], e["offset"]) for e in report["errors"]] == [(1, 2), (2, 4)]
+        assert report["inserted"] == 2
+        assert report["rolled_back"] == 2
+        assert [row["id"] for row in self.db.tables["ai_generated_match"]] == ["m5", "m2"]  # lignes existantes gardées
+
+    def test_failed_chunk_rolls_back_inserted_chunks(self, monkeypatch):
+        """Le 2e paquet échoue : saveMatches renvoie None et la table reste vide"""
+        monkeypatch.setattr("app.services.database_service.settings.MATCH_INSERT_CHUNK_SIZE", 4)
+        monkeypatch.setattr("app.services.database_service.settings.MATCH_INSERT_CONCURRENCY", 1)
+        client = self.service.supabase
+        table = client.table
+
+        def failSecondChunk(name):
+            query = table(name)
+            insert = query.insert
+
+            def failingInsert(rows, **kwargs):
+                if rows[0]["match_id_ai"] == "rr_m4":
+                    raise Exception("timeout")
+                return insert(rows, **kwargs)
+
+            query.insert = failingInsert
+            return query
+
+        monkeypatch.setattr(client, "table", failSecondChunk)
+
+        assert self.service.saveMatches("p1", self.planningData, minimal=True) is None
+        assert self.db.tables["ai_generated_match"] == []
+
+
+class TestDatabaseServicePlanningDetails:
+    """Détail d'un planning en une requête embarquée"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        planningData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", i) for i in (3, 1, 2)]}]
+        }
+        self.planningId = self.service.persistPlanning("t1", planningData, "poules_elimination")["planning"].id
+        self.db.requestCount = 0
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def test_details_single_query_ordered(self):
+        """Planning + matchs triés par debut_horaire + poules, un seul aller-retour"""
+        details = self.service.getPlanningDetails(self.planningId)
+
+        assert self.db.requestCount == 1
+        assert details["planning"]["planning_data"]["type_tournoi"] == "poules_elimination"
+        assert [m.match_id_ai for m in details["matches"]] == ["poule_a_m1", "poule_a_m2", "poule_a_m3"]
+        assert details["poules"][0].nb_matches == 3
+
+    def test_details_projection(self):
+        """Projection : planning_data non transféré, poules non embarquées"""
+        details = self.service.getPlanningDetails(self.planningId, fields=["status", "total_matches"], include=["matches"])
+
+        assert details["planning"] == {"id": self.planningId, "status": "generated", "total_matches": 3}
+        assert details["poules"] == []
+
+        with pytest.raises(ValueError):
+            self.service.getPlanningDetails(self.planningId, fields=["status; drop table"])
+
+
+class TestDatabaseServicePlanningMatches:
+    """Requêtes filtrées sur les matchs et index par terrain"""
+
+    def setup_method(self):
+        clearCaches()
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        planningData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", i) for i in (1, 2, 3, 4)]}]
+        }
+        self.planningId = self.service.persistPlanning("t1", planningData, "poules_elimination")["planning"].id
+        self.db.requestCount = 0
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def test_filters_pushed_to_query(self):
+        """Terrain + créneau filtrés côté base, un seul aller-retour, tri par horaire"""
+        matches = self.service.getPlanningMatches(
+            self.planningId,
+            terrain=2,
+            startFrom=datetime(2025, 7, 15, 9, 2),
+            startTo=datetime(2025, 7, 15, 9, 10)
+        )
+
+        assert self.db.requestCount == 1
+        assert [m.match_id_ai for m in matches] == ["poule_a_m3"]
+        assert [m.match_id_ai for m in self.service.getPlanningMatches(self.planningId, pouleId="poule_a")] == [
+            "poule_a_m1", "poule_a_m2", "poule_a_m3", "poule_a_m4"
+        ]
+        assert self.service.getPlanningMatches(self.planningId, phase="finale") == []
+
+    def test_court_index_now_and_next(self):
+        """Index construit une fois puis servi par le cache"""
+        index = self.service.getCourtIndex(self.planningId)
+        assert self.service.getCourtIndex(self.planningId) is index
+        assert self.db.requestCount == 1
+        assert index.courts() == [1, 2]
+
+        current, upcoming = index.nowAndNext(2, datetime(2025, 7, 15, 9, 1, 30))
+        assert current.match_id_ai == "poule_a_m1"
+        assert upcoming.match_id_ai == "poule_a_m3"
+
+        current, upcoming = index.nowAndNext(2, datetime(2025, 7, 15, 9, 2, 30))
+        assert current is None
+        assert upcoming.match_id_ai == "poule_a_m3"
+
+        assert [m.match_id_ai for m in index.window(1, datetime(2025, 7, 15, 9), datetime(2025, 7, 15, 10))] == [
+            "poule_a_m2", "poule_a_m4"
+        ]
+
+    def test_status_update_drops_court_index(self):
+        index = self.service.getCourtIndex(self.planningId)
+        self.service.updatePlanningStatus(self.planningId, "published")
+        assert self.service.getCourtIndex(self.planningId) is not index
+
+
+class TestDatabaseServiceMatchExport:
+    """Lecture des matchs page par page pour l'export en flux"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        planningData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", i) for i in range(1, 8)]
+                                  + [dict(_pouleMatch("poule_a", 8), debut_horaire="2025-07-15T09:01:00")]}]
+        }
+        self.planningId = self.service.persistPlanning("t1", planningData, "poules_elimination")["planning"].id
+        self.db.requestCount = 0
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def test_keyset_pages_cover_all_rows(self):
+        """Pages de 3 : toutes les lignes une seule fois, y compris à horaire égal"""
+        rows = list(self.service.iterPlanningMatchRows(self.planningId, pageSize=3))
+
+        assert self.db.requestCount == 3
+        assert len({row["id"] for row in rows}) == 8
+        assert [row["match_id_ai"] for row in rows][:2] in (["poule_a_m1", "poule_a_m8"], ["poule_a_m8", "poule_a_m1"])
+
+    @pytest.mark.asyncio
+    async def test_stream_csv(self):
+        from app.services.planning_export import streamMatches, MATCH_EXPORT_COLUMNS
+
+        async def rows():
+            for row in self.service.iterPlanningMatchRows(self.planningId, pageSize=3):
+                yield row
+
+        lines = "".join([chunk async for chunk in streamMatches(rows(), "csv")]).splitlines()
+        assert lines[0] == ",".join(MATCH_EXPORT_COLUMNS)
+        assert len(lines) == 9
+
+        with pytest.raises(ValueError):
+            streamMatches(rows(), "xml")
+
+
+class TestDatabaseServiceSyncPlanning:
+    """Régénération incrémentale : seules les lignes modifiées sont écrites"""
+
+    def setup_method(self):
+        clearCaches()
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        self.planningData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", i) for i in (1, 2, 3, 4)]}]
+        }
+        self.planningId = self.service.persistPlanning("t1", self.planningData, "poules_elimination")["planning"].id
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def _match(self, matchId: str) -> dict:
+        return next(row for row in self.db.rows("ai_generated_match") if row["match_id_ai"] == matchId)
+
+    def test_only_changes_written(self):
+        self._match("poule_a_m2")["status"] = "completed"
+        moved = self._match("poule_a_m2")["id"]
+        newData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", 1),
+                                   dict(_pouleMatch("poule_a", 2), terrain=3),
+                                   _pouleMatch("poule_a", 4),
+                                   _pouleMatch("poule_a", 5)]}]
+        }
+
+        synced = self.service.syncPlanning(self.planningId, newData)
+
+        assert synced["matches"] == {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 2}
+        assert synced["poules"] == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 1}
+        assert synced["rows_written"] == 4
+        assert synced["planning"].id == self.planningId
+        assert sorted(row["match_id_ai"] for row in self.db.rows("ai_generated_match")) == [
+            "poule_a_m1", "poule_a_m2", "poule_a_m4", "poule_a_m5"
+        ]
+        updated = self._match("poule_a_m2")
+        assert (updated["id"], updated["terrain"], updated["status"]) == (moved, 3, "completed")
+
+    def test_changed_team_resets_its_resolved_slot(self):
+        """Upsert de la ligne complète : résultat effacé, équipe résolue du slot modifié remise à zéro"""
+        stored = self._match("poule_a_m3")
+        stored.update(status="in_progress", resolved_equipe_a_id="e3", resolved_equipe_b_id="e4")
+        newData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", 1), _pouleMatch("poule_a", 2),
+                                   dict(_pouleMatch("poule_a", 3), equipe_a="Équipe 9"), _pouleMatch("poule_a", 4)]}]
+        }
+
+        synced = self.service.syncPlanning(self.planningId, newData)
+
+        assert synced["matches"]["updated"] == 1
+        updated = self._match("poule_a_m3")
+        assert (updated["equipe_a"], updated["status"]) == ("Équipe 9", "scheduled")
+        assert (updated["resolved_equipe_a_id"], updated["resolved_equipe_b_id"]) == (None, "e4")
+        assert updated["created_at"] and updated["match_id_ai"] == "poule_a_m3"
+
+    def test_changed_teams_clear_downstream_results(self):
+        """Demi rejouée avec d'autres équipes : son vainqueur n'est plus qualifié en finale"""
+        elimination = lambda matchId, a, b: dict(_pouleMatch("elim", 9), match_id=matchId, equipe_a=a, equipe_b=b)
+        planningData = lambda demiB: {
+            "type_tournoi": "poules_elimination",
+            "poules": self.planningData["poules"],
+            "phase_elimination_apres_poules": {
+                "demi_finales": [elimination("demi_1", "Équipe 1", demiB)],
+                "finale": elimination("finale", "winner_demi_1", "Équipe 5")
+            }
+        }
+        self.service.syncPlanning(self.planningId, planningData("Équipe 3"))
+        self._match("demi_1")["status"] = "completed"
+        self._match("finale").update(status="completed", resolved_equipe_a_id="team-1")
+
+        synced = self.service.syncPlanning(self.planningId, planningData("Équipe 7"))
+
+        assert (synced["matches"]["updated"], synced["matches"]["unchanged"]) == (2, 4)
+        assert self._match("demi_1")["status"] == "scheduled"
+        finale = self._match("finale")
+        assert (finale["resolved_equipe_a_id"], finale["status"]) == (None, "scheduled")
+
+    def test_same_data_writes_planning_only(self):
+        """Horaires relus avec fuseau : pas de faux changement"""
+        for row in self.db.rows("ai_generated_match"):
+            row["debut_horaire"] = row["debut_horaire"] + "+00:00"
+        self.db.requestCount = 0
+
+        synced = self.service.syncPlanning(self.planningId, self.planningData)
+
+        assert synced["rows_written"] == 1
+        assert synced["matches"]["unchanged"] == 4
+        assert self.db.requestCount == 3
+
+    def test_duplicate_match_ids_rejected(self):
+        duplicated = dict(self.planningData, poules=[dict(self.planningData["poules"][0],
+                                                          matchs=[_pouleMatch("poule_a", 1)] * 2)])
+        assert self.service.syncPlanning(self.planningId, duplicated) is None
+        assert len(self.db.rows("ai_generated_match")) == 4
+
+
+class TestDatabaseServicePlaceholderResolution:
+    """Résultats et classements propagés aux matchs en aval, en une écriture"""
+
+    def setup_method(self):
+        clearCaches()
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        elimination = lambda matchId, a, b: dict(_pouleMatch("elim", 9), match_id=matchId, equipe_a=a, equipe_b=b)
+        planningData = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "nom_poule": "Poule A", "equipes": ["Équipe 1", "Équipe 2"],
+                        "matchs": [_pouleMatch("poule_a", 1)]}],
+            "phase_elimination_apres_poules": {
+                "demi_finales": [elimination("demi_1", "1er_poule_a", "Équipe 3"),
+                                 elimination("demi_2", "2e_poule_a", "Équipe 4")],
+                "finale": elimination("finale", "winner_demi_1", "winner_demi_2")
+            }
+        }
+        self.planningId = self.service.persistPlanning("t1", planningData, "poules_elimination")["planning"].id
+        self.db.requestCount = 0
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def _match(self, matchId: str) -> dict:
+        return next(row for row in self.db.rows("ai_generated_match") if row["match_id_ai"] == matchId)
+
+    def test_ranking_then_result(self):
+        ranking = self.service.recordPouleRanking(self.planningId, "poule_a", ["team-1", "team-2"])
+        assert ranking["rows_written"] == 2
+        assert self.db.requestCount == 2  # chargement du graphe + un upsert
+        assert self._match("demi_1")["resolved_equipe_a_id"] == "team-1"
+        assert self._match("demi_2")["resolved_equipe_a_id"] == "team-2"
+
+        self.db.requestCount = 0
+        result = self.service.recordMatchResult(self.planningId, "demi_1", "team-1", "team-3")
+        assert result["resolved"] == {"finale": {"resolved_equipe_a_id": "team-1"}}
+        assert self.db.requestCount == 1  # graphe servi par le cache
+        assert self._match("demi_1")["status"] == "completed"
+        assert self._match("demi_1")["resolved_equipe_a_id"] == "team-1"
+        assert self._match("finale")["equipe_a"] == "winner_demi_1"
+
+    def test_unknown_match(self):
+        with pytest.raises(KeyError):
+            self.service.recordMatchResult(self.planningId, "quart_1", "team-1")
+
+    def test_cached_graph_never_mutated_in_place(self):
+        """Chaque requête travaille sur sa copie : une écriture échouée ne laisse rien dans le cache"""
+        graph = self.service.getPlaceholderGraph(self.planningId)
+        graph.apply({"finale": {"resolved_equipe_a_id": "team-9"}})
+        assert self.service.getPlaceholderGraph(self.planningId).matches["finale"].resolved_equipe_a_id is None
+
+        with patch.object(self.service, "supabase", Mock(table=Mock(side_effect=Exception("boom")))):
+            assert self.service.recordMatchResult(self.planningId, "demi_1", "team-1") is None
+        assert self.service.getPlaceholderGraph(self.planningId).matches["finale"].resolved_equipe_a_id is None
+
+        self.service.recordMatchResult(self.planningId, "demi_1", "team-1")
+        assert self.service.getPlaceholderGraph(self.planningId).matches["finale"].resolved_equipe_a_id == "team-1"
+
+
+class TestDatabaseServiceStatusTransition:
+    """Transitions de statut en lot, conditionnées au statut courant"""
+
+    def setup_method(self):
+        clearCaches()
+        self.db = LocalDatabase()
+        self.service = databaseService
+        self.supabasePatch = patch.object(databaseService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        self.db.seed({"ai_tournament_planning": [
+            {"id": f"p{i}", "tournament_id": "t1", "type_tournoi": "round_robin", "status": "generated",
+             "planning_data": {"type_tournoi": "round_robin"}, "total_matches": 0}
+            for i in range(3)
+        ]})
+        self.db.tables["ai_tournament_planning"][1]["status"] = "published"
+        self.db.requestCount = 0
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def _statuses(self):
+        return [row["status"] for row in self.db.rows("ai_tournament_planning")]
+
+    def test_rpc_transition(self):
+        report = self.service.transitionPlanningStatuses(["p0", "p1", "p2"], "generated", "published")
+
+        assert report["transitioned"] == ["p0", "p2"]
+        assert report["skipped"] == ["p1"]
+        assert self.db.requestCount == 1
+        assert self._statuses() == ["published"] * 3
+
+    def test_fallback_without_rpc(self):
+        """Fonction non déployée : même résultat via un update filtré"""
+        del self.db.rpcs["transition_status"]
+
+        report = self.service.transitionPlanningStatuses(["p0", "p1"], "generated", "validated")
+
+        assert report["transitioned"] == ["p0"]
+        assert self.db.requestCount == 2
+        assert self._statuses() == ["validated", "published", "generated"]
@@ -0,0 +1,22 @@
+from app.core.etag import computeEtag, etagMatches
+
+
+class TestEtag:
+    """Tests des ETags faibles et de If-None-Match"""
+
+    def test_compute_etag_is_stable(self):
+        """Même entrée -> même ETag ; un champ qui change -> ETag différent"""
+        assert computeEtag("t1", "2025-01-01") == computeEtag("t1", "2025-01-01")
+        assert computeEtag("t1", "2025-01-01") != computeEtag("t1", "2025-01-02")
+        assert computeEtag("t1").startswith('W/"')
+
+    def test_etag_matches(self):
+        """Comparaison faible, listes et joker"""
+        etag = computeEtag("t1")
+        strong = etag.removeprefix("W/")
+
+        assert etagMatches(etag, etag)
+        assert etagMatches(f'"autre", {strong}', etag)
+        assert etagMatches("*", etag)
+        assert not etagMatches('"autre"', etag)
+        assert not etagMatches(None, etag)
@@ -0,0 +1,92 @@
+import time as clock
+import pytest
+from postgrest import APIError
+from app.core.local_backend import LocalDatabase, LocalSupabaseClient, AsyncLocalSupabaseClient
+
+
+class TestLocalBackend:
+    """Tests du backend local compatible PostgREST"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.db.seed({
+            "tournament": [{"id": "t1", "name": "Tournoi 1"}, {"id": "t2", "name": "Tournoi 2"}],
+            "team": [
+                {"id": "e1", "name": "Zèbres", "tournament_id": "t1"},
+                {"id": "e2", "name": "Aigles", "tournament_id": "t1"},
+                {"id": "e3", "name": "Lions", "tournament_id": "t2"}
+            ],
+            "profile": [{"id": "u1", "email": "a@test.com"}],
+            "team_member": [{"id": "m1", "team_id": "e1", "user_id": "u1"}]
+        })
+        self.client = LocalSupabaseClient(self.db)
+
+    def test_select_eq_order(self):
+        """select/eq/order comme PostgREST"""
+        result = self.client.table("team").select("*").eq("tournament_id", "t1").order("name").execute()
+
+        assert [team["name"] for team in result.data] == ["Aigles", "Zèbres"]
+        assert result.data[0]["status"] == "registered"  # valeur par défaut de la table
+
+    def test_single_returns_object_or_raises(self):
+        """single() renvoie un objet, ou APIError PGRST116 si 0 ligne"""
+        result = self.client.table("tournament").select("*").eq("id", "t1").single().execute()
+        assert result.data["name"] == "Tournoi 1"
+
+        with pytest.raises(APIError) as error:
+            self.client.table("tournament").select("*").eq("id", "absent").single().execute()
+        assert error.value.code == "PGRST116"
+
+    def test_embedded_selects(self):
+        """Relations embarquées many-to-one, one-to-many et count"""
+        members = self.client.from_("team_member").select("*, profile(email)").eq("team_id", "e1").execute()
+        assert members.data[0]["profile"] == {"email": "a@test.com"}
+
+        tournaments = self.client.table("tournament").select("id, team(count)").order("id").execute()
+        assert tournaments.data == [{"id": "t1", "team": [{"count": 2}]}, {"id": "t2", "team": [{"count": 1}]}]
+
+        nested = self.client.table("team").select("name, team_member(user_id, profile(email))").eq("id", "e1").execute()
+        assert nested.data[0]["team_member"][0]["profile"]["email"] == "a@test.com"
+
+    def test_insert_update_delete(self):
+        """Écritures avec retour des lignes concernées"""
+        inserted = self.client.table("team").insert({"name": "Ours", "tournament_id": "t2"}).execute()
+        teamId = inserted.data[0]["id"]
+        assert inserted.data[0]["created_at"]
+
+        updated = self.client.table("team").update({"status": "confirmed"}).eq("id", teamId).execute()
+        assert updated.data[0]["status"] == "confirmed"
+
+        deleted = self.client.table("team").delete().eq("tournament_id", "t2").execute()
+        assert len(deleted.data) == 2
+        assert self.client.table("team").select("id").execute().data == [{"id": "e1"}, {"id": "e2"}]
+
+    def test_or_filter_and_range(self):
+        """Filtre logique or_ et pagination range"""
+        result = self.client.table("team")\
+            .select("id")\
+            .or_("name.eq.Lions,and(tournament_id.eq.t1,name.gt.B)")\
+            .order("id")\
+            .range(0, 0)\
+            .execute()
+
+        assert result.data == [{"id": "e1"}]
+
+    def test_latency_and_request_count(self):
+        """Chaque requête coûte un aller-retour simulé"""
+        self.db.latencyMs = 20
+        start = clock.perf_counter()
+        self.client.table("tournament").select("*").execute()
+        self.client.table("team").select("*").execute()
+
+        assert clock.perf_counter() - start >= 0.04
+        assert self.db.requestCount == 2
+
+    @pytest.mark.asyncio
+    async def test_async_client(self):
+        """Le client async partage la même base"""
+        asyncClient = AsyncLocalSupabaseClient(self.db)
+
+        result = await asyncClient.table("team").select("*").eq("tournament_id", "t2").execute()
+
+        assert result.data[0]["name"] == "Lions"
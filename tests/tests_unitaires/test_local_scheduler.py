@@ -0,0 +1,102 @@
+import pytest
+from datetime import date, datetime, time, timedelta
+from itertools import combinations
+from unittest.mock import Mock
+from app.models.models import AIGeneratedMatch, AIPlanningData
+from app.services.bracket_resolver import PlaceholderGraph
+from app.services.local_scheduler import generateLocalPlanning, bracketOrder, LUNCH_BREAK, DAY_END
+from app.services.schedule_validator import validateSchedule
+
+
+class TestLocalScheduler:
+    """Moteur local : structure du planning et respect des contraintes horaires"""
+
+    def setup_method(self):
+        self.tournament = Mock(courts_available=3, start_date=date(2025, 7, 15), start_time=time(9, 0),
+                               match_duration_minutes=20, break_duration_minutes=5)
+
+    def _teams(self, count, levels=("amateur",)):
+        teams = [Mock(skill_level=levels[index % len(levels)]) for index in range(count)]
+        for index, team in enumerate(teams):
+            team.name = f"Équipe {index + 1}"
+        return teams
+
+    def _planning(self, tournamentType, teams):
+        self.tournament.tournament_type = tournamentType
+        data = generateLocalPlanning(self.tournament, teams)
+        return data, AIPlanningData(**data)
+
+    def _matches(self, planningData):
+        return [match for match, _, _ in planningData.iter_matches()]
+
+    def _assertNoConflicts(self, matches):
+        pause = timedelta(minutes=self.tournament.break_duration_minutes)
+        lunchStart, lunchEnd = (datetime.combine(self.tournament.start_date, bound) for bound in LUNCH_BREAK)
+        for first, second in combinations(matches, 2):
+            shared = {first.equipe_a, first.equipe_b} & {second.equipe_a, second.equipe_b}
+            if first.terrain == second.terrain or shared:
+                assert first.fin_horaire + pause <= second.debut_horaire or second.fin_horaire + pause <= first.debut_horaire
+        for match in matches:
+            assert match.fin_horaire <= lunchStart or match.debut_horaire >= lunchEnd
+            assert 1 <= match.terrain <= self.tournament.courts_available
+
+    def test_round_robin_circle_method(self):
+        data, planningData = self._planning("round_robin", self._teams(7))
+        matches = planningData.matchs_round_robin
+
+        assert len(matches) == 21
+        assert len({frozenset((m.equipe_a, m.equipe_b)) for m in matches}) == 21
+        for journee in range(1, 8):  # 7 journées, une équipe au repos par journée
+            teams = [t for m in matches if m.journee == journee for t in (m.equipe_a, m.equipe_b)]
+            assert len(teams) == len(set(teams)) == 6
+        self._assertNoConflicts(matches)
+
+    def test_poules_then_crossed_bracket(self):
+        data, planningData = self._planning("poules_elimination", self._teams(16, ("expert", "debutant")))
+
+        assert [len(poule.equipes) for poule in planningData.poules] == [4, 4, 4, 4]
+        assert sorted(t for p in planningData.poules for t in p.equipes) == sorted(f"Équipe {i}" for i in range(1, 17))
+        quarts = planningData.phase_elimination_apres_poules.quarts
+        assert (quarts[0].equipe_a, quarts[0].equipe_b) == ("1er_poule_a", "2e_poule_d")
+        lastPouleEnd = max(m.fin_horaire for p in planningData.poules for m in p.matchs)
+        assert min(m.debut_horaire for m in quarts) > lastPouleEnd
+
+        pouleOf = {m.match_id: p.poule_id for p in planningData.poules for m in p.matchs}
+        rows = [AIGeneratedMatch(planning_id="p1", match_id_ai=m.match_id, equipe_a=m.equipe_a, equipe_b=m.equipe_b,
+                                 terrain=m.terrain, debut_horaire=m.debut_horaire, fin_horaire=m.fin_horaire,
+                                 phase="x", poule_id=pouleOf.get(m.match_id))
+                for m in self._matches(planningData)]
+        assert PlaceholderGraph(rows).unresolved == []
+        self._assertNoConflicts(self._matches(planningData))
+
+    def test_seeded_bracket_with_byes(self):
+        teams = self._teams(6, ("debutant", "debutant", "expert"))  # têtes de série : équipes 3 et 6
+        data, planningData = self._planning("elimination_directe", teams)
+
+        assert bracketOrder(8) == [1, 8, 4, 5, 2, 7, 3, 6]
+        assert list(data["rounds_elimination"]) == ["quarts", "demi_finales", "finale", "petite_finale"]
+        assert len(data["rounds_elimination"]["quarts"]) == 2  # têtes de série 1 et 2 exemptes
+        demis = data["rounds_elimination"]["demi_finales"]
+        assert {demis[0]["equipe_a"], demis[1]["equipe_a"]} == {"Équipe 3", "Équipe 6"}
+        assert planningData.calculate_total_matches() == 6
+        self._assertNoConflicts(self._matches(planningData))
+
+    def test_unsupported_type(self):
+        with pytest.raises(ValueError):
+            self._planning("double_elimination", self._teams(4))
+
+    def test_large_inputs_pass_validator(self):
+        """64 équipes : plusieurs jours, chaque jour entre l'heure de début et DAY_END, tous les terrains utilisés"""
+        self.tournament.courts_available = 4
+        data, planningData = self._planning("round_robin", self._teams(64))
+        matches = planningData.matchs_round_robin
+
+        assert validateSchedule(data, self.tournament)["violations"] == []
+        assert len({match.debut_horaire.date() for match in matches}) > 1
+        assert all(self.tournament.start_time <= match.debut_horaire.time() and match.fin_horaire.time() <= DAY_END
+                   for match in matches)
+
+        self.tournament.courts_available = 3
+        for tournamentType, count in (("poules_elimination", 5), ("poules_elimination", 64), ("elimination_directe", 64)):
+            data, _ = self._planning(tournamentType, self._teams(count))
+            assert validateSchedule(data, self.tournament)["violations"] == [], (tournamentType, count)
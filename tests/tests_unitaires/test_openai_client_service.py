@@ -0,0 +1,121 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from app.core.config import settings
+from app.services.openai_client_service import OpenAIClientService, AssistantRunError
+
+
+def _message(text: str):
+    return SimpleNamespace(content=[SimpleNamespace(type="text", text=SimpleNamespace(value=text))])
+
+
+def _event(name: str, **data):
+    return SimpleNamespace(event=name, data=SimpleNamespace(**data))
+
+
+class _FakeStream:
+    """Remplaçant de AssistantStreamManager : rejoue une liste d'événements"""
+
+    def __init__(self, events, messages=None, failAfter=None):
+        self.events = events
+        self.messages = messages or []
+        self.failAfter = failAfter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        for index, event in enumerate(self.events):
+            if self.failAfter is not None and index == self.failAfter:
+                raise ConnectionError("flux coupé")
+            yield event
+
+    def get_final_messages(self):
+        return self.messages
+
+
+class TestOpenAIClientService:
+    """Runs streamés et interrogation avec backoff"""
+
+    def setup_method(self):
+        self.service = OpenAIClientService()
+        self.service.client = MagicMock()
+        self.runs = self.service.client.beta.threads.runs
+
+    def _retrieveSequence(self, *statuses, pollAfterMs=None):
+        responses = []
+        for status in statuses:
+            response = MagicMock()
+            response.parse.return_value = SimpleNamespace(status=status)
+            response.headers = {"openai-poll-after-ms": str(pollAfterMs)} if pollAfterMs else {}
+            responses.append(response)
+        self.runs.with_raw_response.retrieve.side_effect = responses
+
+    def test_stream_returns_final_message(self):
+        self.runs.stream.return_value = _FakeStream(
+            [_event("thread.run.created", id="run_1"), _event("thread.run.completed", status="completed")],
+            messages=[_message('{"type_tournoi": "round_robin"}')]
+        )
+
+        with patch("app.services.openai_client_service.time.sleep") as sleep:
+            assert self.service._stream_run("thread_1", deadline=float("inf")) == '{"type_tournoi": "round_robin"}'
+        sleep.assert_not_called()
+
+    def test_usage_reported_in_both_modes(self):
+        usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=3400, total_tokens=4600)
+        expected = {"prompt_tokens": 1200, "completion_tokens": 3400, "total_tokens": 4600}
+        self.runs.stream.return_value = _FakeStream(
+            [_event("thread.run.created", id="run_1"), _event("thread.run.completed", status="completed", usage=usage)],
+            messages=[_message("ok")]
+        )
+        reports = []
+        self.service._stream_run("thread_1", deadline=float("inf"), on_usage=reports.append)
+        assert reports == [expected]
+
+        response = MagicMock()
+        response.parse.return_value = SimpleNamespace(status="completed", usage=usage)
+        response.headers = {}
+        self.runs.with_raw_response.retrieve.side_effect = [response]
+        self.service.client.beta.threads.messages.list.return_value = SimpleNamespace(data=[_message("ok")])
+        self.service._wait_for_completion("thread_1", "run_1", deadline=float("inf"), on_usage=reports.append)
+        assert reports == [expected, expected]
+
+    def test_stream_failure_event(self):
+        self.runs.stream.return_value = _FakeStream([_event("thread.run.failed", status="failed")])
+
+        with pytest.raises(AssistantRunError):
+            self.service._stream_run("thread_1", deadline=float("inf"))
+
+    def test_stream_cut_falls_back_to_polling(self):
+        self.runs.stream.return_value = _FakeStream([_event("thread.run.created", id="run_1")] * 2, failAfter=1)
+        self._retrieveSequence("completed")
+        self.service.client.beta.threads.messages.list.return_value = SimpleNamespace(data=[_message("ok")])
+
+        assert self.service._stream_run("thread_1", deadline=float("inf")) == "ok"
+        self.runs.with_raw_response.retrieve.assert_called_once_with(thread_id="thread_1", run_id="run_1")
+
+    def test_poll_backoff_and_server_hint(self):
+        self._retrieveSequence("queued", "in_progress", "in_progress", "completed")
+        self.service.client.beta.threads.messages.list.return_value = SimpleNamespace(data=[_message("ok")])
+
+        with patch("app.services.openai_client_service.time.sleep") as sleep:
+            assert self.service._wait_for_completion("thread_1", "run_1", deadline=float("inf")) == "ok"
+
+        waits = [call.args[0] for call in sleep.call_args_list]
+        initial = settings.OPENAI_POLL_INITIAL_INTERVAL
+        assert waits == pytest.approx([initial, initial * settings.OPENAI_POLL_BACKOFF,
+                                       min(initial * settings.OPENAI_POLL_BACKOFF ** 2, settings.OPENAI_POLL_MAX_INTERVAL)])
+
+        self._retrieveSequence("in_progress", "completed", pollAfterMs=50)
+        with patch("app.services.openai_client_service.time.sleep") as sleep:
+            self.service._wait_for_completion("thread_1", "run_1", deadline=float("inf"))
+        sleep.assert_called_once_with(0.05)
+
+    def test_poll_deadline(self):
+        self._retrieveSequence("in_progress")
+
+        with pytest.raises(TimeoutError):
+            self.service._wait_for_completion("thread_1", "run_1", deadline=0.0)
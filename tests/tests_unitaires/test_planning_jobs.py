@@ -0,0 +1,65 @@
+import threading
+import pytest
+from app.services.planning_jobs import PlanningJobQueue, QueueFullError
+
+
+class TestPlanningJobQueue:
+    """File de génération bornée et suivi des étapes"""
+
+    def setup_method(self):
+        self.queue = PlanningJobQueue(workers=1, maxDepth=2, timeoutSeconds=5, retentionSeconds=60)
+        self.release = threading.Event()
+
+    def teardown_method(self):
+        self.release.set()
+        self.queue.shutdown()
+
+    def _blockingRunner(self, onStage, deadline):
+        onStage("calling_ai")
+        self.release.wait(5)
+        return True
+
+    def _waitFor(self, planningId, stage):
+        for _ in range(200):
+            if self.queue.getJob(planningId)["stage"] == stage:
+                return
+            threading.Event().wait(0.01)
+        raise AssertionError(f"{planningId} jamais en étape {stage}")
+
+    def test_depth_bounded_and_stages(self):
+        self.queue.submit("p1", self._blockingRunner)
+        self.queue.submit("p2", self._blockingRunner)
+        self._waitFor("p1", "calling_ai")
+        assert self.queue.getJob("p2")["stage"] == "queued"  # un seul worker
+
+        with pytest.raises(QueueFullError):
+            self.queue.submit("p3", self._blockingRunner)
+
+        self.release.set()
+        self._waitFor("p1", "done")
+        self._waitFor("p2", "done")
+        assert self.queue.stats()["active"] == 0
+
+    def test_failure_keeps_first_error(self):
+        def runner(onStage, deadline):
+            onStage("calling_ai", "Échec de l'appel OpenAI")
+            return False
+
+        self.queue.submit("p1", runner)
+        self._waitFor("p1", "failed")
+        assert self.queue.getJob("p1")["error"] == "Échec de l'appel OpenAI"
+
+        self.queue.submit("p2", lambda onStage, deadline: 1 / 0)
+        self._waitFor("p2", "failed")
+        assert "division" in self.queue.getJob("p2")["error"]
+
+    def test_shutdown_waits_running_and_cancels_queued(self):
+        self.queue.submit("p1", self._blockingRunner)
+        self.queue.submit("p2", self._blockingRunner)
+        self._waitFor("p1", "calling_ai")
+        threading.Timer(0.05, self.release.set).start()
+
+        assert self.queue.shutdown() == ["p2"]
+        assert self.queue.getJob("p1")["stage"] == "done"
+        assert self.queue.getJob("p2")["stage"] == "failed"
+        assert self.queue.stats()["active"] == 0
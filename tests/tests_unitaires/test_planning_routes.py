@@ -0,0 +1,58 @@
+import httpx
+import pytest
+from unittest.mock import patch
+from app.core.cache import tournamentCache, tournamentTeamsCache, planningCache
+from app.core.local_backend import LocalDatabase, LocalSupabaseClient, AsyncLocalSupabaseClient
+from app.services.ai_planning_service import aiPlanningService
+from app.services.async_database_service import asyncDatabaseService
+from app.services.database_service import databaseService
+from app.services.tournament_service import tournamentService
+from main import app
+
+
+class TestPlanningRoutes:
+    """
+    Routes /api/planning montées dans l'application, sur le backend local.
+    Client httpx sur le transport ASGI : le TestClient de starlette 0.27 ne
+    fonctionne pas avec httpx 0.28 (requirements.txt).
+    """
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.db.seed({
+            "tournament": [{"id": "t1", "name": "Open d'été", "tournament_type": "round_robin", "max_teams": 8,
+                            "courts_available": 2, "start_date": "2025-07-15", "start_time": "09:00:00",
+                            "match_duration_minutes": 15, "break_duration_minutes": 5, "organizer_id": "u1",
+                            "status": "ready"}],
+            "team": [{"id": f"e{index}", "name": f"Équipe {index}", "description": "", "tournament_id": "t1",
+                      "contact_email": f"e{index}@volley.com", "contact_phone": "0600000000",
+                      "skill_level": "amateur", "notes": ""} for index in range(1, 5)]
+        })
+        client = LocalSupabaseClient(self.db)
+        self.patches = [patch.object(service, "supabase", client)
+                        for service in (databaseService, tournamentService, aiPlanningService)]
+        self.patches.append(patch.object(asyncDatabaseService, "supabase", AsyncLocalSupabaseClient(self.db)))
+        for patcher in self.patches:
+            patcher.start()
+        for cache in (tournamentCache, tournamentTeamsCache, planningCache):
+            cache.clear()
+
+    def teardown_method(self):
+        for patcher in self.patches:
+            patcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_generate_then_read_planning(self):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post("/api/planning/generate?engine=local", json={"tournament_id": "t1"})
+            assert response.status_code == 201
+            planningId = response.json()["data"]["id"]
+
+            details = await client.get(f"/api/planning/{planningId}/details")
+            assert details.status_code == 200
+
+            matches = await client.get(f"/api/planning/{planningId}/matches")
+            assert matches.status_code == 200
+            assert len(matches.json()["data"]) == 6  # round robin de 4 équipes
+
+            assert (await client.get("/api/planning/absent/details")).status_code == 404
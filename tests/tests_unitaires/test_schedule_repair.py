@@ -0,0 +1,68 @@
+from datetime import date, datetime, time, timedelta
+from unittest.mock import Mock
+from app.services.local_scheduler import generateLocalPlanning
+from app.services.schedule_repair import repairSchedule
+from app.services.schedule_validator import validateSchedule
+
+
+class TestScheduleRepair:
+    """Réparation locale : planning conforme en peu de déplacements, tableau respecté"""
+
+    def setup_method(self):
+        self.tournament = Mock(courts_available=3, start_date=date(2025, 7, 15), start_time=time(9, 0),
+                               match_duration_minutes=20, break_duration_minutes=5)
+
+    def _planning(self, tournamentType, count):
+        self.tournament.tournament_type = tournamentType
+        teams = [Mock(skill_level="amateur") for _ in range(count)]
+        for index, team in enumerate(teams):
+            team.name = f"Équipe {index + 1}"
+        return generateLocalPlanning(self.tournament, teams)
+
+    def _shift(self, match, **delta):
+        for column in ("debut_horaire", "fin_horaire"):
+            match[column] = (datetime.fromisoformat(match[column]) + timedelta(**delta)).isoformat()
+
+    def test_perturbed_planning_repaired(self):
+        planning = self._planning("round_robin", 8)
+        matches = planning["matchs_round_robin"]
+        self._shift(matches[3], minutes=-10)
+        self._shift(matches[10], minutes=7)
+        assert not validateSchedule(planning, self.tournament)["valid"]
+
+        result = repairSchedule(planning, self.tournament)
+
+        assert result["valid"]
+        assert validateSchedule(result["planning"], self.tournament)["valid"]
+        assert 1 <= len(result["moves"]) <= 6
+        assert len(result["planning"]["matchs_round_robin"]) == len(matches)
+
+    def test_finale_moved_after_semis(self):
+        self.tournament.courts_available = 2
+        planning = self._planning("elimination_directe", 4)
+        rounds = planning["rounds_elimination"]
+        finale = rounds["finale"][0]
+        finale["terrain"] = rounds["demi_finales"][0]["terrain"]
+        finale["debut_horaire"] = rounds["demi_finales"][0]["debut_horaire"]
+        finale["fin_horaire"] = rounds["demi_finales"][0]["fin_horaire"]
+
+        result = repairSchedule(planning, self.tournament)
+
+        assert result["valid"]
+        assert [move["match_id"] for move in result["moves"] if move["kind"] != "compaction"] == ["elim_finale"]
+        repaired = result["planning"]["rounds_elimination"]
+        lastSemi = max(match["fin_horaire"] for match in repaired["demi_finales"])
+        assert repaired["finale"][0]["debut_horaire"] >= lastSemi
+
+    def test_duplicate_match_ids_reported(self):
+        planning = self._planning("poules_elimination", 8)
+        first, second = planning["poules"][0]["matchs"][0], planning["poules"][1]["matchs"][0]
+        second["match_id"] = first["match_id"]
+        second.update(terrain=first["terrain"], debut_horaire=first["debut_horaire"], fin_horaire=first["fin_horaire"])
+
+        result = repairSchedule(planning, self.tournament)
+
+        assert not result["valid"] and result["moves"] == []
+        assert first["match_id"] in result["error"]
+        assert result["violations_after"]["duplicate_match_id"] == 1
+        assert result["planning"] is planning
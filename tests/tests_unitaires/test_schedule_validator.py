@@ -0,0 +1,52 @@
+from datetime import date, time
+from unittest.mock import Mock
+from app.services.schedule_validator import validateSchedule
+
+
+def _match(matchId: str, equipeA: str, equipeB: str, start: str, end: str, terrain: int) -> dict:
+    return {"match_id": matchId, "equipe_a": equipeA, "equipe_b": equipeB, "terrain": terrain,
+            "debut_horaire": f"2025-07-15T{start}:00", "fin_horaire": f"2025-07-15T{end}:00"}
+
+
+class TestScheduleValidator:
+    """Balayages triés : une violation par règle enfreinte, rien sur un planning conforme"""
+
+    def setup_method(self):
+        self.tournament = Mock(start_date=date(2025, 7, 15), start_time=time(9, 0),
+                               break_duration_minutes=5, courts_available=2)
+
+    def _report(self, matches):
+        return validateSchedule({"type_tournoi": "round_robin", "matchs_round_robin": matches}, self.tournament)
+
+    def test_valid_planning(self):
+        report = self._report([
+            _match("m1", "A", "B", "09:00", "09:20", 1),
+            _match("m2", "C", "D", "09:00", "09:20", 2),
+            _match("m3", "A", "C", "09:25", "09:45", 1),
+            _match("m4", "B", "D", "13:30", "13:50", 2),
+        ])
+        assert report == {"valid": True, "matches": 4, "counts": {}, "violations": []}
+
+    def test_each_rule_reported(self):
+        report = self._report([
+            _match("m1", "A", "B", "09:00", "09:40", 1),
+            _match("m2", "C", "D", "09:10", "09:20", 1),   # contenu dans m1 : chevauchement terrain
+            _match("m3", "E", "F", "09:42", "09:50", 1),   # 2 min après m1 : pause insuffisante
+            _match("m4", "A", "G", "09:30", "09:50", 3),   # A joue déjà (m1), terrain 3 inexistant
+            _match("m5", "H", "I", "11:50", "12:10", 1),   # déborde sur la pause déjeuner
+            _match("m6", "J", "K", "08:30", "08:50", 1),   # avant l'heure de début
+        ])
+
+        assert not report["valid"]
+        assert report["counts"] == {"court_overlap": 1, "break_gap": 1, "team_overlap": 1, "lunch_window": 1,
+                                    "day_bounds": 1, "invalid_court": 1, "unused_court": 1}
+        byType = {violation["type"]: violation for violation in report["violations"]}
+        assert byType["court_overlap"]["match_ids"] == ["m1", "m2"]
+        assert byType["break_gap"]["match_ids"] == ["m1", "m3"] and byType["break_gap"]["gap_minutes"] == 2
+        assert byType["team_overlap"]["team"] == "A"
+        assert byType["unused_court"]["terrain"] == 2
+
+    def test_fewer_matches_than_courts(self):
+        """2 équipes sur 4 terrains : un seul match, les terrains vides ne sont pas une faute"""
+        self.tournament.courts_available = 4
+        assert self._report([_match("m1", "A", "B", "09:00", "09:20", 1)])["valid"]
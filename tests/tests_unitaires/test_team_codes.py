@@ -0,0 +1,121 @@
+from unittest.mock import Mock, patch
+from app.services.team_codes import teamCodes, teamIdsByCode, decodeTeams
+
+
+def _teams(*names):
+    teams = [Mock(id=f"id-{index}") for index in range(len(names))]
+    for team, name in zip(teams, names):
+        team.name = name
+    return teams
+
+
+class TestTeamCodes:
+    """Codes stables dans l'ordre des noms, ré-associés aux équipes dans la réponse"""
+
+    def test_codes_follow_name_order(self):
+        codes = teamCodes(_teams("Volley Club Zénith", "Association Sportive Beach", "Les Marsouins"))
+
+        assert list(codes) == ["T01", "T02", "T03"]
+        assert [team.name for team in codes.values()] == ["Association Sportive Beach", "Les Marsouins",
+                                                          "Volley Club Zénith"]
+        assert list(teamCodes(_teams(*[f"Équipe {i:03d}" for i in range(120)])))[-1] == "T120"
+
+    def test_decode_keeps_placeholders(self):
+        codes = teamCodes(_teams("Alpha", "Bravo", "Charlie", "Delta"))
+        response = {
+            "type_tournoi": "poules_elimination",
+            "poules": [{"poule_id": "poule_a", "equipes": ["T01", "T02"],
+                        "matchs": [{"match_id": "poule_a_m1", "equipe_a": "T01", "equipe_b": "T02"}]}],
+            "phase_elimination_apres_poules": {"finale": [{"match_id": "finale", "equipe_a": "1er_poule_a",
+                                                           "equipe_b": "winner_demi_1"}]}
+        }
+
+        decoded = decodeTeams(response, codes)
+
+        assert decoded["poules"][0]["equipes"] == ["Alpha", "Bravo"]
+        assert decoded["poules"][0]["matchs"][0]["equipe_b"] == "Bravo"
+        assert decoded["phase_elimination_apres_poules"] == response["phase_elimination_apres_poules"]
+        assert response["poules"][0]["equipes"] == ["T01", "T02"]  # réponse d'origine intacte
+
+    def test_only_team_fields_decoded(self):
+        codes = teamCodes(_teams("Alpha", "Bravo"))
+        response = {
+            "type_tournoi": "round_robin",
+            "matchs_round_robin": [{"match_id": "T01", "equipe_a": "T01", "equipe_b": "T02"}],
+            "final_ranking": [{"position": 1, "equipe_id": "T02", "nom_equipe": "T02"}],
+            "commentaires": "T01"
+        }
+
+        decoded = decodeTeams(response, codes)
+
+        assert decoded["matchs_round_robin"][0] == {"match_id": "T01", "equipe_a": "Alpha", "equipe_b": "Bravo"}
+        assert decoded["final_ranking"][0] == {"position": 1, "equipe_id": "id-1", "nom_equipe": "Bravo"}
+        assert decoded["commentaires"] == "T01"
+        assert teamIdsByCode(codes) == {"T01": "id-0", "T02": "id-1"}
+
+
+class TestAIPlanningServicePromptTeams:
+    """Prompt en codes, réponse décodée avant validation, tokens cumulés par mode"""
+
+    def setup_method(self):
+        with patch('app.services.ai_planning_service.getSupabase'):
+            from app.services.ai_planning_service import AIPlanningService
+            self.service = AIPlanningService()
+        self.service.tournamentService = Mock()
+        self.service.openAIService = Mock(assistant_id="asst_test")
+
+        def generate(prompt, timeout=None, on_usage=None):
+            self.prompt = prompt
+            on_usage({"prompt_tokens": 900, "completion_tokens": 300, "total_tokens": 1200})
+            return {"type_tournoi": "round_robin", "matchs_round_robin": [
+                {"match_id": "rr_m1", "equipe_a": "T02", "equipe_b": "T01", "terrain": 1,
+                 "debut_horaire": "2025-07-15T09:00:00", "fin_horaire": "2025-07-15T09:15:00"}],
+                "final_ranking": [{"position": 1, "equipe_id": "T01", "nom_equipe": "T01"}]}
+
+        self.service.openAIService.generate_planning.side_effect = generate
+        tournament = Mock(tournament_type="round_robin", courts_available=1, start_date="2025-07-15",
+                          start_time="09:00", match_duration_minutes=15, break_duration_minutes=5, constraints={})
+        tournament.name = "Open d'été"
+        self.service.tournamentService.getTournamentWithTeams.return_value = {
+            "tournament": tournament, "teams": _teams("Les Requins du Littoral", "Beach Volley Marseille")
+        }
+
+    def test_codes_prompt_and_decoded_response(self):
+        with patch('app.services.ai_planning_service.settings.PLANNING_PROMPT_TEAMS', "codes"), \
+             patch('app.services.ai_planning_service.settings.AI_CACHE_ENABLED', False), \
+             patch('app.services.ai_planning_service.settings.PLANNING_VALIDATION', "off"), \
+             patch('app.services.ai_planning_service.aiResponseCache') as cache:
+            cache.get.return_value = None
+            _, aiResponse = self.service._requestAIPlanning("tournament_123")
+
+        assert "T01, T02" in self.prompt and "Les Requins du Littoral" not in self.prompt
+        match = aiResponse["matchs_round_robin"][0]
+        assert (match["equipe_a"], match["equipe_b"]) == ("Les Requins du Littoral", "Beach Volley Marseille")
+        assert aiResponse["team_codes"] == {"T01": "id-1", "T02": "id-0"}
+        cachedMatch = cache.set.call_args.args[1]["matchs_round_robin"][0]
+        assert (cachedMatch["equipe_a"], cachedMatch["equipe_b"]) == ("T02", "T01")  # le cache garde les codes
+        assert self.service.tokenUsageStats() == {"codes": {"generations": 1, "avg_prompt_tokens": 900,
+                                                            "avg_completion_tokens": 300,
+                                                            "avg_seconds": 0.0}}
+
+    def test_cached_response_decoded_per_tournament(self):
+        """Deux tournois, mêmes noms d'équipes, ids différents : le cache ne mélange pas les Team.id"""
+        entries = {}
+        cache = Mock(get=Mock(side_effect=entries.get), set=Mock(side_effect=entries.__setitem__))
+        tournamentData = self.service.tournamentService.getTournamentWithTeams.return_value
+        other = _teams("Les Requins du Littoral", "Beach Volley Marseille")
+        for team in other:
+            team.id = f"autre-{team.id}"
+
+        with patch('app.services.ai_planning_service.settings.PLANNING_PROMPT_TEAMS', "codes"), \
+             patch('app.services.ai_planning_service.settings.AI_CACHE_ENABLED', True), \
+             patch('app.services.ai_planning_service.settings.PLANNING_VALIDATION', "off"), \
+             patch('app.services.ai_planning_service.aiResponseCache', cache):
+            _, first = self.service._requestAIPlanning("tournoi_1")
+            tournamentData["teams"] = other
+            _, second = self.service._requestAIPlanning("tournoi_2")
+
+        assert self.service.openAIService.generate_planning.call_count == 1  # 2e tournoi servi par le cache
+        assert first["final_ranking"][0]["equipe_id"] == "id-1"
+        assert second["final_ranking"][0]["equipe_id"] == "autre-id-1"
+        assert second["team_codes"] == {"T01": "autre-id-1", "T02": "autre-id-0"}
@@ -0,0 +1,57 @@
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from app.core.cache import clearCaches
+from app.core.local_backend import LocalDatabase, AsyncLocalSupabaseClient
+from app.services.async_tournament_service import asyncTournamentService
+from app.services.tournament_service import tournamentService
+from main import app
+
+
+class TestTournamentReadRoutes:
+    """
+    Lectures tournois / équipes servies par le service async, sur le backend local.
+    Le client du service sync lève : aucune route de lecture ne doit l'utiliser.
+    """
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.db.seed({
+            "tournament": [{"id": "t1", "name": "Open d'été", "tournament_type": "round_robin", "max_teams": 8,
+                            "courts_available": 2, "start_date": "2025-07-15", "start_time": "09:00:00",
+                            "match_duration_minutes": 15, "break_duration_minutes": 5, "organizer_id": "u1",
+                            "status": "ready", "created_at": "2025-07-01T10:00:00"}],
+            "team": [{"id": f"e{index}", "name": f"Équipe {index}", "description": "", "tournament_id": "t1",
+                      "contact_email": f"e{index}@volley.com", "contact_phone": "0600000000",
+                      "skill_level": "amateur", "notes": "", "created_at": f"2025-07-0{index}T10:00:00"}
+                     for index in range(1, 4)]
+        })
+        self.patches = [patch.object(asyncTournamentService, "supabase", AsyncLocalSupabaseClient(self.db)),
+                        patch.object(tournamentService, "supabase", Mock(table=Mock(side_effect=AssertionError)))]
+        for patcher in self.patches:
+            patcher.start()
+        clearCaches()
+
+    def teardown_method(self):
+        for patcher in self.patches:
+            patcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_reads_use_async_service(self):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            withTeams = await client.get("/api/tournaments/t1/with-teams")
+            assert withTeams.status_code == 200
+            assert withTeams.json()["data"]["teams_count"] == 3
+            cached = await client.get("/api/tournaments/t1/with-teams",
+                                      headers={"If-None-Match": withTeams.headers["ETag"]})
+            assert cached.status_code == 304
+
+            assert (await client.get("/api/tournaments/t1")).json()["data"][0]["registered_teams"] == 3
+            assert len((await client.get("/api/tournaments/t1/teams")).json()["data"]) == 3
+            assert (await client.get("/api/tournaments/teams/e2")).json()["data"]["name"] == "Équipe 2"
+            assert len((await client.get("/api/tournaments/")).json()["data"]) == 1
+
+            page = (await client.get("/api/teams/?limit=2&tournament_id=t1")).json()
+            assert len(page["data"]) == 2 and page["next_cursor"]
+            rest = (await client.get(f"/api/teams/?limit=2&cursor={page['next_cursor']}")).json()
+            assert [team["id"] for team in rest["data"]] == ["e3"]
@@ -0,0 +1,198 @@
+import pytest
+from unittest.mock import patch
+from app.core.cache import clearCaches, tournamentCache
+from app.core.local_backend import LocalDatabase, LocalSupabaseClient
+from app.services.tournament_service import tournamentService
+from app.models.models import Tournament
+
+
+def _tournamentRow(index: int) -> dict:
+    return {
+        "id": f"t{index}",
+        "name": f"Tournoi {index}",
+        "description": "Test",
+        "tournament_type": "round_robin",
+        "max_teams": 8,
+        "courts_available": 2,
+        "start_date": "2025-07-15",
+        "organizer_id": "u0",
+        "status": "ready"
+    }
+
+
+def _teamRow(tournamentId: str, index: int) -> dict:
+    return {
+        "id": f"{tournamentId}-e{index}",
+        "name": f"Équipe {index}",
+        "description": "Test",
+        "tournament_id": tournamentId,
+        "contact_email": "e@test.com",
+        "contact_phone": "0600000000",
+        "skill_level": "amateur",
+        "notes": ""
+    }
+
+
+class TestTournamentService:
+    """Tests du service Tournament sur le backend local"""
+
+    def setup_method(self):
+        self.db = LocalDatabase()
+        self.service = tournamentService
+        self.supabasePatch = patch.object(tournamentService, "supabase", LocalSupabaseClient(self.db))
+        self.supabasePatch.start()
+        clearCaches()
+
+    def teardown_method(self):
+        self.supabasePatch.stop()
+
+    def _seed(self, nbTournaments: int, teamsPerTournament: int = 3):
+        tournaments = [_tournamentRow(i) for i in range(nbTournaments)]
+        teams = [_teamRow(t["id"], e) for t in tournaments for e in range(teamsPerTournament)]
+        self.db.seed({"tournament": tournaments, "team": teams})
+
+    @pytest.mark.parametrize("nbTournaments", [1, 10, 100])
+    def test_get_tournaments_constant_round_trips(self, nbTournaments):
+        """getTournaments fait une seule requête, quel que soit le nombre de tournois"""
+        self._seed(nbTournaments)
+        self.db.requestCount = 0
+
+        tournaments = self.service.getTournaments()
+
+        assert len(tournaments) == nbTournaments
+        assert all(t.registered_teams == 3 for t in tournaments)
+        assert self.db.requestCount == 1
+
+    def test_get_tournament_by_id_counts_teams(self):
+        """Le nombre d'équipes inscrites vient du count embarqué"""
+        self._seed(2, teamsPerTournament=5)
+        self.db.requestCount = 0
+
+        tournament = self.service.getTournamentById("t1")
+
+        assert isinstance(tournament, Tournament)
+        assert tournament.registered_teams == 5
+        assert self.db.requestCount == 1
+
+    def test_get_tournament_by_id_not_found(self):
+        """Tournoi inexistant -> None"""
+        assert self.service.getTournamentById("absent") is None
+
+    def _seedMembers(self, membersPerTeam: int = 2):
+        profiles, members = [], []
+        for team in self.db.tables["team"]:
+            for m in range(membersPerTeam):
+                userId = f"{team['id']}-u{m}"
+                profiles.append({"id": userId, "email": f"{userId}@test.com"})
+                members.append({"team_id": team["id"], "user_id": userId})
+        self.db.seed({"profile": profiles, "team_member": members})
+
+    @pytest.mark.parametrize("tournamentId, expectedTeams", [(None, 12), ("t2", 3)])
+    def test_get_teams_with_members_single_query(self, tournamentId, expectedTeams):
+        """Équipes + membres + emails en une seule requête, avec ou sans filtre"""
+        self._seed(4)
+        self._seedMembers()
+        self.db.requestCount = 0
+
+        teams = self.service.getTeamsWithMembers(tournamentId)
+
+        assert len(teams) == expectedTeams
+        assert all(len(team.members) == 2 for team in teams)
+        assert teams[0].members[0].email.endswith("@test.com")
+        assert self.db.requestCount == 1
+
+    def test_get_teams_with_members_empty(self):
+        """Aucune équipe -> liste vide"""
+        assert self.service.getTeamsWithMembers("absent") == []
+
+    def test_tournament_cache_hit_and_invalidation(self):
+        """Lecture servie par le cache, invalidée par une mise à jour de statut"""
+        self._seed(1)
+        self.db.requestCount = 0
+
+        self.service.getTournamentById("t0")
+        cached = self.service.getTournamentById("t0")
+        assert self.db.requestCount == 1
+        assert cached.status == "ready"
+
+        self.service.updateTournamentStatus("t0", "in_progress")
+        assert self.service.getTournamentById("t0").status == "in_progress"
+        assert tournamentCache.stats()["hits"] == 1
+
+    def test_create_team_invalidates_tournament_teams(self):
+        """Créer une équipe rafraîchit la liste et le nombre d'équipes du tournoi"""
+        self._seed(1, teamsPerTournament=2)
+        assert len(self.service.getTournamentTeams("t0")) == 2
+        assert self.service.getTournamentById("t0").registered_teams == 2
+
+        newTeam = _teamRow("t0", 9)
+        del newTeam["id"]
+        self.service.createTeam(newTeam)
+
+        assert len(self.service.getTournamentTeams("t0")) == 3
+        assert self.service.getTournamentById("t0").registered_teams == 3
+
+    def test_etag_cached_with_tournament(self):
+        """L'ETag est servi par le cache et change avec le statut ou le nombre d'équipes"""
+        self._seed(1)
+        _, etag = self.service.getTournamentByIdWithEtag("t0")
+        self.db.requestCount = 0
+
+        assert self.service.getTournamentByIdWithEtag("t0")[1] == etag
+        assert self.db.requestCount == 0
+
+        self.service.updateTournamentStatus("t0", "in_progress")
+        assert self.service.getTournamentByIdWithEtag("t0")[1] != etag
+
+    def test_tournament_teams_sorted_by_name(self):
+        """Équipes triées par nom : même ordre et même ETag quel que soit l'ordre en base"""
+        rows = [_teamRow("t0", index) for index in (3, 1, 2)]
+        self.db.seed({"tournament": [_tournamentRow(0)], "team": rows})
+        teams, etag = self.service.getTournamentTeamsWithEtag("t0")
+        assert [team.name for team in teams] == ["Équipe 1", "Équipe 2", "Équipe 3"]
+
+        self.db.rows("team").reverse()
+        clearCaches()
+        assert self.service.getTournamentTeamsWithEtag("t0")[1] == etag
+
+    def test_tournaments_keyset_pagination(self):
+        """Parcours par curseur : chaque tournoi une seule fois, même à created_at égal"""
+        rows = [_tournamentRow(i) | {"created_at": "2025-06-25T14:30:00+00:00"} for i in range(7)]
+        self.db.seed({"tournament": rows})
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            tournaments, cursor = self.service.getTournamentsPage(3, cursor)
+            seen += [t.id for t in tournaments]
+            pages += 1
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert sorted(seen) == sorted(row["id"] for row in rows)
+
+    def test_tournaments_page_filters_and_invalid_cursor(self):
+        """Filtres côté serveur ; un curseur illisible lève ValueError"""
+        self._seed(4)
+        self.db.tables["tournament"][1]["status"] = "draft"
+
+        tournaments, cursor = self.service.getTournamentsPage(10, status="draft")
+        assert [t.id for t in tournaments] == ["t1"] and cursor is None
+
+        with pytest.raises(ValueError):
+            self.service.getTournamentsPage(10, cursor="pas-un-curseur")
+
+    def test_bulk_status_transition_is_conditional(self):
+        """Un seul aller-retour ; les tournois déjà passés par un autre écrivain sont ignorés"""
+        self._seed(3)
+        self.db.tables["tournament"][2]["status"] = "active"
+        self.service.getTournamentById("t0")
+        self.db.requestCount = 0
+
+        report = self.service.transitionTournamentStatuses(["t0", "t1", "t2", "t9", "t0"], "ready", "active")
+
+        assert report["transitioned"] == ["t0", "t1"]
+        assert report["skipped"] == ["t2", "t9"]
+        assert self.db.requestCount == 1
+        assert tournamentCache.get("t0") is None
+        assert self.service.transitionTournamentStatuses(["t0"], "ready", "completed")["transitioned"] == []